@@ -1,6 +1,7 @@
 import streamlit as st
 from .auth import check_auth
-from .pages import dashboard, metrics, ratings
+from .pages import dashboard, metrics, ratings, search
+from .perf import display_performance_panel, start_run
 
 def main():
     st.set_page_config(
@@ -11,17 +12,20 @@ def main():
     
     if not check_auth():
         return
+    start_run()
     
     # Navigation
     pages = {
         "Dashboard": dashboard.show,
         "Ratings Summary": ratings.show,
-        "Metric Comparison": metrics.show
+        "Metric Comparison": metrics.show,
+        "Review Search": search.show
     }
     
     st.sidebar.title("Navigation")
     selection = st.sidebar.radio("Go to", list(pages.keys()))
     pages[selection]()
+    display_performance_panel()
     
     st.sidebar.button("Logout", on_click=lambda: st.session_state.update({'authenticated': False}))
 
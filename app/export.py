@@ -0,0 +1,106 @@
+import tempfile
+import zlib
+from typing import BinaryIO, Dict, Iterator, List
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is only offered when pyarrow is installed
+    pa = None
+    pq = None
+
+# Rows serialized per chunk; bounds the temporary copy made for each slice
+EXPORT_CHUNK_ROWS = 5000
+# Exports larger than this spill from memory to a temporary file on disk
+EXPORT_SPOOL_BYTES = 16 * 1024 * 1024
+
+EXPORT_FORMATS: Dict[str, Dict[str, str]] = {
+    "CSV": {"extension": "csv", "mime": "text/csv"},
+    "CSV (gzip)": {"extension": "csv.gz", "mime": "application/gzip"},
+    "Parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+
+def available_formats() -> List[str]:
+    """Export formats usable in this environment"""
+    return [name for name in EXPORT_FORMATS if name != "Parquet" or pq is not None]
+
+
+def iter_csv_chunks(df: pd.DataFrame, columns: List[str],
+                    chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Yield the CSV encoding of df[columns] a slice at a time
+
+    Only one chunk of rows is copied and encoded at any point, so the full
+    CSV text is never held in memory alongside the DataFrame.
+    """
+    if df.empty:
+        yield pd.DataFrame(columns=columns).to_csv(index=False).encode('utf-8')
+        return
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows][columns]
+        yield chunk.to_csv(index=False, header=(start == 0)).encode('utf-8')
+
+
+def iter_gzip(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a stream of byte chunks incrementally"""
+    compressor = zlib.compressobj(wbits=31)  # 31 selects the gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def write_parquet(df: pd.DataFrame, columns: List[str], fh: BinaryIO,
+                  chunk_rows: int = EXPORT_CHUNK_ROWS):
+    """Write df[columns] to fh as Parquet, one row group per chunk"""
+    if pq is None:
+        raise ImportError("Parquet export requires pyarrow")
+    schema = pa.Schema.from_pandas(df.iloc[:0][columns], preserve_index=False)
+    with pq.ParquetWriter(fh, schema) as writer:
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows][columns]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def build_export(df: pd.DataFrame, export_format: str,
+                 include_full_text: bool = False) -> BinaryIO:
+    """
+    Serialize the reviews table for download
+
+    Args:
+        df: Reviews table as built by build_reviews_frame
+        export_format: One of EXPORT_FORMATS
+        include_full_text: Whether to keep the 'Full Review' column
+
+    Returns:
+        A file object positioned at the start of the export. Small exports
+        stay in memory; large ones are spooled to a temporary file, which is
+        deleted when the caller closes it.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    columns = [c for c in df.columns if include_full_text or c != 'Full Review']
+    fh = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+
+    if export_format == "Parquet":
+        write_parquet(df, columns, fh)
+    else:
+        chunks = iter_csv_chunks(df, columns)
+        if export_format == "CSV (gzip)":
+            chunks = iter_gzip(chunks)
+        for chunk in chunks:
+            fh.write(chunk)
+
+    fh.seek(0)
+    return fh
+
+
+def export_file_name(metric: str, threshold: float, export_format: str) -> str:
+    """File name for a reviews export, e.g. 'Cabins_reviews_below_5.0.csv.gz'"""
+    extension = EXPORT_FORMATS[export_format]["extension"]
+    return f"{metric}_reviews_below_{threshold}.{extension}"
@@ -1,6 +1,7 @@
 from .dashboard import show as show_dashboard
 from .metrics import show as show_metrics
 from .ratings import show as show_ratings
+from .search import show as show_search
 
 # Explicitly expose the page functions
-__all__ = ['show_dashboard', 'show_metrics', 'show_ratings']
\ No newline at end of file
+__all__ = ['show_dashboard', 'show_metrics', 'show_ratings', 'show_search']
\ No newline at end of file
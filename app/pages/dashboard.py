@@ -1,9 +1,18 @@
 import streamlit as st
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
 from ..utils import get_client, display_ship_selector
-from services.api_client import SailingIdentifier
+from ..perf import timed
+from services.api_client import APIError, SailingIdentifier
 import pandas as pd
 import plotly.express as px
+import hashlib
+import json
+
+# Metrics shown by each dashboard panel
+KPI_METRICS = ['F&B Quality', 'Cabin Cleanliness', 'Crew Friendliness', 'Entertainment']
+TREND_METRICS = ['F&B Quality', 'Cabin Cleanliness', 'Entertainment']
+COMPARISON_METRICS = ['F&B Quality', 'Cabin Cleanliness', 'Crew Friendliness', 'Entertainment', 'Excursions']
+SUMMARY_METRICS = list(dict.fromkeys(KPI_METRICS + TREND_METRICS + COMPARISON_METRICS))
 
 def show():
     st.title("🚢 Cruise Analytics Dashboard")
@@ -28,17 +37,18 @@ def show():
             if st.button("Load Dashboard Data"):
                 with st.spinner("Loading dashboard data..."):
                     try:
-                        # Get rating summaries for the selected date range
-                        summaries = client.get_rating_summary(
+                        # Get dashboard aggregates for the selected date range
+                        aggregates = load_dashboard_data(
+                            client,
                             from_date=date_from.isoformat(),
                             to_date=date_to.isoformat(),
                             filter_by="date"
                         )
                         
                         # Display the dashboard components
-                        display_overview_metrics(summaries)
-                        display_metric_trends(summaries)
-                        display_ship_comparison(summaries)
+                        display_overview_metrics(aggregates)
+                        display_metric_trends(aggregates["trends"], aggregates["granularity"])
+                        display_ship_comparison(aggregates["ship_means"])
 
                     except Exception as e:
                         st.error(f"Failed to load dashboard data: {str(e)}")
@@ -57,42 +67,132 @@ def show():
                         # Convert to SailingIdentifiers (assuming sailing number 1 for dashboard)
                         sailings = [SailingIdentifier(ship, "1") for ship in selected_ships]
 
-                        # Get rating summaries for selected ships
-                        # summaries = client.get_rating_summary_by_ship(sailings=sailings)
-                        summaries = client.get_rating_summary(
+                        # Get dashboard aggregates for selected ships
+                        aggregates = load_dashboard_data(
+                            client,
                             sailings=sailings,
                             filter_by="sailing"
                         )
 
                         # Display the dashboard components
-                        display_overview_metrics(summaries)
-                        display_metric_trends(summaries)
-                        display_ship_comparison(summaries)
+                        display_overview_metrics(aggregates)
+                        display_metric_trends(aggregates["trends"], aggregates["granularity"])
+                        display_ship_comparison(aggregates["ship_means"])
 
                     except Exception as e:
                         st.error(f"Failed to load dashboard data: {str(e)}")
 
-def display_overview_metrics(summaries: List[Dict]):
+def summary_frame(summaries: List[Dict]) -> pd.DataFrame:
+    """
+    Normalized, typed DataFrame for a rating summary payload
+
+    The frame is built once per distinct payload (keyed by its hash) and
+    shared by all dashboard panels.
+    """
+    payload = json.dumps(summaries, sort_keys=True, default=str).encode('utf-8')
+    return _build_summary_frame(hashlib.sha1(payload).hexdigest(), summaries)
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_summary_frame(payload_hash: str, _summaries: List[Dict]) -> pd.DataFrame:
+    """Build the summary frame; the leading underscore keeps _summaries out of Streamlit's hashing"""
+    df = pd.DataFrame.from_records(_summaries)
+    if df.empty:
+        return df
+
+    for metric in SUMMARY_METRICS:
+        if metric in df.columns:
+            df[metric] = pd.to_numeric(df[metric], errors='coerce').astype(float)
+        else:
+            df[metric] = float('nan')
+
+    end_dates = df['End'] if 'End' in df.columns else pd.Series(None, index=df.index)
+    dates = df['sailingDate'].fillna(end_dates) if 'sailingDate' in df.columns else end_dates
+    df['Date'] = pd.to_datetime(dates, errors='coerce')
+    if 'Ship Name' not in df.columns:
+        df['Ship Name'] = 'Unknown'
+    df['Ship Name'] = df['Ship Name'].fillna('Unknown')
+    df['Ship'] = df['Ship'].fillna(df['Ship Name']) if 'Ship' in df.columns else df['Ship Name']
+    return df
+
+def load_dashboard_data(client, **query) -> Dict[str, Any]:
+    """
+    Aggregates for the dashboard panels
+
+    Uses the server-side /dashboard endpoint, whose payload does not grow with
+    the number of sailings. Servers without that endpoint (404) fall back to
+    downloading the full summaries and aggregating them here.
+    """
+    try:
+        response = client.get_dashboard(**query)
+    except APIError as e:
+        # Any other failure is reported rather than hidden behind the slow path
+        if e.status_code != 404:
+            raise
+        summaries = client.get_rating_summary(**query)
+        return frame_aggregates(summary_frame(summaries))
+    return response_aggregates(response)
+
+def frame_aggregates(frame: pd.DataFrame) -> Dict[str, Any]:
+    """Compute the dashboard aggregates from a summary frame"""
+    if frame.empty:
+        return {
+            "count": 0,
+            "granularity": None,
+            "kpis": pd.Series(index=KPI_METRICS, dtype=float),
+            "trends": pd.DataFrame(columns=['Date', 'Ship', 'Metric', 'Score']),
+            "ship_means": pd.DataFrame(columns=COMPARISON_METRICS, dtype=float)
+        }
+
+    trends = (
+        frame.melt(id_vars=['Date', 'Ship'], value_vars=TREND_METRICS,
+                   var_name='Metric', value_name='Score')
+        .dropna(subset=['Date', 'Score'])
+        .groupby(['Date', 'Ship', 'Metric'], as_index=False)['Score'].mean()
+    )
+    return {
+        "count": len(frame),
+        "granularity": None,
+        "kpis": frame[KPI_METRICS].mean(),
+        "trends": trends,
+        "ship_means": frame.groupby('Ship Name')[COMPARISON_METRICS].mean()
+    }
+
+def response_aggregates(response: Dict) -> Dict[str, Any]:
+    """Convert a /dashboard response into the same shape as frame_aggregates"""
+    # Trend points are bucketed server-side; each date is the start of its bucket
+    trends = pd.DataFrame(response["trends"], columns=['date', 'ship', 'metric', 'score'])
+    trends.columns = ['Date', 'Ship', 'Metric', 'Score']
+    trends['Date'] = pd.to_datetime(trends['Date'])
+    trends['Score'] = trends['Score'].astype(float)
+
+    ship_means = pd.DataFrame(response["shipMeans"])
+    ship_means = (
+        ship_means.set_index('ship') if not ship_means.empty else ship_means
+    ).reindex(columns=COMPARISON_METRICS).astype(float)
+
+    return {
+        "count": response["count"],
+        "granularity": response["granularity"],
+        "kpis": pd.Series(response["kpis"], dtype=float).reindex(KPI_METRICS),
+        "trends": trends,
+        "ship_means": ship_means
+    }
+
+def display_overview_metrics(aggregates: Dict[str, Any]):
     """Display key metrics in columns"""
     st.markdown("### Key Metrics")
     
-    if not summaries:
+    if not aggregates["count"]:
         st.warning("No data available for the selected criteria")
         return
     
-    # Calculate averages across all selected sailings
-    metrics = [
-        ('F&B Quality', 'F&B Quality'),
-        ('Cabin Cleanliness', 'Cabin Cleanliness'),
-        ('Crew Friendliness', 'Crew Friendliness'),
-        ('Entertainment', 'Entertainment')
-    ]
+    # Averages across all selected sailings
+    averages = aggregates["kpis"].fillna(0)
     
-    cols = st.columns(len(metrics))
-    for idx, (display_name, api_name) in enumerate(metrics):
+    cols = st.columns(len(KPI_METRICS))
+    for idx, display_name in enumerate(KPI_METRICS):
         with cols[idx]:
-            values = [s.get(display_name, 0) for s in summaries if display_name in s]
-            avg = sum(values) / len(values) if values else 0
+            avg = averages[display_name]
             delta = avg - 8.0  # Compare to benchmark of 8.0
             st.metric(
                 label=display_name,
@@ -100,40 +200,18 @@ def display_overview_metrics(summaries: List[Dict]):
                 delta=f"{delta:+.1f} vs benchmark"
             )
 
-def display_metric_trends(summaries: List[Dict]):
+def display_metric_trends(trends: pd.DataFrame, granularity: Optional[str] = None):
     """Display metric trends over time"""
     st.markdown("### Metric Trends Over Time")
 
-    if not summaries:
-        return
-
-    # Prepare data for plotting
-    metrics = [
-        ('F&B Quality', 'F&B Quality'),
-        ('Cabin Cleanliness', 'Cabin Cleanliness'),
-        ('Entertainment', 'Entertainment')
-    ]
-
-    plot_data = []
-    for summary in summaries:
-        for display_name, api_name in metrics:
-            if display_name in summary:
-                plot_data.append({
-                    'Date': summary.get('sailingDate', summary['End']),
-                    'Ship': summary.get('Ship', summary['Ship']),
-                    'Metric': display_name,
-                    'Score': summary[display_name]
-                })
-
-    if not plot_data:
+    if trends.empty:
         st.warning("No trend data available")
         return
 
-    df = pd.DataFrame(plot_data)
+    if granularity:
+        st.caption(f"Average score per {granularity}")
 
-    # Ensure Date column is in datetime format and sort by Date
-    df['Date'] = pd.to_datetime(df['Date'])
-    df = df.sort_values(by='Date')
+    df = trends.sort_values(by='Date')
 
     # Create interactive plot
     fig = px.line(
@@ -148,63 +226,38 @@ def display_metric_trends(summaries: List[Dict]):
     fig.update_layout(height=400)
     st.plotly_chart(fig, use_container_width=True)
 
-def display_ship_comparison(summaries: List[Dict]):
+@timed("display_ship_comparison")
+def display_ship_comparison(ship_means: pd.DataFrame):
     """Display comparison of ships across key metrics"""
     st.markdown("### Ship Comparison")
     
-    if not summaries:
+    if ship_means.empty:
         return
     
     # Select metrics to compare
     comparison_metrics = st.multiselect(
         "Select metrics to compare",
-        options=[
-            'F&B Quality',
-            'Cabin Cleanliness',
-            'Crew Friendliness',
-            'Entertainment',
-            'Excursions'
-        ],
-        default=['F&B Quality',
-            'Cabin Cleanliness',
-            'Crew Friendliness',
-            'Entertainment',
-            'Excursions']
+        options=COMPARISON_METRICS,
+        default=COMPARISON_METRICS
     )
     
     if not comparison_metrics:
         return
     
-    # Prepare data for radar chart
-    radar_data = []
-    metric_mapping = {
-        'F&B Quality': 'F&B Quality',
-        'Cabin Cleanliness': 'Cabin Cleanliness',
-        'Crew Friendliness': 'Crew Friendliness',
-        'Entertainment': 'Entertainment',
-        'Excursions': 'Excursions'
-    }
-    
-    ships = set()
-    for summary in summaries:
-        ship = summary.get('Ship Name', 'Unknown')
-        ships.add(ship)
-        for metric in comparison_metrics:
-            api_name = metric_mapping.get(metric, metric)
-            if api_name in summary:
-                radar_data.append({
-                    'Ship': ship,
-                    'Metric': metric,
-                    'Score': summary[api_name]
-                })
-    
-    if len(ships) < 2:
+    if len(ship_means) < 2:
         st.warning("Need at least 2 ships for comparison")
         return
     
+    # Per-ship means in long form for the radar chart
+    df = (
+        ship_means[comparison_metrics]
+        .rename_axis('Ship')
+        .reset_index()
+        .melt(id_vars='Ship', var_name='Metric', value_name='Score')
+        .dropna(subset=['Score'])
+    )
+    
     # Create radar chart
-    print(radar_data)
-    df = pd.DataFrame(radar_data)
     fig = px.line_polar(
         df,
         r='Score',
@@ -1,9 +1,16 @@
 import streamlit as st
 from ..utils import get_client, display_ship_selector, display_metric_selector
+from ..export import available_formats, build_export, export_file_name, EXPORT_FORMATS
+from ..perf import timed
 from services.api_client import SailingIdentifier
-from typing import Dict
+from typing import Dict, List
+from bisect import bisect_right
 import plotly.express as px
 import pandas as pd
+import math
+
+# Page sizes offered by the review grid; only one page of rows creates widgets
+REVIEW_PAGE_SIZES = [10, 25, 50, 100]
 
 
 def show():
@@ -38,18 +45,11 @@ def show():
                 date_to = st.date_input("To Date")
 
             if st.button("Load Metric Data"):
-                with st.spinner("Loading metric data..."):
-                    try:
-                        results = client.get_metric_rating(
-                            from_date=date_from.isoformat(),
-                            to_date=date_to.isoformat(),
-                            metric=metric,
-                            filter_below=threshold,
-                            filter_by="date"
-                        )
-                        display_comparison(results, metric, threshold)
-                    except Exception as e:
-                        st.error(f"Failed to load metric data: {str(e)}")
+                load_metric_data(client, metric, {
+                    "filter_by": "date",
+                    "from_date": date_from.isoformat(),
+                    "to_date": date_to.isoformat()
+                })
 
         elif filter_option == "Ship":
             # Ship selection
@@ -60,35 +60,73 @@ def show():
                 return
 
             if st.button("Load Metric Data"):
-                with st.spinner("Loading metric data..."):
-                    try:
-                        sailings = [SailingIdentifier(ship, "1") for ship in selected_ships]
-                        results = client.get_metric_rating(
-                            sailings=sailings,
-                            metric=metric,
-                            filter_below=threshold,
-                            filter_by="sailing"
-                        )
-                        display_comparison(results, metric, threshold)
-                    except Exception as e:
-                        st.error(f"Failed to load metric data: {str(e)}")
+                sailings = [SailingIdentifier(ship, "1") for ship in selected_ships]
+                load_metric_data(client, metric, {"filter_by": "sailing", "sailings": sailings})
 
-        
+    # Results are kept in session state so moving the threshold slider or
+    # paging through reviews (both rerun the script) does not require
+    # clicking "Load" again
+    if 'metric_results' in st.session_state:
+        results, loaded_metric, query = st.session_state.metric_results
+        display_comparison(client, results, loaded_metric, threshold, query)
+
+
+def load_metric_data(client, metric: str, query: Dict):
+    """
+    Fetch per-sailing rating distributions once for a metric and selection
+
+    No reviews are requested: the cumulative counts answer "how many ratings
+    are at or below the threshold" for every slider position, and review
+    text is fetched a page at a time by display_review_grid.
+
+    Args:
+        client: APIClient
+        metric: Metric to compare
+        query: Selection keyword arguments for the API client (filter_by and
+            either sailings or from_date/to_date)
+    """
+    with st.spinner("Loading metric data..."):
+        try:
+            results = client.get_metric_rating(metric=metric, include=["distribution"], **query)
+        except Exception as e:
+            st.error(f"Failed to load metric data: {str(e)}")
+            return
+    st.session_state.metric_results = (results, metric, query)
+    discard_export()
+    st.session_state.pop('review_page_data', None)
+    # Keywords are optional: the server only has them once build_keywords.py ran
+    try:
+        st.session_state.metric_keywords = client.get_top_keywords(metric=metric, **query)
+    except Exception:
+        st.session_state.metric_keywords = None
+
+
+def count_below(result: Dict, bins: List[float], threshold: float) -> int:
+    """Ratings of one sailing at or below threshold, from its cumulative counts"""
+    cumulative = (result.get('distribution') or {}).get('cumulative')
+    # The last bin edge <= threshold; bin i holds ratings in (bins[i - 1], bins[i]]
+    index = bisect_right(bins or [], threshold) - 1
+    if not cumulative or index < 0:
+        return 0
+    return int(cumulative[index])
 
-def display_comparison(results: Dict, metric: str, threshold: float):
+
+@timed("display_comparison")
+def display_comparison(client, results: Dict, metric: str, threshold: float, query: Dict):
     """Display metric comparison results in a tabular format with actionable reviews"""
     st.subheader(f"Comparison Results for: {metric}")
     st.caption(f"Showing ratings below threshold: {threshold}")
     
-    # Convert results to DataFrame
+    # Convert results to DataFrame; threshold counts come from the distributions
+    bins = results.get('distributionBins')
     df = pd.DataFrame([{
         'Ship': r['ship'],
         'Sailing Number': r['sailingNumber'],
-        'Rating': r['filteredMetric'],
+        'Average Rating': r['averageRating'],
         'Rating Count': int(r['ratingCount']),
-        'Below Threshold': int(r['filteredCount']),
-        'Reviews': r['filteredReviews']
-    } for r in results['results']])
+        'Below Threshold': count_below(r, bins, threshold)
+    } for r in results['results']],
+        columns=['Ship', 'Sailing Number', 'Average Rating', 'Rating Count', 'Below Threshold'])
     
     # Display summary metrics
     col1, col2, col3 = st.columns(3)
@@ -99,10 +137,16 @@ def display_comparison(results: Dict, metric: str, threshold: float):
     with col3:
         st.metric("Total Below Threshold", df['Below Threshold'].sum())
     
+    display_distribution(results, threshold)
+
+    display_top_complaints(st.session_state.get('metric_keywords'))
+
     # Main comparison table
     st.write("### Review Analysis")
+    st.dataframe(df, use_container_width=True, hide_index=True)
     
-    if df['Below Threshold'].sum() == 0:
+    total = int(df['Below Threshold'].sum())
+    if total == 0:
         st.success(f"No reviews found below {threshold} rating threshold")
         return
     
@@ -111,33 +155,186 @@ def display_comparison(results: Dict, metric: str, threshold: float):
         st.session_state.flagged_reviews = {}
     if 'resolved_reviews' not in st.session_state:
         st.session_state.resolved_reviews = {}
-    
-    # Create expanded table view
-    review_data = []
-    for _, row in df.iterrows():
-        for i, review in enumerate(row['Reviews'], 1):
-            # print(i)
-            review_id = f"{row['Ship']}_{row['Sailing Number']}_{i}"
-            review_data.append({
-                'Ship': row['Ship'],
-                'Sailing Number': row['Sailing Number'],
-                'Rating': row['Rating'][i-1],
-                'Review Excerpt': (review[:50] + '...') if len(review) > 50 else review,
-                'Full Review': review,
-                'ID': review_id,
-                'Flagged': st.session_state.flagged_reviews.get(review_id, False),
-                'Resolved': st.session_state.resolved_reviews.get(review_id, False)
-            })
-    
-    reviews_df = pd.DataFrame(review_data)
-    reviews_df = reviews_df.sort_values(by="Rating", ascending=True)
-        
-    # Store the sorted DataFrame in session state
-    st.session_state.reviews_df = reviews_df
 
-# Display table manually with expanders inline
+    display_review_grid(client, metric, threshold, query, total)
+
+    display_export_controls(client, metric, threshold, query)
+
+
+def display_distribution(results: Dict, threshold: float):
+    """Rating histogram per ship with the threshold marked, plus rating quantiles"""
+    bins = results.get('distributionBins')
+    rows = [r for r in results['results'] if r.get('distribution')]
+    if not bins or not rows:
+        return
+
+    st.write("### Rating Distribution")
+    counts_df = pd.DataFrame([
+        {'Ship': r['ship'], 'Rating': rating, 'Reviews': count}
+        for r in rows
+        for rating, count in zip(bins, r['distribution']['counts'])
+    ])
+    fig = px.bar(counts_df, x='Rating', y='Reviews', color='Ship', barmode='group')
+    fig.add_vline(x=threshold + 0.25, line_dash="dash", line_color="red",
+                  annotation_text=f"Threshold {threshold}")
+    st.plotly_chart(fig, use_container_width=True)
+
+    levels = results.get('quantileLevels') or []
+    quantiles_df = pd.DataFrame(
+        [r['distribution']['quantiles'] for r in rows],
+        index=[r['ship'] for r in rows],
+        columns=[f"P{round(level * 100)}" for level in levels]
+    )
+    st.dataframe(quantiles_df, use_container_width=True)
+
+
+def display_top_complaints(keywords: Dict):
+    """Most mentioned complaint phrases across the selection, then per ship"""
+    if not keywords or not keywords['combined']:
+        return
+
+    st.write("### Top Complaints")
+    st.caption(f"Phrases that stand out in reviews rated {keywords['threshold']} or lower "
+               f"(built {keywords['built']})")
+    combined_df = pd.DataFrame(keywords['combined'])
+    fig = px.bar(combined_df, x='mentions', y='phrase', orientation='h',
+                 labels={'mentions': 'Reviews mentioning', 'phrase': ''})
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+    st.plotly_chart(fig, use_container_width=True)
+
+    for result in keywords['results']:
+        if not result['keywords']:
+            continue
+        with st.expander(f"{result['ship']} ({result['complaintReviews']} complaints)"):
+            st.write(", ".join(f"{k['phrase']} ({k['mentions']})" for k in result['keywords']))
+
+
+def build_reviews_frame(results: List[Dict], flagged: Dict, resolved: Dict) -> pd.DataFrame:
+    """
+    Turn per-sailing API results into one long, rating-sorted reviews table
+
+    Args:
+        results: The 'results' list from a getMetricRating response
+        flagged: Mapping of review ID to flagged state
+        resolved: Mapping of review ID to resolved state
+
+    Returns:
+        DataFrame with one row per filtered review and the columns
+        Ship, Sailing Number, Rating, Review Excerpt, Full Review, ID,
+        Flagged and Resolved
+    """
+    columns = ['Ship', 'Sailing Number', 'Rating', 'Review Excerpt',
+               'Full Review', 'ID', 'Flagged', 'Resolved']
+    wide = pd.DataFrame(
+        results,
+        columns=['ship', 'sailingNumber', 'filteredReviews', 'filteredMetric']
+    )
+    # Empty lists explode to NaN rows, which are dropped straight away
+    long_df = wide.explode(['filteredReviews', 'filteredMetric']).dropna(subset=['filteredReviews'])
+    if long_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # 1-based position of each review within its sailing, as used in the review ID
+    position = long_df.groupby(level=0).cumcount() + 1
+    reviews = long_df['filteredReviews'].astype(str)
+    excerpts = reviews.str.slice(0, 50)
+    ids = (long_df['ship'].astype(str) + '_'
+           + long_df['sailingNumber'].astype(str) + '_'
+           + position.astype(str))
+
+    reviews_df = pd.DataFrame({
+        'Ship': long_df['ship'],
+        'Sailing Number': long_df['sailingNumber'],
+        'Rating': long_df['filteredMetric'].astype(float),
+        'Review Excerpt': excerpts.where(reviews.str.len() <= 50, excerpts + '...'),
+        'Full Review': reviews,
+        'ID': ids,
+        'Flagged': ids.map(flagged).fillna(False).astype(bool),
+        'Resolved': ids.map(resolved).fillna(False).astype(bool)
+    }, columns=columns)
+    return reviews_df.sort_values(by="Rating", ascending=True, kind="mergesort", ignore_index=True)
+
+
+def fetch_review_page(client, metric: str, threshold: float, query: Dict,
+                      order: str, offset: int, limit: int) -> pd.DataFrame:
+    """
+    One page of reviews at or below threshold, as a review grid frame
+
+    The last page fetched is kept in session state, so reruns that do not
+    change the page (expanding a review, moving another widget) reuse it.
+    """
+    key = (metric, threshold, order, offset, limit)
+    cached = st.session_state.get('review_page_data')
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    page = client.get_metric_reviews(metric=metric, filter_below=threshold, offset=offset,
+                                     limit=limit, order=order, **query)
+    reviews = pd.DataFrame(page['reviews'], columns=['id', 'ship', 'sailingNumber', 'rating', 'review'])
+    text = reviews['review'].astype(str)
+    excerpts = text.str.slice(0, 50)
+    page_df = pd.DataFrame({
+        'Ship': reviews['ship'],
+        'Sailing Number': reviews['sailingNumber'],
+        'Rating': reviews['rating'].astype(float),
+        'Review Excerpt': excerpts.where(text.str.len() <= 50, excerpts + '...'),
+        'Full Review': text,
+        'ID': reviews['id']
+    })
+    st.session_state.review_page_data = (key, page_df)
+    return page_df
+
+
+def display_review_grid(client, metric: str, threshold: float, query: Dict, total: int):
+    """
+    Render the review table one page at a time
+
+    The page count comes from the distribution counts; only the reviews of
+    the visible page are requested (getMetricReviews), so both the payload
+    and the widgets sent to the browser are bounded by the page size rather
+    than by the number of reviews below the threshold.
+    """
+    ctrl_cols = st.columns(3)
+    with ctrl_cols[0]:
+        sort_order = st.selectbox(
+            "Sort by rating",
+            options=["Lowest first", "Highest first"],
+            key="review_sort_order"
+        )
+    with ctrl_cols[1]:
+        page_size = st.selectbox(
+            "Rows per page",
+            options=REVIEW_PAGE_SIZES,
+            index=1,
+            key="review_page_size"
+        )
+
+    page_count = max(1, math.ceil(total / page_size))
+    # A new result set or a larger page size can leave the stored page out of range
+    if st.session_state.get("review_page", 1) > page_count:
+        st.session_state.review_page = 1
+    with ctrl_cols[2]:
+        page = st.number_input(
+            "Page",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key="review_page"
+        )
+
+    start = (int(page) - 1) * page_size
+    try:
+        # The server sorts stably, keeping ship order for equal ratings
+        page_df = fetch_review_page(client, metric, threshold, query,
+                                    "asc" if sort_order == "Lowest first" else "desc",
+                                    start, page_size)
+    except Exception as e:
+        st.error(f"Failed to load reviews: {str(e)}")
+        return
+    st.caption(f"Showing reviews {start + 1}-{start + len(page_df)} of {total} (page {int(page)} of {page_count})")
+
     # Create a header row
-    header_cols = st.columns([2, 2, 1, 2])  # Adjust column widths as needed
+    header_cols = st.columns([2, 2, 1, 4])  # Adjust column widths as needed
     with header_cols[0]:
         st.markdown("**Ship**")
     with header_cols[1]:
@@ -146,9 +343,9 @@ def display_comparison(results: Dict, metric: str, threshold: float):
         st.markdown("**Rating**")
     with header_cols[3]:
         st.markdown("**Review Excerpt**")
-    
-    # Display each row with an expander for the full review
-    for idx, row in reviews_df.iterrows():
+
+    # Display each visible row with an expander for the full review
+    for _, row in page_df.iterrows():
         with st.container():
             cols = st.columns([2, 2, 1, 4])  # Same column widths as header
             with cols[0]:
@@ -168,14 +365,64 @@ def display_comparison(results: Dict, metric: str, threshold: float):
                         key=f"full_review_{row['ID']}"  # Unique key for each text area
                     )
 
-    
-    # Add download button
-    st.download_button(
-        label="📥 Download Review Data",
-        data=reviews_df.drop(columns=['Full Review']).to_csv(index=False).encode('utf-8'),
-        file_name=f"{metric}_reviews_below_{threshold}.csv",
-        mime="text/csv"
-    )
+def display_export_controls(client, metric: str, threshold: float, query: Dict):
+    """
+    Offer the reviews table for download
+
+    The reviews below the threshold are only fetched and serialized when
+    "Prepare Export" is clicked, not on every rerun, and are written chunk
+    by chunk into a spooled file. The download itself is not streamed:
+    st.download_button reads the whole file into memory on every rerun
+    while the export is offered.
+    """
+    with st.expander("📥 Export Review Data"):
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox("Format", options=available_formats(), key="export_format")
+        with col2:
+            include_full_text = st.checkbox("Include full review text", key="export_full_text")
+
+        # A prepared export only matches the settings it was built with
+        settings = (metric, threshold, query, export_format, include_full_text)
+        prepared = st.session_state.get('review_export')
+        if prepared is not None and prepared[3] != settings:
+            discard_export()
+
+        if st.button("Prepare Export"):
+            with st.spinner("Preparing export..."):
+                try:
+                    results = client.get_metric_rating(metric=metric, filter_below=threshold, **query)
+                except Exception as e:
+                    st.error(f"Failed to load reviews for export: {str(e)}")
+                    return
+                reviews_df = build_reviews_frame(
+                    results['results'],
+                    st.session_state.flagged_reviews,
+                    st.session_state.resolved_reviews
+                )
+                discard_export()
+                st.session_state.review_export = (
+                    build_export(reviews_df, export_format, include_full_text),
+                    export_file_name(metric, threshold, export_format),
+                    EXPORT_FORMATS[export_format]["mime"],
+                    settings
+                )
+
+        if 'review_export' in st.session_state:
+            export_fh, file_name, mime, _ = st.session_state.review_export
+            export_fh.seek(0)  # the download button reads the whole file on every rerun
+            st.download_button(
+                label="📥 Download Review Data",
+                data=export_fh,
+                file_name=file_name,
+                mime=mime
+            )
+
+def discard_export():
+    """Drop the prepared export, closing its file so a spooled one is deleted"""
+    prepared = st.session_state.pop('review_export', None)
+    if prepared is not None:
+        prepared[0].close()
 
 # Temporary action functions
 def flag_review(review_id: str):
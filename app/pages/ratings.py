@@ -1,5 +1,6 @@
 import streamlit as st
 from ..utils import get_client, display_ship_selector
+from ..perf import timed
 from typing import List, Dict
 from services.api_client import SailingIdentifier
 import numpy as np
@@ -83,6 +84,7 @@ def show():
                         st.error(f"Failed to load ratings data: {str(e)}")
 
 
+@timed("display_ratings")
 def display_ratings(client, data: List[Dict]):
     # Implementation of ratings visualization
     app_config = client.config["app"]
@@ -0,0 +1,95 @@
+import streamlit as st
+from ..utils import get_client
+from ..perf import timed
+from typing import Dict
+import pandas as pd
+import math
+
+# Results per page of the search table
+SEARCH_PAGE_SIZE = 20
+
+
+def show():
+    st.title("🔎 Review Search")
+
+    client = get_client()
+
+    with st.form("review_search"):
+        query = st.text_input("Search review comments", placeholder='e.g. "air con" or "buffet"')
+
+        col1, col2 = st.columns(2)
+        with col1:
+            metrics = client.get_valid_metrics()
+            metric = st.selectbox("Metric", options=["All metrics"] + metrics)
+        with col2:
+            try:
+                ship_options = client.get_available_ships()
+            except Exception as e:
+                st.error(f"Failed to load ships: {str(e)}")
+                ship_options = []
+            ships = st.multiselect("Ships (all when empty)", options=ship_options)
+
+        use_dates = st.checkbox("Restrict to a date range")
+        col1, col2 = st.columns(2)
+        with col1:
+            date_from = st.date_input("From Date")
+        with col2:
+            date_to = st.date_input("To Date")
+
+        submitted = st.form_submit_button("Search")
+
+    if submitted:
+        if not query.strip():
+            st.warning("Please enter search terms")
+            return
+        st.session_state.review_search = {
+            "query": query,
+            "metric": None if metric == "All metrics" else metric,
+            "ships": ships,
+            "from_date": date_from.isoformat() if use_dates else None,
+            "to_date": date_to.isoformat() if use_dates else None,
+        }
+        st.session_state.review_search_page = 1
+
+    # The search is kept in session state so paging (which reruns the
+    # script) does not require submitting the form again
+    if 'review_search' in st.session_state:
+        display_results(client, st.session_state.review_search)
+
+
+@timed("display_search_results")
+def display_results(client, search: Dict):
+    """Show one page of search results, best match first"""
+    page = st.session_state.get("review_search_page", 1)
+    try:
+        response = client.search_reviews(
+            offset=(page - 1) * SEARCH_PAGE_SIZE,
+            limit=SEARCH_PAGE_SIZE,
+            **search
+        )
+    except Exception as e:
+        st.error(f"Search failed: {str(e)}")
+        return
+
+    total = response["total"]
+    if total == 0:
+        st.info(f"No reviews mention \"{search['query']}\"")
+        return
+
+    page_count = max(1, math.ceil(total / SEARCH_PAGE_SIZE))
+    st.caption(f"{total} matching reviews (page {page} of {page_count})")
+
+    results_df = pd.DataFrame(response["results"],
+                              columns=["ship", "sailingNumber", "metric", "rating", "review", "score"])
+    results_df.columns = ["Ship", "Sailing Number", "Metric", "Rating", "Review", "Score"]
+    st.dataframe(results_df, use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("Previous", disabled=page <= 1):
+            st.session_state.review_search_page = page - 1
+            st.rerun()
+    with col2:
+        if st.button("Next", disabled=page >= page_count):
+            st.session_state.review_search_page = page + 1
+            st.rerun()
@@ -0,0 +1,135 @@
+import functools
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+from services.api_client import CallRecord
+
+# Entries of each kind kept in session state across reruns
+PERF_HISTORY_LIMIT = 500
+
+
+def _history(key: str) -> List[Dict]:
+    if key not in st.session_state:
+        st.session_state[key] = []
+    return st.session_state[key]
+
+
+def _append(key: str, entry: Dict):
+    history = _history(key)
+    history.append(entry)
+    if len(history) > PERF_HISTORY_LIMIT:
+        del history[:len(history) - PERF_HISTORY_LIMIT]
+
+
+def current_run() -> int:
+    return st.session_state.get("perf_run", 0)
+
+
+def start_run():
+    """Start a new script run; calls and spans are grouped by run in the panel"""
+    st.session_state.perf_run = current_run() + 1
+
+
+def record_api_call(record: CallRecord):
+    """APIClient call hook (see APIClient.add_call_hook)"""
+    _append("perf_api_calls", {"run": current_run(), **asdict(record)})
+
+
+@contextmanager
+def span(name: str):
+    """Time a block of rendering code"""
+    started_at, started = time.time(), time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        _append("perf_spans", {
+            "run": current_run(),
+            "name": name,
+            "started_at": started_at,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+            "error": failed,
+        })
+
+
+def timed(name: Optional[str] = None):
+    """Decorator recording a span around every call of a display function"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def export_json() -> str:
+    """All recorded calls and spans as JSON for offline analysis"""
+    return json.dumps({
+        "exported_at": datetime.now().isoformat(timespec="seconds"),
+        "api_calls": _history("perf_api_calls"),
+        "spans": _history("perf_spans"),
+    }, indent=2)
+
+
+def display_performance_panel():
+    """Optional sidebar panel with the API calls and render spans of recent runs"""
+    if not st.sidebar.checkbox("Show performance panel", key="perf_panel"):
+        return
+
+    calls = pd.DataFrame(_history("perf_api_calls"))
+    spans = pd.DataFrame(_history("perf_spans"))
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        if calls.empty and spans.empty:
+            st.caption("Nothing recorded yet")
+            return
+
+        # The panel renders after the page, so the current run is complete
+        run = current_run()
+        last_calls = calls[calls["run"] == run] if not calls.empty else calls
+        last_spans = spans[spans["run"] == run] if not spans.empty else spans
+        col1, col2 = st.columns(2)
+        col1.metric("Network (this run)", f"{last_calls['latency_ms'].sum() if not last_calls.empty else 0:.0f} ms")
+        col2.metric("Rendering (this run)", f"{last_spans['duration_ms'].sum() if not last_spans.empty else 0:.0f} ms")
+
+        if not calls.empty:
+            st.markdown("**API calls**")
+            st.dataframe(
+                calls[["run", "method", "endpoint", "status", "latency_ms",
+                       "request_bytes", "response_bytes", "cache"]].iloc[::-1],
+                hide_index=True,
+                use_container_width=True
+            )
+            st.dataframe(
+                calls.groupby("endpoint")["latency_ms"]
+                .describe(percentiles=[0.5, 0.95])[["count", "mean", "50%", "95%", "max"]]
+                .round(1),
+                use_container_width=True
+            )
+        if not spans.empty:
+            st.markdown("**Render spans**")
+            st.dataframe(
+                spans[["run", "name", "duration_ms", "error"]].iloc[::-1],
+                hide_index=True,
+                use_container_width=True
+            )
+
+        st.download_button(
+            "📥 Export timings (JSON)",
+            data=export_json(),
+            file_name=f"perf_{datetime.now():%Y%m%d_%H%M%S}.json",
+            mime="application/json"
+        )
+        if st.button("Clear timings"):
+            st.session_state.perf_api_calls = []
+            st.session_state.perf_spans = []
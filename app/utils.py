@@ -1,10 +1,13 @@
 from services.api_client import APIClient, SailingIdentifier
 from typing import List, Optional
 import streamlit as st
+from .perf import record_api_call
 
 def get_client() -> APIClient:
     if 'api_client' not in st.session_state:
         st.session_state.api_client = APIClient()
+        # Feed every API call into the sidebar performance panel
+        st.session_state.api_client.add_call_hook(record_api_call)
     return st.session_state.api_client
 
 def display_ship_selector(multi: bool = False) -> Optional[List[str]]:
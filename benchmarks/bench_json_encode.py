@@ -0,0 +1,84 @@
+"""
+Benchmark for encoding a large getMetricRating response
+
+Builds a getMetricRating-shaped payload (long review strings, float32
+ratings as handlers produce them from the typed frames, the odd NaN) and
+times Flask's default provider against the providers in json_provider.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_json_encode --reviews 100000
+"""
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server_side"))
+from json_provider import OrjsonProvider, StdlibJSONProvider, orjson  # noqa: E402
+
+
+def make_response(n_reviews, n_sailings, seed=7):
+    """A getMetricRating body; filteredMetric holds NumPy float32 scalars"""
+    rng = random.Random(seed)
+    words = ["cabin", "buffet", "air", "con", "noisy", "staff", "friendly",
+             "pool", "cold", "food", "late", "excursion", "dirty", "queue"]
+    results = []
+    for idx in range(n_sailings):
+        count = n_reviews // n_sailings
+        reviews = [" ".join(rng.choice(words) for _ in range(rng.randint(4, 60))) for _ in range(count)]
+        results.append({
+            "ship": f"MDY2-{idx + 1}-{idx + 8}April",
+            "sailingNumber": "1",
+            "metric": "F&B Quality",
+            "averageRating": np.float32(7.25),
+            "ratingCount": count,
+            "filteredReviews": reviews,
+            "filteredMetric": list(np.asarray([rng.randint(0, 10) for _ in range(count)], dtype=np.float32)),
+            "filteredCount": count,
+            "comparisonToOverall": float("nan"),
+        })
+    return {
+        "status": "success",
+        "metric": "F&B Quality",
+        "results": results,
+        "filterBelow": 10,
+        "comparedToAverage": True,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=100_000)
+    parser.add_argument("--sailings", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    body = make_response(args.reviews, args.sailings)
+
+    # Flask's own provider cannot encode NumPy scalars; give it the plain
+    # Python floats a handler would have had to produce with .tolist()
+    plain_body = json.loads(StdlibJSONProvider(app).dumps(body))
+    providers = [("flask default (plain floats)", DefaultJSONProvider(app), plain_body),
+                 ("stdlib + numpy default", StdlibJSONProvider(app), body)]
+    if orjson is not None:
+        providers.append(("orjson", OrjsonProvider(app), body))
+
+    reference = json.loads(providers[1][1].dumps(body))
+    print(f"reviews={args.reviews} sailings={args.sailings}")
+    print(f"{'provider':>30} {'ms':>9} {'MiB':>7}")
+    for label, provider, payload in providers:
+        encoded = provider.dumps(payload)
+        assert json.loads(encoded) == reference, label
+        seconds = min(timeit.repeat(lambda: provider.dumps(payload), number=1, repeat=args.repeat))
+        print(f"{label:>30} {seconds * 1000:>9.1f} {len(encoded.encode()) / 2**20:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
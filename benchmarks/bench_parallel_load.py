@@ -0,0 +1,63 @@
+"""
+Benchmark for loading sailing folders sequentially vs with a process pool
+
+Writes synthetic sailing folders (rating + reason CSVs from
+synthetic_data.write_dataset) to a temporary directory, then
+times load_sailing_data_rate_reason against load_sailing_data_parallel
+for each folder count and worker count.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_parallel_load --folders 25 100 400 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server_side"))
+from synthetic_data import MAX_SAILINGS_PER_YEAR, write_dataset  # noqa: E402
+from test_data import load_sailing_data_parallel, load_sailing_data_rate_reason  # noqa: E402
+
+
+def write_folders(root, count, reviews, seed=11):
+    """
+    Write about count sailing folders with the given number of reviews each
+
+    One ship, with as many years as needed to stay within the weekly
+    sailings a year holds; count is rounded up to fill the years evenly.
+    """
+    years = -(-count // MAX_SAILINGS_PER_YEAR)
+    return write_dataset(root, ships=1, years=years, sailings_per_year=-(-count // years),
+                         reviews_per_sailing=reviews, seed=seed)
+
+
+def timed(func):
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folders", type=int, nargs="+", default=[25, 100, 400])
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--reviews", type=int, default=300, help="reviews per sailing")
+    args = parser.parse_args()
+
+    print(f"cores={os.cpu_count()} reviews/sailing={args.reviews}")
+    print(f"{'folders':>8} {'loader':>12} {'workers':>8} {'seconds':>9}")
+    for count in args.folders:
+        with tempfile.TemporaryDirectory() as root:
+            data_directs = write_folders(root, count, args.reviews)
+            seconds = timed(lambda: load_sailing_data_rate_reason(data_directs))
+            print(f"{count:>8} {'sequential':>12} {1:>8} {seconds:>9.2f}")
+            for workers in args.workers:
+                seconds = timed(lambda: load_sailing_data_parallel(data_directs, max_workers=workers))
+                print(f"{count:>8} {'parallel':>12} {workers:>8} {seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark for memory used by rating frames with and without the declared schema
+
+Writes synthetic sailing folders (see synthetic_data.write_dataset), then loads every
+rating CSV twice: once with a plain pd.read_csv and once with
+schemas.read_rating_csv. Prints the deep memory usage and load time of both.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_rating_memory --folders 100 --reviews 300
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server_side"))
+from schemas import read_rating_csv  # noqa: E402
+
+from benchmarks.bench_parallel_load import write_folders  # noqa: E402
+
+
+def rating_files(data_directs):
+    return [path for data_dir in data_directs
+            for path in sorted(glob.glob(os.path.join(data_dir, "*", "*.csv")))
+            if not path.endswith("_reason.csv")]
+
+
+def load_all(paths, reader):
+    started = time.perf_counter()
+    frames = [reader(path) for path in paths]
+    seconds = time.perf_counter() - started
+    return sum(int(df.memory_usage(deep=True).sum()) for df in frames), seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folders", type=int, default=100)
+    parser.add_argument("--reviews", type=int, default=300, help="reviews per sailing")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = rating_files(write_folders(root, args.folders, args.reviews))
+        untyped_bytes, untyped_seconds = load_all(paths, pd.read_csv)
+        typed_bytes, typed_seconds = load_all(paths, lambda path: read_rating_csv(path)[0])
+
+    print(f"files={len(paths)} reviews/sailing={args.reviews}")
+    print(f"{'reader':>16} {'MiB':>9} {'seconds':>9}")
+    print(f"{'pd.read_csv':>16} {untyped_bytes / 2**20:>9.2f} {untyped_seconds:>9.2f}")
+    print(f"{'read_rating_csv':>16} {typed_bytes / 2**20:>9.2f} {typed_seconds:>9.2f}")
+    print(f"memory reduction: {1 - typed_bytes / untyped_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
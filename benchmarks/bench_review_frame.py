@@ -0,0 +1,95 @@
+"""
+Benchmark for building the metric comparison reviews table
+
+Compares the original per-row loop with the vectorized
+``build_reviews_frame`` on synthetic getMetricRating results.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_review_frame --reviews 10000
+"""
+import argparse
+import random
+import timeit
+
+import pandas as pd
+
+from app.pages.metrics import build_reviews_frame
+
+
+def make_results(n_reviews: int, n_sailings: int = 20, seed: int = 7):
+    """Build getMetricRating-shaped results with n_reviews spread over n_sailings"""
+    rng = random.Random(seed)
+    words = ["cabin", "buffet", "air", "con", "noisy", "staff", "friendly",
+             "pool", "cold", "food", "late", "excursion", "dirty", "queue"]
+    per_sailing = [n_reviews // n_sailings] * n_sailings
+    per_sailing[0] += n_reviews - sum(per_sailing)
+
+    results = []
+    for idx, count in enumerate(per_sailing):
+        results.append({
+            "ship": f"MDY2-{idx + 1}-{idx + 8}April",
+            "sailingNumber": "1",
+            "filteredReviews": [
+                " ".join(rng.choice(words) for _ in range(rng.randint(4, 60)))
+                for _ in range(count)
+            ],
+            "filteredMetric": [float(rng.randint(0, 10)) for _ in range(count)],
+        })
+    return results
+
+
+def build_reviews_frame_loop(results, flagged, resolved):
+    """The original nested-loop construction, kept here as the baseline"""
+    df = pd.DataFrame([{
+        'Ship': r['ship'],
+        'Sailing Number': r['sailingNumber'],
+        'Rating': r['filteredMetric'],
+        'Reviews': r['filteredReviews']
+    } for r in results])
+
+    review_data = []
+    for _, row in df.iterrows():
+        for i, review in enumerate(row['Reviews'], 1):
+            review_id = f"{row['Ship']}_{row['Sailing Number']}_{i}"
+            review_data.append({
+                'Ship': row['Ship'],
+                'Sailing Number': row['Sailing Number'],
+                'Rating': row['Rating'][i-1],
+                'Review Excerpt': (review[:50] + '...') if len(review) > 50 else review,
+                'Full Review': review,
+                'ID': review_id,
+                'Flagged': flagged.get(review_id, False),
+                'Resolved': resolved.get(review_id, False)
+            })
+    reviews_df = pd.DataFrame(review_data)
+    return reviews_df.sort_values(by="Rating", ascending=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=10000)
+    parser.add_argument("--sailings", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = make_results(args.reviews, args.sailings)
+    flagged = {f"{results[0]['ship']}_1_{i}": True for i in range(1, 50)}
+    resolved = {f"{results[-1]['ship']}_1_{i}": True for i in range(1, 50)}
+
+    # Both builders must agree before timing them
+    expected = build_reviews_frame_loop(results, flagged, resolved).reset_index(drop=True)
+    actual = build_reviews_frame(results, flagged, resolved)
+    pd.testing.assert_frame_equal(
+        expected.sort_values("ID", kind="mergesort").reset_index(drop=True),
+        actual.sort_values("ID", kind="mergesort").reset_index(drop=True),
+        check_dtype=False
+    )
+
+    for name, func in [("loop", build_reviews_frame_loop), ("vectorized", build_reviews_frame)]:
+        best = min(timeit.repeat(lambda: func(results, flagged, resolved),
+                                 number=1, repeat=args.repeat))
+        print(f"{name:>10}: {best * 1000:8.1f} ms for {args.reviews} reviews")
+
+
+if __name__ == "__main__":
+    main()
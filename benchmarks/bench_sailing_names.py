@@ -0,0 +1,117 @@
+"""
+Benchmark for parsing sailing names
+
+Compares the original regex/strptime filename_date with the compiled,
+memoized parse_sailing_name over synthetic sailing names, both on a cold
+cache (every name distinct) and on a warm one (names repeated, as when the
+same sailings are summarized on every reload).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_sailing_names --names 100000
+"""
+import argparse
+import calendar
+import itertools
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server_side"))
+from sailing_names import parse_sailing_name  # noqa: E402
+
+
+def filename_date_regex(filename, dNumber, year=2025):
+    """The original implementation (without its prints), kept here as the baseline"""
+    if dNumber == 1:
+        match = re.match(r'MDY-(\d+[A-Za-z]*)-(\d+[A-Za-z]+)', filename)
+    else:
+        match = re.match(r'MDY2-(\d+[A-Za-z]*)-(\d+[A-Za-z]+)', filename)
+    if not match:
+        return None, None
+    start_part, end_part = match.groups()
+
+    def parse_date(part, month_hint=None):
+        try:
+            day = int(re.search(r'^\d+', part).group())
+            month_match = re.search(r'[A-Za-z]+', part)
+            month = month_match.group().capitalize() if month_match else month_hint
+            if not month:
+                raise ValueError(f"Missing month in: {part}")
+            month_map = {
+                'Jan': 'January', 'Feb': 'February', 'Mar': 'March', 'Apr': 'April',
+                'May': 'May', 'Jun': 'June', 'Jul': 'July', 'Aug': 'August',
+                'Sep': 'September', 'Oct': 'October', 'Nov': 'November', 'Dec': 'December'
+            }
+            full_month = month_map.get(month[:3], month)
+            return datetime.strptime(f"{day} {full_month} {year}", "%d %B %Y")
+        except Exception:
+            return None
+
+    end_month = re.search(r'[A-Za-z]+', end_part)
+    month_hint = end_month.group().capitalize() if end_month else None
+    start_date = parse_date(start_part, month_hint)
+    end_date = parse_date(end_part)
+    return (
+        start_date.strftime("%Y-%m-%d") if start_date else None,
+        end_date.strftime("%Y-%m-%d") if end_date else None
+    )
+
+
+def sailing_names():
+    """Every distinct formatted name from both prefixes, month spellings and layouts"""
+    for prefix, month, start, length, spelling in itertools.product(
+            ["MDY", "MDY2"], range(1, 13), range(1, 29), range(3, 9), ["abbr", "name"]):
+        month_name = (calendar.month_abbr if spelling == "abbr" else calendar.month_name)[month]
+        yield f"{prefix}-{start}-{min(start + length, 28)}{month_name}"
+
+
+def make_workload(count, distinct):
+    """count (name, dNumber, year) items; distinct names per year vary the cache key"""
+    names = list(itertools.islice(sailing_names(), distinct))
+    items = []
+    for year in itertools.count(2000):
+        for name in names:
+            items.append((name, 1 if name.startswith("MDY-") else 2, year))
+            if len(items) == count:
+                return items
+
+
+def timed(func, items):
+    started = time.perf_counter()
+    for name, d_number, year in items:
+        func(name, d_number, year)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, default=100_000)
+    parser.add_argument("--repeated", type=int, default=200,
+                        help="distinct names in the warm-cache workload")
+    args = parser.parse_args()
+
+    cold = make_workload(args.names, distinct=10**9)
+    warm = make_workload(args.names, distinct=args.repeated)
+    warm = [(name, d_number, 2025) for name, d_number, _ in warm]
+
+    # Both parsers must agree before timing them
+    for name, d_number, year in cold[:5000]:
+        parsed = parse_sailing_name(name, year)
+        assert filename_date_regex(name, d_number, year) == (parsed.start, parsed.end), name
+
+    def memoized(name, _, year):
+        return parse_sailing_name(name, year)
+
+    print(f"names={args.names}")
+    print(f"{'parser':>20} {'workload':>9} {'seconds':>9} {'names/s':>12}")
+    for label, workload in (("cold", cold), ("warm", warm)):
+        parse_sailing_name.cache_clear()
+        for parser_name, func in (("regex + strptime", filename_date_regex), ("parse_sailing_name", memoized)):
+            seconds = timed(func, workload)
+            print(f"{parser_name:>20} {label:>9} {seconds:>9.3f} {len(workload) / seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
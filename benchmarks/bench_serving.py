@@ -0,0 +1,149 @@
+"""
+Benchmark of throughput under the dev server vs preforked gunicorn workers
+
+Writes a synthetic dataset (synthetic_data.write_dataset), then serves it
+with the Werkzeug development server (what `python flask_comments.py`
+runs) and with serve.py at each worker count, waiting for /sailing/ready
+each time. Every server gets the same request mix as benchmarks.loadtest.
+
+Usage (from the repository root; needs gunicorn):
+    python -m benchmarks.bench_serving --workers 2 4 --concurrency 16 --requests 2000
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import date
+from pathlib import Path
+
+import yaml
+from werkzeug.security import generate_password_hash
+
+from benchmarks.loadtest import (DEFAULT_MIX, LOADTEST_PASSWORD, LOADTEST_USER, SERVER_SIDE, Client,
+                                 build_requests, parse_mix, run_level, server_memory)
+
+sys.path.insert(0, str(SERVER_SIDE))
+from sailing_names import format_sailing_name  # noqa: E402
+from schemas import METRIC_ATTRIBUTES  # noqa: E402
+from synthetic_data import write_dataset  # noqa: E402
+
+DEV_SERVER = "import flask_comments; flask_comments.app.run(host='127.0.0.1', port={port}, threaded=True)"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(base_url, process, timeout=600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode}")
+        try:
+            with urllib.request.urlopen(base_url + "/sailing/ready", timeout=5) as response:
+                return json.loads(response.read())
+        except (OSError, urllib.error.URLError):
+            time.sleep(0.5)
+    raise TimeoutError("Server did not become ready")
+
+
+def children_rss(pid):
+    """Summed RSS in MiB of pid and its direct children (the gunicorn workers)"""
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    values = [server_memory(p)[0] for p in pids]
+    return round(sum(v for v in values if v is not None), 1)
+
+
+def serve(label, command, env, workdir, requests, args):
+    port = free_port()
+    env = {**os.environ, **env, "PYTHONPATH": str(SERVER_SIDE), "SAILING_LOG_LEVEL": "WARNING"}
+    command = [part.format(port=port) for part in command]
+    env["SAILING_BIND"] = f"127.0.0.1:{port}"
+    process = subprocess.Popen(command, cwd=workdir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        started = time.perf_counter()
+        wait_ready(base_url, process)
+        startup = time.perf_counter() - started
+        client = Client(base_url)
+        run_level(client, requests, 1, args.warmup, None)
+        results = []
+        for concurrency in args.concurrency:
+            level = run_level(client, requests, concurrency, args.requests, None)
+            level.pop("endpoints")
+            results.append({"server": label, "startup_s": round(startup, 2),
+                            "rss_mib": children_rss(process.pid), **level})
+        return results
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ships", type=int, default=2)
+    parser.add_argument("--sailings-per-year", type=int, default=25)
+    parser.add_argument("--reviews", type=int, default=300, help="reviews per sailing")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({2, os.cpu_count() or 1}))
+    parser.add_argument("--threads", type=int, default=4, help="threads per gunicorn worker")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--no-cache", action="store_true", help="run the servers with the response cache off")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        roots = write_dataset(os.path.join(root, "data"), ships=args.ships,
+                              sailings_per_year=args.sailings_per_year, reviews_per_sailing=args.reviews)
+        # One parent path: joining thousands of roots overflows an environment string
+        env = {"SAILING_DATA_ROOTS": "", "SAILING_DATA_PARENT": os.path.join(root, "data")}
+        if args.no_cache:
+            env["SAILING_RESPONSE_CACHE_SIZE"] = "0"
+        # The app reads sailing_auth.yaml from its working directory
+        workdir = os.path.join(root, "run")
+        os.makedirs(workdir)
+        Path(workdir, "sailing_auth.yaml").write_text(yaml.safe_dump({"users": {LOADTEST_USER: {
+            "password": generate_password_hash(LOADTEST_PASSWORD), "role": "viewer"}}}))
+
+        names = [format_sailing_name(folder) for data_dir in roots for folder in sorted(os.listdir(data_dir))]
+        requests = build_requests(args.mix, names, METRIC_ATTRIBUTES, date(2025, 1, 1), date(2025, 12, 31),
+                                  200, LOADTEST_USER, LOADTEST_PASSWORD, 0)
+
+        servers = [("dev server", [sys.executable, "-c", DEV_SERVER], {})]
+        servers += [(f"gunicorn {workers}x{args.threads}", [sys.executable, str(SERVER_SIDE / "serve.py")],
+                     {"SAILING_WORKERS": str(workers), "SAILING_THREADS": str(args.threads)})
+                    for workers in args.workers]
+        results = []
+        for label, command, server_env in servers:
+            print(f"{label}...", file=sys.stderr)
+            results.extend(serve(label, command, {**env, **server_env}, workdir, requests, args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"cores={os.cpu_count()} sailings={len(names)} reviews/sailing={args.reviews}")
+    print(f"{'server':>16} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'RSS MiB':>8}")
+    for row in results:
+        latency = row["latency_ms"]
+        print(f"{row['server']:>16} {row['concurrency']:>5} {row['throughput_rps']:>8} "
+              f"{latency['p50']:>8} {latency['p99']:>8} {row['errors']:>7} {row['rss_mib']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark of fast-request latency while slow clients download large responses
+
+Serves a synthetic dataset with serve.py (gunicorn, threaded sync workers)
+and with asgi_app.py (uvicorn). Slow clients repeatedly request a large
+getMetricRating response and read it at a limited rate through a small
+receive buffer, like guests on a ship's satellite link; meanwhile fast
+clients send small getRatingSmry and ships requests. Under the sync
+server every slow download holds a worker thread until the last byte is
+written; under the ASGI server it only holds a socket.
+
+Usage (from the repository root; needs gunicorn, starlette and uvicorn):
+    python -m benchmarks.bench_slow_clients --slow 0 8 --fast 4 --duration 15
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_serving import free_port, wait_ready
+from benchmarks.loadtest import SERVER_SIDE, Client, latency_stats
+
+sys.path.insert(0, str(SERVER_SIDE))
+from sailing_names import format_sailing_name  # noqa: E402
+from synthetic_data import write_dataset  # noqa: E402
+
+
+def slow_download(port, body, rate, stop, downloads):
+    """Request body again and again, reading at most rate bytes per second"""
+    request = (f"POST /sailing/getMetricRating HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+               f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+               f"Connection: close\r\n\r\n").encode() + body
+    chunk = 4096
+    while not stop.is_set():
+        with socket.socket() as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, chunk)
+            sock.settimeout(120)
+            try:
+                sock.connect(("127.0.0.1", port))
+                sock.sendall(request)
+                while not stop.is_set():
+                    data = sock.recv(chunk)
+                    if not data:
+                        downloads.append(1)
+                        break
+                    time.sleep(len(data) / rate)
+            except OSError:
+                pass
+
+
+def fast_requests(client, requests, stop, results):
+    rng = random.Random(threading.get_ident())
+    while not stop.is_set():
+        method, path, body = rng.choice(requests)
+        started = time.perf_counter()
+        status, _ = client.request(method, path, body)
+        results.append(((time.perf_counter() - started) * 1000, status))
+
+
+def measure(port, big_body, small_requests, slow, args):
+    stop = threading.Event()
+    downloads, results = [], []
+    slow_threads = [threading.Thread(target=slow_download, args=(port, big_body, args.rate, stop, downloads),
+                                     daemon=True) for _ in range(slow)]
+    for thread in slow_threads:
+        thread.start()
+    # Let the slow downloads occupy the server before timing
+    time.sleep(args.settle if slow else 0)
+
+    client = Client(f"http://127.0.0.1:{port}", timeout=args.duration * 2)
+    fast_threads = [threading.Thread(target=fast_requests, args=(client, small_requests, stop, results),
+                                     daemon=True) for _ in range(args.fast)]
+    started = time.perf_counter()
+    for thread in fast_threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in fast_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done = [latency for latency, status in results if status == 200]
+    return {
+        "slow_clients": slow,
+        "fast_requests": len(done),
+        "fast_errors": len(results) - len(done),
+        "fast_rps": round(len(done) / elapsed, 1),
+        "fast_latency_ms": latency_stats(done),
+        "slow_downloads_completed": len(downloads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sailings-per-year", type=int, default=10)
+    parser.add_argument("--reviews", type=int, default=2000, help="reviews per sailing")
+    parser.add_argument("--slow", type=int, nargs="+", default=[0, 8], help="slow client counts")
+    parser.add_argument("--fast", type=int, default=4, help="fast clients")
+    parser.add_argument("--rate", type=int, default=64 * 1024, help="slow client bytes per second")
+    parser.add_argument("--duration", type=float, default=15, help="seconds of fast requests per run")
+    parser.add_argument("--settle", type=float, default=3, help="seconds between starting slow and fast clients")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="threads per gunicorn worker and ASGI handler threads")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        roots = write_dataset(os.path.join(root, "data"), ships=1, sailings_per_year=args.sailings_per_year,
+                              reviews_per_sailing=args.reviews)
+        names = [format_sailing_name(folder) for data_dir in roots for folder in sorted(os.listdir(data_dir))]
+        sailings = [{"shipName": name, "sailingNumber": "1"} for name in names]
+        # Every review at or below 10: the largest response getMetricRating can give
+        big_body = json.dumps({"filter_by": "sailing", "sailings": sailings, "metric": "F&B Quality",
+                               "filterBelow": 10}).encode()
+        small_requests = [("GET", "/sailing/ships", None)] + [
+            ("POST", "/sailing/getRatingSmry", json.dumps({"filter_by": "sailing", "sailings": [sailing]}))
+            for sailing in sailings]
+
+        workdir = os.path.join(root, "run")
+        os.makedirs(workdir)
+        servers = [
+            (f"gunicorn {args.workers}x{args.threads}", [sys.executable, str(SERVER_SIDE / "serve.py")]),
+            (f"asgi {args.threads} threads", [sys.executable, str(SERVER_SIDE / "asgi_app.py")]),
+        ]
+        results = []
+        for label, command in servers:
+            for slow in args.slow:
+                print(f"{label}, {slow} slow clients...", file=sys.stderr)
+                port = free_port()
+                env = {**os.environ, "PYTHONPATH": str(SERVER_SIDE), "SAILING_LOG_LEVEL": "WARNING",
+                       "SAILING_DATA_ROOTS": "", "SAILING_DATA_PARENT": os.path.join(root, "data"),
+                       "SAILING_BIND": f"127.0.0.1:{port}",
+                       "SAILING_WORKERS": str(args.workers), "SAILING_THREADS": str(args.threads),
+                       "SAILING_ASGI_THREADS": str(args.threads)}
+                process = subprocess.Popen(command, cwd=workdir, env=env,
+                                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                try:
+                    wait_ready(f"http://127.0.0.1:{port}", process)
+                    results.append({"server": label, **measure(port, big_body, small_requests, slow, args)})
+                finally:
+                    process.terminate()
+                    process.wait()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"slow client rate={args.rate} B/s, {args.fast} fast clients, {args.duration:g}s per run")
+    print(f"{'server':>20} {'slow':>5} {'fast req/s':>11} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7}")
+    for row in results:
+        latency = row["fast_latency_ms"]
+        print(f"{row['server']:>20} {row['slow_clients']:>5} {row['fast_rps']:>11} "
+              f"{latency.get('p50', '-'):>8} {latency.get('p99', '-'):>9} {row['fast_errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for holding sailing summaries as dicts vs a SummaryTable
+
+Builds synthetic summaries in the SAMPLE_DATA shape and reports the memory
+retained by the list of dicts and by the equivalent SummaryTable (measured
+with tracemalloc), plus the time to select a date range from each.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_summary_table --sailings 1000 10000 100000
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server_side"))
+from schemas import METRIC_ATTRIBUTES  # noqa: E402
+from summary_table import SummaryTable  # noqa: E402
+
+
+def make_summaries(count, seed=5):
+    rng = random.Random(seed)
+    summaries = []
+    for i in range(count):
+        start = date(2020, 1, 1) + timedelta(days=rng.randint(0, 2000))
+        summary = {metric: round(rng.uniform(2, 10), 2) for metric in METRIC_ATTRIBUTES}
+        summary.update({
+            "Ship Name": f"MDY{i % 7}-{start.day}-{(start + timedelta(days=7)).day}{start:%B}",
+            "Sailing Number": str(i),
+            "Start": start.isoformat(),
+            "End": (start + timedelta(days=7)).isoformat(),
+            "Fleet": "Marella",
+            "Ship": f"Ship {i % 7}",
+        })
+        summaries.append(summary)
+    return summaries
+
+
+def retained_bytes(build):
+    """Bytes still allocated after build() returns, with its result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sailings", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    from_date, to_date = pd.to_datetime("2021-01-01"), pd.to_datetime("2022-12-31")
+    print(f"{'sailings':>9} {'dicts MiB':>10} {'table MiB':>10} {'dicts ms':>9} {'table ms':>9}")
+    for count in args.sailings:
+        summaries, dict_bytes = retained_bytes(lambda: make_summaries(count))
+        table, table_bytes = retained_bytes(lambda: SummaryTable.from_records(summaries, METRIC_ATTRIBUTES))
+
+        started = time.perf_counter()
+        selected = [s for s in summaries
+                    if pd.to_datetime(s["Start"]) >= from_date and pd.to_datetime(s["End"]) <= to_date]
+        dict_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        rows = table.between(from_date, to_date)
+        table_ms = (time.perf_counter() - started) * 1000
+        assert len(selected) == len(rows)
+
+        print(f"{count:>9} {dict_bytes / 2**20:>10.2f} {table_bytes / 2**20:>10.2f} "
+              f"{dict_ms:>9.1f} {table_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+End-to-end load test of the Flask API against a synthetic dataset
+
+Starts flask_comments.app in a child process with a generated in-memory
+dataset (see server_side/synthetic_data.py; no sailing folders needed),
+then replays a deterministic mix of /getRatingSmry, /getMetricRating,
+/ships and /auth requests (and /getMetricReviews when named in --mix)
+at each concurrency level. Reports p50/p95/p99
+latency overall and per endpoint, throughput, errors and the server's RSS
+as JSON, tagged with the git commit so runs can be compared between commits.
+
+Usage (from the repository root):
+    python -m benchmarks.loadtest --sailings-per-year 50 --reviews 300 --concurrency 1 8 32
+    python -m benchmarks.loadtest --duration 30 --no-cache --output before.json
+    python -m benchmarks.loadtest --url http://localhost:5000 --username me --password secret
+"""
+import argparse
+import http.client
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+SERVER_SIDE = Path(__file__).resolve().parent.parent / "server_side"
+LOADTEST_USER = "loadtest"
+LOADTEST_PASSWORD = "loadtest-password"
+DEFAULT_MIX = "getRatingSmry=4,getMetricRating=3,ships=2,auth=1"
+PERCENTILES = (50, 95, 99)
+
+# Statuses each request kind may legitimately return; anything else is an error
+EXPECTED_STATUS = {
+    "getRatingSmry": {200},
+    "getMetricRating": {200},
+    "getMetricReviews": {200},
+    "ships": {200},
+    "auth": {200, 401},
+}
+
+
+def run_server(sizes, env, ready):
+    """
+    Child process: serve flask_comments.app with a synthetic snapshot
+
+    Runs in a scratch working directory (summary loading writes smry.json
+    to the cwd) with the data roots pointing at a path that does not exist,
+    so importing the app loads nothing before the synthetic snapshot is
+    swapped in.
+    """
+    os.environ.update(env)
+    workdir = tempfile.mkdtemp(prefix="sailing-loadtest-")
+    os.chdir(workdir)
+    sys.path.insert(0, str(SERVER_SIDE))
+
+    import yaml
+    from werkzeug.security import generate_password_hash
+    from werkzeug.serving import make_server
+
+    import flask_comments
+    from synthetic_data import build_synthetic_snapshot
+
+    started = time.perf_counter()
+    snapshot = build_synthetic_snapshot(flask_comments.METRIC_ATTRIBUTES,
+                                        version=flask_comments.STORE.current().version + 1, **sizes)
+    build_seconds = time.perf_counter() - started
+    flask_comments.STORE.swap(snapshot)
+
+    auth_file = Path(workdir) / "sailing_auth.yaml"
+    auth_file.write_text(yaml.safe_dump({"users": {LOADTEST_USER: {
+        "password": generate_password_hash(LOADTEST_PASSWORD), "role": "viewer"}}}))
+    flask_comments.AUTH_FILE = auth_file
+
+    server = make_server("127.0.0.1", 0, flask_comments.app, threaded=True)
+    ready.put({
+        "port": server.server_port,
+        "pid": os.getpid(),
+        "build_seconds": round(build_seconds, 3),
+        "sailings": len(snapshot.summary_table),
+        "reviews": sum(len(df) for df in snapshot.sailing_data.values()),
+    })
+    server.serve_forever()
+
+
+def start_server(sizes, no_cache):
+    env = {
+        "SAILING_DATA_ROOTS": os.path.join(tempfile.gettempdir(), "sailing-loadtest-no-data"),
+        "SAILING_DATA_PARENT": "",
+        "SAILING_LOG_LEVEL": "WARNING",
+    }
+    if no_cache:
+        env["SAILING_RESPONSE_CACHE_SIZE"] = "0"
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    process = context.Process(target=run_server, args=(sizes, env, ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=600)
+
+
+def server_memory(pid):
+    """Current and peak RSS of the server in MiB (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None, None
+    return tuple(round(int(fields[name].split()[0]) / 1024, 1) if name in fields else None
+                 for name in ("VmRSS", "VmHWM"))
+
+
+class Client:
+    """One keep-alive connection per worker thread"""
+
+    def __init__(self, base_url, timeout=60):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout)
+        return connection
+
+    def request(self, method, path, body=None):
+        """Returns (status, response bytes); status 0 on connection errors"""
+        connection = self._connection()
+        headers = {"Accept-Encoding": "gzip"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        try:
+            connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+            if response.will_close:
+                connection.close()
+            return response.status, len(payload)
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self._local.connection = None
+            return 0, 0
+
+    def get_json(self, path):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request("GET", self.prefix + path)
+            return json.loads(connection.getresponse().read())
+        finally:
+            connection.close()
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in EXPECTED_STATUS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}, expected one of {list(EXPECTED_STATUS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_requests(mix, sailings, metrics, first_day, last_day, pool, username, password, seed):
+    """
+    A deterministic pool of (kind, method, path, body) requests
+
+    Sailing selections, metrics and date ranges are drawn from the served
+    data, so the response cache sees repeats in proportion to the pool size.
+    """
+    rng = random.Random(seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=pool)
+    span_days = max((last_day - first_day).days, 1)
+
+    def pick_sailings(most):
+        return [{"shipName": name, "sailingNumber": "1"}
+                for name in rng.sample(sailings, min(len(sailings), rng.randint(1, most)))]
+
+    def date_filters():
+        start = first_day + timedelta(days=rng.randrange(span_days))
+        end = min(start + timedelta(days=rng.choice([30, 90, 180])), last_day)
+        return {"fromDate": start.isoformat(), "toDate": end.isoformat()}
+
+    requests = []
+    for kind in kinds:
+        if kind == "getRatingSmry":
+            if rng.random() < 0.5:
+                body = {"filter_by": "sailing", "sailings": pick_sailings(5)}
+            else:
+                body = {"filter_by": "date", "filters": date_filters()}
+            requests.append((kind, "POST", "/sailing/getRatingSmry", body))
+        elif kind == "getMetricRating":
+            body = {
+                "metric": rng.choice(metrics),
+                "filterBelow": rng.choice([None, 4, 6, 8]),
+                "compareToAverage": rng.random() < 0.5,
+            }
+            if rng.random() < 0.8:
+                body.update(filter_by="sailing", sailings=pick_sailings(3))
+            else:
+                body.update(filter_by="date", filters=date_filters())
+            requests.append((kind, "POST", "/sailing/getMetricRating", body))
+        elif kind == "getMetricReviews":
+            body = {
+                "metric": rng.choice(metrics),
+                "filterBelow": rng.choice([4, 6, 8, 10]),
+                "offset": rng.choice([0, 0, 0, 25, 50]),
+                "limit": 25,
+                "order": rng.choice(["asc", "desc"]),
+            }
+            if rng.random() < 0.8:
+                body.update(filter_by="sailing", sailings=pick_sailings(3))
+            else:
+                body.update(filter_by="date", filters=date_filters())
+            requests.append((kind, "POST", "/sailing/getMetricReviews", body))
+        elif kind == "ships":
+            requests.append((kind, "GET", "/sailing/ships", None))
+        else:
+            valid = rng.random() < 0.9
+            body = {"username": username, "password": password if valid else "wrong-password"}
+            requests.append((kind, "POST", "/sailing/auth", body))
+    return [(kind, method, path, json.dumps(body) if body is not None else None)
+            for kind, method, path, body in requests]
+
+
+def latency_stats(latencies_ms):
+    values = np.asarray(latencies_ms)
+    if not len(values):
+        return {}
+    stats = {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    stats.update(mean=round(float(values.mean()), 2), max=round(float(values.max()), 2))
+    return stats
+
+
+def run_level(client, requests, concurrency, total, duration):
+    """Replay the request pool round-robin with concurrency worker threads"""
+    sequence = itertools.count()
+    results = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker():
+        local = []
+        while True:
+            index = next(sequence)
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    break
+            elif index >= total:
+                break
+            kind, method, path, body = requests[index % len(requests)]
+            started = time.perf_counter()
+            status, size = client.request(method, path, body)
+            local.append((kind, (time.perf_counter() - started) * 1000, status, size))
+        with lock:
+            results.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    def summarize(rows):
+        errors = sum(1 for kind, _, status, _ in rows if status not in EXPECTED_STATUS[kind])
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "latency_ms": latency_stats([latency for _, latency, _, _ in rows]),
+            "response_bytes_mean": round(float(np.mean([size for *_, size in rows])), 1) if rows else None,
+        }
+
+    level = {"concurrency": concurrency, "duration_s": round(elapsed, 3),
+             "throughput_rps": round(len(results) / elapsed, 1) if elapsed else None}
+    level.update(summarize(results))
+    level["endpoints"] = {kind: summarize([row for row in results if row[0] == kind])
+                          for kind in sorted({row[0] for row in results})}
+    return level
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SERVER_SIDE.parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    dataset = parser.add_argument_group("synthetic dataset (ignored with --url)")
+    dataset.add_argument("--ships", type=int, default=2)
+    dataset.add_argument("--years", type=int, default=1)
+    dataset.add_argument("--sailings-per-year", type=int, default=25)
+    dataset.add_argument("--reviews", type=int, default=300, help="reviews per sailing")
+    dataset.add_argument("--review-words", type=int, default=20, help="mean words per review text")
+    dataset.add_argument("--seed", type=int, default=0)
+    load = parser.add_argument_group("load")
+    load.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    load.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    load.add_argument("--duration", type=float, help="seconds per level, instead of --requests")
+    load.add_argument("--warmup", type=int, default=20, help="untimed requests before the first level")
+    load.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                      help=f"endpoint weights (default {DEFAULT_MIX})")
+    load.add_argument("--pool", type=int, default=200,
+                      help="distinct requests to cycle through; smaller pools hit the response cache more")
+    load.add_argument("--no-cache", action="store_true", help="start the server with the response cache off")
+    load.add_argument("--url", help="load an already running server instead, e.g. http://localhost:5000")
+    load.add_argument("--username", default=LOADTEST_USER)
+    load.add_argument("--password", default=LOADTEST_PASSWORD)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    sizes = {"ships": args.ships, "years": args.years, "sailings_per_year": args.sailings_per_year,
+             "reviews_per_sailing": args.reviews, "review_words": args.review_words, "seed": args.seed}
+    process, server = None, {}
+    if args.url:
+        base_url = args.url
+    else:
+        print("Building synthetic dataset and starting server...", file=sys.stderr)
+        process, server = start_server(sizes, args.no_cache)
+        base_url = f"http://127.0.0.1:{server['port']}"
+
+    try:
+        client = Client(base_url)
+        sys.path.insert(0, str(SERVER_SIDE))
+        from schemas import METRIC_ATTRIBUTES
+        from sailing_names import parse_sailing_name
+
+        sailings = [ship["name"] for ship in client.get_json("/sailing/ships")["data"]]
+        # Names outside the naming scheme (parsed as None) have no dates to offer
+        parsed = [parse_sailing_name(name) for name in sailings]
+        days = [date.fromisoformat(day) for sailing in parsed if sailing is not None
+                for day in (sailing.start, sailing.end) if day]
+        first_day, last_day = (min(days), max(days)) if days else (date(2025, 1, 1), date(2025, 12, 31))
+        requests = build_requests(args.mix, sailings, METRIC_ATTRIBUTES, first_day, last_day,
+                                  args.pool, args.username, args.password, args.seed)
+
+        run_level(client, requests, 1, args.warmup, None)
+        levels = []
+        for concurrency in args.concurrency:
+            print(f"concurrency {concurrency}...", file=sys.stderr)
+            level = run_level(client, requests, concurrency, args.requests, args.duration)
+            if process is not None:
+                level["server_rss_mib"], level["server_peak_rss_mib"] = server_memory(process.pid)
+            levels.append(level)
+        cache = client.get_json("/sailing/cache/stats")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join()
+
+    report = {
+        "benchmark": "loadtest",
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "target": base_url if args.url else "local",
+        "dataset": None if args.url else {**sizes, **{k: server[k] for k in ("sailings", "reviews", "build_seconds")}},
+        "load": {"requests": None if args.duration else args.requests, "duration_s": args.duration,
+                 "warmup": args.warmup, "pool": args.pool, "mix": args.mix, "response_cache": not args.no_cache},
+        "levels": levels,
+        "cache": {key: cache.get(key) for key in ("enabled", "entries", "hits", "misses", "hitRate")},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
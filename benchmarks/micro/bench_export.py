@@ -0,0 +1,42 @@
+"""Serializing the reviews table for download, in every export format"""
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+# The export module lives in the Streamlit app package
+pytest.importorskip("streamlit")
+
+
+@pytest.fixture(scope="module")
+def reviews_df():
+    from app.pages.metrics import build_reviews_frame
+    from benchmarks.bench_review_frame import make_results
+
+    # Several times EXPORT_CHUNK_ROWS, so exports span several chunks/row groups
+    return build_reviews_frame(make_results(20000), {}, {})
+
+
+def read_export(fh, export_format):
+    if export_format == "Parquet":
+        return pd.read_parquet(fh)
+    data = fh.read()
+    if export_format == "CSV (gzip)":
+        data = gzip.decompress(data)
+    return pd.read_csv(io.BytesIO(data))
+
+
+@pytest.mark.parametrize("export_format", ["CSV", "CSV (gzip)", "Parquet"])
+def test_build_export(benchmark, reviews_df, export_format):
+    from app.export import build_export
+
+    if export_format == "Parquet":
+        pytest.importorskip("pyarrow")
+    fh = benchmark(build_export, reviews_df, export_format)
+    exported = read_export(fh, export_format)
+    fh.close()
+    assert list(exported.columns) == [c for c in reviews_df.columns if c != "Full Review"]
+    assert len(exported) == len(reviews_df)
+    assert exported["ID"].tolist() == reviews_df["ID"].tolist()
@@ -0,0 +1,35 @@
+"""find_sailings and both branches of filter_sailings, by summary table size"""
+import pandas as pd
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+def requested_sailings(snapshot, count):
+    names = snapshot.summary_table.meta["Ship Name"].tolist()
+    step = max(len(names) // count, 1)
+    return [{"shipName": name, "sailingNumber": "1"} for name in names[::step][:count]]
+
+
+@pytest.mark.parametrize("requested", [1, 10, 50])
+def test_find_sailings(benchmark, app_module, snapshot, requested):
+    sailings = requested_sailings(snapshot, requested)
+    found = benchmark(app_module.find_sailings, sailings, snapshot)
+    assert len(found) == min(requested, len(snapshot.summary_table))
+
+
+@pytest.mark.parametrize("requested", [1, 10, 50])
+def test_filter_sailings_by_sailing(benchmark, app_module, snapshot, requested):
+    data = {"filter_by": "sailing", "sailings": requested_sailings(snapshot, requested)}
+    rows = benchmark(app_module.filter_sailings, data, snapshot)
+    assert len(rows) == min(requested, len(snapshot.summary_table))
+
+
+@pytest.mark.parametrize("months", [1, 6, 12])
+def test_filter_sailings_by_date(benchmark, app_module, snapshot, months):
+    from_date = pd.Timestamp("2025-01-01")
+    to_date = from_date + pd.DateOffset(months=months)
+    data = {"filter_by": "date",
+            "filters": {"fromDate": from_date.date().isoformat(), "toDate": to_date.date().isoformat()}}
+    rows = benchmark(app_module.filter_sailings, data, snapshot)
+    assert len(rows) > 0
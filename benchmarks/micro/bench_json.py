@@ -0,0 +1,23 @@
+"""Encoding a getMetricRating-shaped response with each JSON provider"""
+import pytest
+from flask import Flask
+
+from benchmarks.bench_json_encode import make_response
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def provider(request):
+    from json_provider import json_provider_class, orjson
+
+    if request.param == "orjson" and orjson is None:
+        pytest.skip("orjson is not installed")
+    return json_provider_class(request.param)(Flask(__name__))
+
+
+@pytest.mark.parametrize("reviews", [1000, 10000, 100000])
+def test_encode_metric_rating(benchmark, provider, reviews):
+    body = make_response(reviews, 20)
+    encoded = benchmark(provider.dumps, body)
+    assert encoded.startswith("{")
@@ -0,0 +1,24 @@
+"""The per-sailing loop of getMetricRating, by reviews per sailing and sailings requested"""
+import pytest
+
+from conftest import synthetic_snapshot
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("filter_below", [4, 10])
+@pytest.mark.parametrize("requested", [1, 10])
+@pytest.mark.parametrize("reviews", [100, 1000])
+def test_get_metric_comparison(benchmark, app_module, reviews, requested, filter_below):
+    snapshot = synthetic_snapshot(1, 1, 10, reviews_per_sailing=reviews, review_words=8)
+    names = snapshot.summary_table.meta["Ship Name"].tolist()[:requested]
+    body = {
+        "filter_by": "sailing",
+        "sailings": [{"shipName": name, "sailingNumber": "1"} for name in names],
+        "metric": "F&B Quality",
+        "filterBelow": filter_below,
+        "compareToAverage": True,
+    }
+    payload, status = benchmark(app_module.metric_comparison, body, snapshot)
+    assert status == 200
+    assert len(payload["results"]) == requested
@@ -0,0 +1,51 @@
+"""Review search: building the per-sailing index and BM25 queries over a season"""
+import pytest
+
+from conftest import synthetic_snapshot
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("reviews", [100, 1000])
+def test_build_sailing_index(benchmark, reviews):
+    from schemas import METRIC_ATTRIBUTES
+    from search_index import SailingTextIndex
+
+    snapshot = synthetic_snapshot(1, 1, 1, reviews_per_sailing=reviews, review_words=20)
+    df_reason = next(iter(snapshot.sailing_reason.values()))
+    index = benchmark(SailingTextIndex.from_frame, df_reason, METRIC_ATTRIBUTES)
+    assert len(index) > 0
+
+
+@pytest.mark.parametrize("query,metric", [
+    ("buffet", None),
+    ("buffet", "F&B Quality"),
+    ("air con", None),
+    ("air con", "Cabins"),
+    ("cold food slow service", None),
+])
+def test_review_search(benchmark, app_module, query, metric):
+    snapshot = synthetic_snapshot(2, 1, 25, reviews_per_sailing=300, review_words=20)
+    body = {"query": query, "limit": 20}
+    if metric is not None:
+        body["metric"] = metric
+    payload, status = benchmark(app_module.review_search, body, snapshot)
+    assert status == 200
+    assert payload["total"] > 0
+
+
+
+def test_review_search_pages_through_ties():
+    """Paging through many equal BM25 scores returns every hit once, in one order"""
+    snapshot = synthetic_snapshot(2, 1, 25, reviews_per_sailing=300, review_words=20)
+    keys = list(snapshot.sailing_reason)
+    total, hits = snapshot.search_index.search("air con", keys, limit=100)
+    assert len({score for _, _, _, score in hits}) < len(hits)
+
+    paged = []
+    for offset in range(0, len(hits), 3):
+        page_total, page = snapshot.search_index.search("air con", keys, limit=min(3, len(hits) - offset),
+                                                        offset=offset)
+        assert page_total == total
+        paged.extend(page)
+    assert paged == hits
@@ -0,0 +1,55 @@
+"""Summary building (SummaryTable.from_records, impute_missing) and filename_date"""
+import numpy as np
+import pytest
+
+from conftest import synthetic_snapshot
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture(params=[100, 1000, 10000], ids=lambda size: f"summaries={size}")
+def summaries(request):
+    """Raw summaries repeated up to the size, with every fifth metric blanked for imputation"""
+    table = synthetic_snapshot(6, 2, 50).summary_table
+    records = table.to_records(restore_missing=True)
+    records = (records * (request.param // len(records) + 1))[:request.param]
+    return [{key: None if key in table.metric_index and (i + table.metric_index[key]) % 5 == 0 else value
+             for key, value in record.items()}
+            for i, record in enumerate(records)]
+
+
+def test_impute_missing(benchmark, summaries):
+    from schemas import METRIC_ATTRIBUTES
+    from summary_table import impute_missing
+
+    values = np.array([[s.get(m) for m in METRIC_ATTRIBUTES] for s in summaries], dtype=float)
+    filled, imputed = benchmark(impute_missing, values, METRIC_ATTRIBUTES)
+    assert not np.isnan(filled).any()
+    assert imputed.any()
+
+
+def test_summary_table_from_records(benchmark, summaries):
+    from schemas import METRIC_ATTRIBUTES
+    from summary_table import SummaryTable
+
+    table = benchmark(SummaryTable.from_records, summaries, METRIC_ATTRIBUTES)
+    assert len(table) == len(summaries)
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["cold", "warm"])
+@pytest.mark.parametrize("count", [100, 1000])
+def test_filename_date(benchmark, count, cached):
+    from sailing_names import parse_sailing_name
+    from test_data import filename_date
+
+    names = synthetic_snapshot(30, 2, 50).summary_table.meta["Ship Name"].tolist()[:count]
+
+    def parse_all():
+        return [filename_date(name, year=2025) for name in names]
+
+    if cached:
+        parse_all()
+        dates = benchmark(parse_all)
+    else:
+        dates = benchmark.pedantic(parse_all, setup=parse_sailing_name.cache_clear, rounds=50)
+    assert all(start is not None for start, _ in dates)
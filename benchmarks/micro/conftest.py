@@ -0,0 +1,75 @@
+"""
+pytest-benchmark microbenchmarks of the server hot paths
+
+Every benchmark is parametrized by data size and runs on synthetic data
+(server_side/synthetic_data.py), fully offline. The app is imported with
+its data roots pointing at an empty path and the response cache off, and
+each benchmark swaps in a snapshot of the size it needs.
+
+Usage (from this directory; needs pytest-benchmark):
+    python -m pytest                                   # run, print the table
+    python -m pytest --benchmark-autosave              # run and save a baseline
+    python -m pytest --benchmark-compare --benchmark-compare-fail=median:10%
+    python -m pytest -k filter_sailings                # one group only
+
+Saved runs go to .benchmarks/<machine>/NNNN_<commit>.json; --benchmark-compare
+compares against the latest one (or pass a run number), and
+--benchmark-compare-fail makes the run fail when a benchmark's median got
+more than 10% slower. Baselines are machine specific: compare on the box
+that saved them. run_baseline.py wraps this: it records
+baselines/<machine>.json on the first run and compares against it after.
+"""
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "server_side"))
+sys.path.insert(0, str(REPO_ROOT))
+
+# Must be set before flask_comments is imported
+os.environ.setdefault("SAILING_DATA_ROOTS", os.path.join(tempfile.gettempdir(), "sailing-bench-no-data"))
+os.environ.setdefault("SAILING_RESPONSE_CACHE_SIZE", "0")
+os.environ.setdefault("SAILING_LOG_LEVEL", "WARNING")
+
+# Summary table sizes, as (ships, years, sailings per year)
+SNAPSHOT_SIZES = {
+    "60": (1, 2, 30),
+    "600": (6, 2, 50),
+    "3000": (30, 2, 50),
+}
+
+
+@pytest.fixture(scope="session")
+def app_module(tmp_path_factory):
+    """flask_comments, imported from a scratch directory (summary loading writes smry.json to the cwd)"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    try:
+        import flask_comments
+    finally:
+        os.chdir(cwd)
+    return flask_comments
+
+
+@lru_cache(maxsize=None)
+def synthetic_snapshot(ships, years, sailings_per_year, reviews_per_sailing=5, review_words=3):
+    """Snapshots are built once per size and shared between benchmarks"""
+    from schemas import METRIC_ATTRIBUTES
+    from synthetic_data import build_synthetic_snapshot
+
+    return build_synthetic_snapshot(METRIC_ATTRIBUTES, version=1000, ships=ships, years=years,
+                                    sailings_per_year=sailings_per_year,
+                                    reviews_per_sailing=reviews_per_sailing, review_words=review_words)
+
+
+@pytest.fixture(params=list(SNAPSHOT_SIZES), ids=lambda size: f"sailings={size}")
+def snapshot(request, app_module):
+    """A snapshot of each summary table size, published as the app's current snapshot"""
+    snapshot = synthetic_snapshot(*SNAPSHOT_SIZES[request.param])
+    app_module.STORE.swap(snapshot)
+    return snapshot
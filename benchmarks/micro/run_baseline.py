@@ -0,0 +1,55 @@
+"""
+Record a baseline of the microbenchmark suite, or compare against it
+
+The baseline is a pytest-benchmark JSON file under baselines/, named after
+this machine (baselines are machine specific). The first run records it;
+later runs compare against it and exit non-zero when a benchmark's median
+got more than --fail-over slower.
+
+Usage (from this directory; needs pytest-benchmark):
+    python run_baseline.py                    # compare, or record when missing
+    python run_baseline.py --record           # (re)record the baseline
+    python run_baseline.py --fail-over 20%    # looser regression threshold
+    python run_baseline.py -- -k filter       # extra arguments go to pytest
+"""
+import argparse
+import platform
+import sys
+from pathlib import Path
+
+import pytest
+
+SUITE_DIR = Path(__file__).resolve().parent
+BASELINE_DIR = SUITE_DIR / "baselines"
+
+
+def baseline_path() -> Path:
+    """Baseline file of this machine"""
+    machine = f"{platform.node() or 'unknown'}-{platform.machine()}-py{sys.version_info[0]}{sys.version_info[1]}"
+    return BASELINE_DIR / f"{machine}.json"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--record", action="store_true", help="Record the baseline even if one exists")
+    parser.add_argument("--fail-over", default="10%", help="Median regression that fails the compare run")
+    parser.add_argument("pytest_args", nargs="*", help="Extra pytest arguments (after --)")
+    args = parser.parse_args(argv)
+
+    baseline = baseline_path()
+    if args.record or not baseline.exists():
+        baseline.parent.mkdir(parents=True, exist_ok=True)
+        print(f"Recording baseline {baseline}")
+        return pytest.main([str(SUITE_DIR), f"--benchmark-json={baseline}", *args.pytest_args])
+
+    print(f"Comparing against baseline {baseline}")
+    return pytest.main([
+        str(SUITE_DIR),
+        f"--benchmark-compare={baseline}",
+        f"--benchmark-compare-fail=median:{args.fail_over}",
+        *args.pytest_args,
+    ])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
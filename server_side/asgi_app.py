@@ -0,0 +1,212 @@
+"""
+ASGI variant of the sailing API (Starlette + uvicorn)
+
+Serves the same routes with the same JSON bodies as flask_comments, by
+calling its (data, snapshot) -> (payload, status) handlers. The pandas /
+NumPy work and the JSON encoding run in a thread pool; reading requests
+and writing responses happen on the event loop. A client that downloads a
+large getMetricRating response slowly therefore only holds a socket, not a
+worker thread, and cannot starve the other requests. The response cache,
+readiness, metrics and reload endpoints are shared with the Flask app.
+
+Errors match Flask too: a POST body that is not JSON gets werkzeug's HTML
+415 (wrong Content-Type) or 400 (malformed) page, /sailing/auth reads its
+body leniently like get_json(silent=True), and a handler exception is
+logged and answered with the HTML 500 page. Handler stages are timed into
+the same per-stage histograms.
+
+Configuration (environment):
+    SAILING_BIND          address to listen on (default 0.0.0.0:5000)
+    SAILING_ASGI_THREADS  threads for handler work (default: cores + 4, at most 32)
+plus every SAILING_* variable flask_comments reads.
+
+Usage (from server_side/; needs starlette and uvicorn):
+    python asgi_app.py
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.exceptions import BadRequest, HTTPException, InternalServerError, UnsupportedMediaType
+
+import flask_comments as api
+from instrumentation import PROMETHEUS_CONTENT_TYPE, stage_endpoint
+from response_cache import CachedResponse
+
+logger = logging.getLogger(__name__)
+
+BIND = os.environ.get("SAILING_BIND", "0.0.0.0:5000")
+THREADS = int(os.environ.get("SAILING_ASGI_THREADS", "0")) or min(32, (os.cpu_count() or 1) + 4)
+EXECUTOR = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix="sailing-handler")
+MIMETYPE = api.app.json.mimetype
+
+
+def encode(payload) -> bytes:
+    """Encode a payload exactly as jsonify does in the Flask app"""
+    return api.app.json.response(payload).get_data()
+
+
+def json_response(payload, status: int = 200) -> Response:
+    return Response(encode(payload), status_code=status, media_type=MIMETYPE)
+
+
+def http_error(exc: HTTPException) -> Response:
+    """werkzeug's HTML error page, as Flask sends for an unhandled HTTP error"""
+    return Response(exc.get_body(), status_code=exc.code, media_type="text/html")
+
+
+async def read_json(request, silent: bool = False):
+    """
+    Parse a request body like Flask's request.get_json(silent=silent)
+
+    Returns:
+        Tuple of (data, None), or (None, error response) when the body is
+        not JSON and silent is False
+    """
+    mimetype = request.headers.get("content-type", "").partition(";")[0].strip().lower()
+    if not (mimetype == "application/json"
+            or (mimetype.startswith("application/") and mimetype.endswith("+json"))):
+        if silent:
+            return None, None
+        return None, http_error(UnsupportedMediaType(
+            "Did not attempt to load JSON data because the request"
+            " Content-Type was not 'application/json'."))
+    try:
+        return api.app.json.loads(await request.body()), None
+    except ValueError:
+        return None, (None if silent else http_error(BadRequest()))
+
+
+def render(path, handler, data, snapshot, key):
+    """Run a handler and encode its payload; called in the thread pool"""
+    with stage_endpoint(path):
+        payload, status = handler(data, snapshot)
+        with api.timed_stage("serialize"):
+            body = encode(payload)
+    if key is not None and status == 200:
+        return api.RESPONSE_CACHE.put(key, body, MIMETYPE), status, "MISS"
+    return CachedResponse(body, None, MIMETYPE), status, None
+
+
+def entry_response(request, entry: CachedResponse, status: int, cache_status) -> Response:
+    """Response for an encoded body, gzipped when cached with gzip and the client accepts it"""
+    headers = {}
+    body = entry.body
+    if cache_status is not None:
+        if entry.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            body = entry.gzipped
+            headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        headers["X-Cache"] = cache_status
+    return Response(body, status_code=status, media_type=entry.mimetype, headers=headers)
+
+
+def route(path, handler, methods=("POST",), cached=True, silent=False):
+    """Starlette route serving one flask_comments handler; silent reads the body leniently"""
+    async def view(request):
+        if request.method == "POST":
+            data, error = await read_json(request, silent)
+            if error is not None:
+                return error
+            cache_data = data
+        else:
+            data = None
+            cache_data = {}
+            for name, value in request.query_params.multi_items():
+                cache_data.setdefault(name, []).append(value)
+
+        snapshot = api.STORE.current()
+        key = None
+        if cached and api.RESPONSE_CACHE.enabled and cache_data is not None:
+            key = api.RESPONSE_CACHE.key(path, cache_data, snapshot.version)
+            entry = api.RESPONSE_CACHE.get(key)
+            if entry is not None:
+                return entry_response(request, entry, 200, "HIT")
+
+        loop = asyncio.get_running_loop()
+        try:
+            entry, status, cache_status = await loop.run_in_executor(
+                EXECUTOR, partial(render, path, handler, data, snapshot, key))
+        except Exception:
+            logger.exception("Exception on %s [%s]", path, request.method)
+            return http_error(InternalServerError())
+        return entry_response(request, entry, status, cache_status)
+
+    return Route(path, instrumented(path, view), methods=list(methods))
+
+
+def instrumented(path, view):
+    """Record latency and response size like instrumentation.instrument_app does for Flask"""
+    async def wrapper(request):
+        started = time.perf_counter()
+        response = await view(request)
+        api.METRICS.request_latency.observe(time.perf_counter() - started, endpoint=path,
+                                            method=request.method, status=str(response.status_code))
+        api.METRICS.response_size.observe(len(response.body), endpoint=path)
+        return response
+    return wrapper
+
+
+async def check(request):
+    return Response("hi how are you", media_type="text/html")
+
+
+async def cache_stats(request):
+    return json_response({"status": "success", **api.RESPONSE_CACHE.stats()})
+
+
+async def metrics(request):
+    return Response(api.METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+async def reload_data(request):
+    status = api.admin_status(request.headers)
+    if status != 200:
+        return json_response({"error": "Not Found" if status == 404 else "Forbidden"}, status)
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(EXECUTOR, api.refresh_keywords)
+        result = await loop.run_in_executor(EXECUTOR, api.reload_snapshot)
+    except Exception as e:
+        return json_response({"status": "error", "error": f"Reload failed: {str(e)}"}, 500)
+    return json_response({"status": "success", **result})
+
+
+async def not_found(request, exc):
+    return json_response({"error": "Not Found"}, 404)
+
+
+app = Starlette(
+    routes=[
+        Route("/sailing/check", check),
+        route("/sailing/getRatingSmry", api.rating_summary),
+        route("/sailing/getMetricRating", api.metric_comparison),
+        route("/sailing/getMetricReviews", api.metric_reviews),
+        route("/sailing/searchReviews", api.review_search),
+        route("/sailing/getTopKeywords", api.top_keywords, cached=False),
+        route("/sailing/dashboard", api.dashboard),
+        route("/sailing/trends", api.trends),
+        route("/sailing/ships", api.ship_list, methods=("GET",)),
+        route("/sailing/auth", api.check_credentials, cached=False, silent=True),
+        route("/sailing/ready", api.readiness, methods=("GET",), cached=False),
+        Route("/sailing/metrics", metrics),
+        Route("/sailing/cache/stats", cache_stats),
+        Route("/sailing/admin/reload", reload_data, methods=["POST"]),
+    ],
+    exception_handlers={404: not_found},
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    logging.basicConfig(level=os.environ.get("SAILING_LOG_LEVEL", "INFO"),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    host, _, port = BIND.rpartition(":")
+    uvicorn.run(app, host=host or "0.0.0.0", port=int(port), server_header=False, access_log=False)
@@ -0,0 +1,252 @@
+"""
+Offline pipeline: top complaint keywords per (sailing, metric)
+
+Reads every sailing folder under the data roots and, for each metric,
+scores words and two-word phrases of the reason texts with TF-IDF:
+
+* the IDF is taken over all reviews of the metric, so words every guest
+  uses for it ("food" for F&B Quality) weigh little;
+* only phrases that complaint reviews (rating <= --threshold) use at least
+  --min-lift times as often as the metric's reviews overall are candidates,
+  so phrases that are common whatever the rating ("holiday", "crew") drop out;
+* a sailing's score for a candidate is its mean L2-normalized TF-IDF weight
+  over the sailing's complaint reviews.
+
+The counting is done with scipy.sparse matrices: one (reviews x phrases)
+count matrix per metric, and one sparse (sailings x reviews) product to
+sum the complaint rows of each sailing. The result is written as a
+gzipped JSON artifact that flask_comments loads at startup
+(SAILING_KEYWORDS_FILE, default keywords.json.gz in its working
+directory); a server that is running picks up a rebuilt file on
+/sailing/admin/reload.
+
+Usage (from server_side/):
+    python build_keywords.py --output keywords.json.gz
+    SAILING_DATA_ROOTS=/data/A:/data/B python build_keywords.py --threshold 5 --top 15
+    SAILING_DATA_PARENT=/data/synthetic python build_keywords.py
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from keywords import KEYWORDS_FORMAT
+from schemas import METRIC_ATTRIBUTES
+from search_index import STOP_WORDS, TOKEN_PATTERN
+from test_data import iter_sailing_folders, load_sailing_folders
+
+logger = logging.getLogger(__name__)
+
+# Reviews rated at or below this count as complaints
+COMPLAINT_THRESHOLD = 5.0
+# Phrases kept per (sailing, metric)
+TOP_KEYWORDS = 10
+# A phrase must appear in this many complaint reviews of a sailing to be kept
+MIN_MENTIONS = 2
+# ... and be this many times more frequent in complaints than in all reviews
+MIN_LIFT = 2.0
+# Search drops these as stop words, but they carry a complaint's meaning
+# ("not clean", "no towels"), so phrases keep them
+NEGATIONS = frozenset({"no", "not"})
+KEYWORD_STOP_WORDS = STOP_WORDS - NEGATIONS
+
+
+def review_phrases(text: str) -> List[str]:
+    """
+    Words of a review reason and the two-word phrases they form
+
+    Tokenized like search_index.tokenize, except that negations are kept.
+    A negation is never a phrase of its own, only the first word of one,
+    so "room not clean" gives "room", "clean" and "not clean".
+    """
+    words = [token for token in TOKEN_PATTERN.findall(text.lower().replace("'", ""))
+             if token not in KEYWORD_STOP_WORDS]
+    return ([word for word in words if word not in NEGATIONS]
+            + [f"{first} {second}" for first, second in zip(words, words[1:]) if second not in NEGATIONS])
+
+
+def metric_reviews(loaded: List[Tuple], metric: str) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Every non-empty reason given for metric, across all sailings
+
+    Returns:
+        Tuple of (texts, sailing number of each text (position in loaded),
+        rating of each text, NaN when the review did not rate the metric)
+    """
+    texts, owners, ratings = [], [], []
+    for number, (_, _, df_rating, df_reason) in enumerate(loaded):
+        if metric not in df_reason.columns:
+            continue
+        present = df_reason[metric].notna().to_numpy()
+        texts.extend(df_reason[metric][present].astype(str).tolist())
+        owners.append(np.full(int(present.sum()), number))
+        if metric in df_rating.columns:
+            ratings.append(df_rating[metric].to_numpy(dtype=np.float64, na_value=np.nan)[present])
+        else:
+            ratings.append(np.full(int(present.sum()), np.nan))
+    if not texts:
+        return [], np.zeros(0, dtype=np.intp), np.zeros(0)
+    return texts, np.concatenate(owners), np.concatenate(ratings)
+
+
+def tfidf_matrix(texts: List[str]) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    L2-normalized TF-IDF rows of texts
+
+    Returns:
+        Tuple of (reviews x phrases CSR matrix, phrase of each column)
+    """
+    phrase_lists = [review_phrases(text) for text in texts]
+    counts = np.fromiter(map(len, phrase_lists), dtype=np.int64, count=len(phrase_lists))
+    codes, phrases = pd.factorize(pd.Series(list(chain.from_iterable(phrase_lists)), dtype=object))
+    rows = np.repeat(np.arange(len(texts)), counts)
+    # Duplicate (row, phrase) entries are summed into term counts
+    tf = sparse.csr_matrix((np.ones(len(codes), dtype=np.float64), (rows, codes)),
+                           shape=(len(texts), len(phrases)))
+    tf.sum_duplicates()
+
+    document_frequency = np.bincount(tf.indices, minlength=len(phrases))
+    # Smoothed IDF, as in scikit-learn's TfidfTransformer
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    weighted = tf.multiply(idf[None, :]).tocsr()
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ weighted, np.asarray(phrases, dtype=object)
+
+
+def complaint_lift(matrix: sparse.csr_matrix, complaints: np.ndarray) -> np.ndarray:
+    """Share of complaint reviews using each phrase over the share of all reviews using it"""
+    everywhere = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    in_complaints = np.bincount(matrix[complaints].indices, minlength=matrix.shape[1])
+    return (in_complaints / len(complaints)) / (np.maximum(everywhere, 1) / matrix.shape[0])
+
+
+def top_phrases(scores: np.ndarray, mentions: np.ndarray, phrases: np.ndarray,
+                top: int, min_mentions: int) -> List[list]:
+    """
+    Best phrases of one sailing, as [phrase, score, mentions]
+
+    Two-word phrases win ties against their words, and a phrase that
+    repeats a word of a better ranked one is skipped ("repetitive menu"
+    makes "repetitive", "menu" and "quality repetitive" redundant), so
+    the list names distinct complaints. Negations do not count as shared
+    words, so "not clean" does not hide "not working".
+    """
+    eligible = np.flatnonzero(mentions >= min_mentions)
+    word_counts = np.array([phrases[column].count(" ") + 1 for column in eligible.tolist()])
+    # Candidates beyond top are only needed to replace skipped phrases
+    order = eligible[np.lexsort((-word_counts, -np.round(scores[eligible], 4)))][:top * 5]
+    chosen, covered = [], set()
+    for column in order.tolist():
+        phrase = phrases[column]
+        words = set(phrase.split(" ")) - NEGATIONS
+        if covered.intersection(words):
+            continue
+        covered.update(words)
+        chosen.append([phrase, round(float(scores[column]), 4), int(mentions[column])])
+        if len(chosen) == top:
+            break
+    return chosen
+
+
+def build_keywords(data_directs: Optional[List[str]] = None, metrics: List[str] = METRIC_ATTRIBUTES,
+                   threshold: float = COMPLAINT_THRESHOLD, top: int = TOP_KEYWORDS,
+                   min_mentions: int = MIN_MENTIONS, min_lift: float = MIN_LIFT,
+                   max_workers: Optional[int] = None) -> Dict:
+    """
+    Compute the keywords artifact for every sailing folder under the data roots
+
+    Args:
+        data_directs: Data roots to scan, defaults to DATA_DIRECTS
+        metrics: Metrics whose reasons are analysed
+        threshold: Reviews rated at or below this are complaints
+        top: Phrases kept per (sailing, metric)
+        min_mentions: Complaint reviews a phrase needs within a sailing
+        min_lift: How many times more often than in all reviews of the
+            metric a phrase must appear in its complaints
+        max_workers: Process pool size for CSV parsing (see load_sailing_folders)
+
+    Returns:
+        The artifact as a JSON-ready dictionary
+    """
+    loaded = load_sailing_folders(list(iter_sailing_folders(data_directs)), max_workers)
+    keys = [key for key, _, _, _ in loaded]
+    sailings: Dict[str, Dict[str, Dict]] = {key: {} for key in keys}
+
+    for metric in metrics:
+        texts, owners, ratings = metric_reviews(loaded, metric)
+        complaints = np.flatnonzero(ratings <= threshold)
+        if not len(complaints):
+            continue
+        matrix, phrases = tfidf_matrix(texts)
+        candidates = complaint_lift(matrix, complaints) >= min_lift
+        complaint_rows = matrix[complaints]
+        # (sailings x complaint reviews) indicator, to sum each sailing's rows
+        membership = sparse.csr_matrix(
+            (np.ones(len(complaints)), (owners[complaints], np.arange(len(complaints)))),
+            shape=(len(keys), len(complaints)))
+        review_counts = np.bincount(owners[complaints], minlength=len(keys))
+        totals = (membership @ complaint_rows).tocsr()
+        mentions = (membership @ (complaint_rows > 0).astype(np.float64)).tocsr()
+
+        for number in np.flatnonzero(review_counts).tolist():
+            start, end = totals.indptr[number], totals.indptr[number + 1]
+            columns = totals.indices[start:end]
+            columns = columns[candidates[columns]]
+            scores = totals[number].toarray().ravel()[columns] / review_counts[number]
+            mention_counts = mentions[number].toarray().ravel()[columns]
+            sailings[keys[number]][metric] = {
+                "reviews": int(review_counts[number]),
+                "keywords": top_phrases(scores, mention_counts, phrases[columns], top, min_mentions),
+            }
+
+    return {
+        "format": KEYWORDS_FORMAT,
+        "built": datetime.now().isoformat(timespec="seconds"),
+        "threshold": threshold,
+        "top": top,
+        "minMentions": min_mentions,
+        "minLift": min_lift,
+        "sailings": {key: entry for key, entry in sailings.items() if entry},
+    }
+
+
+def write_keywords(artifact: Dict, path: str):
+    """Write the artifact atomically, so a server never reads a half-written file"""
+    partial = f"{path}.tmp"
+    with gzip.open(partial, "wt", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(partial, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the top complaint keywords artifact")
+    parser.add_argument("--output", default=os.environ.get("SAILING_KEYWORDS_FILE", "keywords.json.gz"))
+    parser.add_argument("--threshold", type=float, default=COMPLAINT_THRESHOLD,
+                        help="reviews rated at or below this are complaints")
+    parser.add_argument("--top", type=int, default=TOP_KEYWORDS, help="phrases kept per sailing and metric")
+    parser.add_argument("--min-mentions", type=int, default=MIN_MENTIONS,
+                        help="complaint reviews a phrase needs within a sailing")
+    parser.add_argument("--min-lift", type=float, default=MIN_LIFT,
+                        help="how many times more frequent in complaints than overall a phrase must be")
+    parser.add_argument("--workers", type=int, help="processes for CSV parsing (default: cores)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.environ.get("SAILING_LOG_LEVEL", "INFO"),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    started = time.perf_counter()
+    artifact = build_keywords(threshold=args.threshold, top=args.top,
+                              min_mentions=args.min_mentions, min_lift=args.min_lift,
+                              max_workers=args.workers)
+    write_keywords(artifact, args.output)
+    logger.info("Wrote keywords for %d sailings to %s in %.1fs",
+                len(artifact["sailings"]), args.output, time.perf_counter() - started)
@@ -0,0 +1,137 @@
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from schemas import RATING_MAX, RATING_MIN
+
+# Ratings are binned on a 0.5 grid: bin i holds ratings in ((i - 1) / 2, i / 2],
+# bin 0 holds exactly RATING_MIN. With integer (or half-point) ratings each bin
+# is one rating value, and counts[:i + 1].sum() is the number of ratings <= i / 2.
+BIN_STEP = 0.5
+BIN_COUNT = int((RATING_MAX - RATING_MIN) / BIN_STEP) + 1
+BIN_EDGES = [RATING_MIN + BIN_STEP * i for i in range(BIN_COUNT)]
+QUANTILE_LEVELS = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95)
+
+
+def rating_bins(values: np.ndarray) -> np.ndarray:
+    """Bin index of every rating (values must not be NaN)"""
+    return np.clip(np.ceil((values - RATING_MIN) / BIN_STEP), 0, BIN_COUNT - 1).astype(np.intp)
+
+
+def threshold_bin(threshold: float) -> int:
+    """Last bin whose ratings are all <= threshold"""
+    return int(np.clip(np.floor((threshold - RATING_MIN) / BIN_STEP), -1, BIN_COUNT - 1))
+
+
+def sailing_distribution(df: pd.DataFrame, metrics: List[str]):
+    """
+    Histogram and quantiles of every metric of one sailing
+
+    Args:
+        df: Per-review ratings of the sailing
+        metrics: Metric columns, in output order; missing columns count as empty
+
+    Returns:
+        Tuple of (uint32 counts of shape (metrics, BIN_COUNT), float32
+        quantiles of shape (metrics, len(QUANTILE_LEVELS)), NaN where a
+        metric has no ratings)
+    """
+    values = df.reindex(columns=metrics).to_numpy(dtype=np.float32, na_value=np.nan)
+    present = ~np.isnan(values)
+    columns = np.broadcast_to(np.arange(len(metrics)), values.shape)[present]
+    flat = columns * BIN_COUNT + rating_bins(values[present])
+    counts = np.bincount(flat, minlength=len(metrics) * BIN_COUNT).reshape(len(metrics), BIN_COUNT)
+    return counts.astype(np.uint32), column_quantiles(values, present.sum(axis=0))
+
+
+def column_quantiles(values: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    np.nanquantile(values, QUANTILE_LEVELS, axis=0).T (linear interpolation)
+    for all columns at once
+
+    One sort (NaN goes last) and two gathers, instead of nanquantile's
+    per-column work.
+
+    Args:
+        values: (reviews x metrics) ratings with NaN for missing
+        valid: Non-NaN count of every column
+
+    Returns:
+        float32 array of shape (metrics, len(QUANTILE_LEVELS)), NaN for
+        columns without ratings
+    """
+    if not len(values):
+        return np.full((values.shape[1], len(QUANTILE_LEVELS)), np.nan, dtype=np.float32)
+    ordered = np.sort(values, axis=0)
+    last = np.maximum(valid - 1, 0)
+    position = np.asarray(QUANTILE_LEVELS)[:, None] * last
+    lower = np.floor(position).astype(np.intp)
+    upper = np.minimum(lower + 1, last)
+    low = np.take_along_axis(ordered, lower, axis=0).astype(np.float64)
+    high = np.take_along_axis(ordered, upper, axis=0).astype(np.float64)
+    quantiles = low + (high - low) * (position - lower)
+    quantiles[:, valid == 0] = np.nan
+    return quantiles.T.astype(np.float32)
+
+
+class MetricDistributions:
+    """
+    Rating histograms and quantiles of every (sailing, metric)
+
+    Built once per snapshot from the per-review frames, so distribution and
+    threshold-count questions are answered without touching the reviews.
+    Stored as two dense arrays indexed by sailing key row and metric column.
+    """
+    __slots__ = ("metrics", "metric_index", "row_index", "counts", "quantiles")
+
+    def __init__(self, metrics: List[str], row_index: Dict[str, int], counts: np.ndarray, quantiles: np.ndarray):
+        self.metrics = list(metrics)
+        self.metric_index = {metric: j for j, metric in enumerate(self.metrics)}
+        self.row_index = row_index
+        self.counts = counts
+        self.quantiles = quantiles
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame], metrics: List[str]) -> "MetricDistributions":
+        """
+        Args:
+            frames: Sailing key -> per-review ratings (snapshot.sailing_data)
+            metrics: Metric columns to summarize
+        """
+        keys = list(frames)
+        counts = np.zeros((len(keys), len(metrics), BIN_COUNT), dtype=np.uint32)
+        quantiles = np.full((len(keys), len(metrics), len(QUANTILE_LEVELS)), np.nan, dtype=np.float32)
+        for row, key in enumerate(keys):
+            counts[row], quantiles[row] = sailing_distribution(frames[key], metrics)
+        return cls(metrics, {key: row for row, key in enumerate(keys)}, counts, quantiles)
+
+    def __len__(self) -> int:
+        return len(self.row_index)
+
+    def histogram(self, key: str, metric: str) -> Optional[np.ndarray]:
+        """Counts per bin, or None when the sailing or metric is unknown"""
+        row = self.row_index.get(key)
+        column = self.metric_index.get(metric)
+        if row is None or column is None:
+            return None
+        return self.counts[row, column]
+
+    def count_below(self, key: str, metric: str, threshold: float) -> Optional[int]:
+        """Number of ratings <= threshold (exact for thresholds on the 0.5 grid)"""
+        counts = self.histogram(key, metric)
+        if counts is None:
+            return None
+        return int(counts[:threshold_bin(threshold) + 1].sum())
+
+    def to_dict(self, key: str, metric: str) -> Optional[Dict]:
+        """JSON-ready counts, cumulative counts and quantiles of one (sailing, metric)"""
+        counts = self.histogram(key, metric)
+        if counts is None:
+            return None
+        quantiles = self.quantiles[self.row_index[key], self.metric_index[metric]]
+        return {
+            "counts": counts.tolist(),
+            "cumulative": np.cumsum(counts).tolist(),
+            "quantiles": [None if np.isnan(q) else round(float(q), 2) for q in quantiles],
+        }
@@ -1,12 +1,32 @@
 from flask import Flask, request, jsonify, abort
 from typing import Dict, List
 from test_data import *
+from schemas import METRIC_ATTRIBUTES
+from summary_stats import dashboard_aggregates, trend_points, DASHBOARD_TREND_METRICS
+from rollups import query_trends
+from ingest import SnapshotStore, load_snapshot, start_watcher
+from json_provider import install_json_provider
+from response_cache import ResponseCache
+from distributions import BIN_EDGES, QUANTILE_LEVELS
+from keywords import combine_keywords, load_keywords
+from instrumentation import PROMETHEUS_CONTENT_TYPE, Registry, instrument_app, stage
+from functools import wraps
+import hmac
+import logging
+import threading
+import numpy as np
 import pandas as pd
 import yaml
+import os
 from werkzeug.security import check_password_hash
 from pathlib import Path
 
 app = Flask(__name__)
+# orjson when installed (SAILING_JSON_BACKEND=stdlib forces the stdlib encoder)
+install_json_provider(app)
+# Latency/size histograms for every request, scraped from /sailing/metrics
+METRICS = instrument_app(app, Registry())
+logger = logging.getLogger(__name__)
 
 METRIC_ATTRIBUTES_OLD = ['Ship overall', 'Ship rooms', 'F&B quality overall',
        'F&B service overall', 'F&B quality main dining', 'Entertainment',
@@ -14,12 +34,48 @@ METRIC_ATTRIBUTES_OLD = ['Ship overall', 'Ship rooms', 'F&B quality overall',
        'crew friendliness', 'Sentiment analysis', 'Primary issues mentioned',
        'Review']
 
-METRIC_ATTRIBUTES = ['Overall Holiday', 'Prior Customer Service', 'Flight', 'Embarkation/Disembarkation', 'Value for Money', 'App Booking', 'Pre-Cruise Hotel Accomodation', 'Cabins', 'Cabin Cleanliness', 'F&B Quality', 'F&B Service', 'Bar Service', 'Drinks Offerings and Menu', 'Entertainment', 'Excursions', 'Crew Friendliness', 'Ship Condition/Cleanliness (Public Areas)', 'Sentiment Score']
 
-
-# Sample data matching your structure
-SAMPLE_DATA = get_summary_data()
-# print(SAMPLE_DATA)
+# All served data (summaries, per-sailing DataFrames and the indexes derived
+# from them) lives in one snapshot that is swapped atomically on reload.
+# Handlers call STORE.current() once and use that snapshot throughout.
+# SAILING_LOAD_WORKERS sets the process pool size for the initial CSV load
+LOAD_WORKERS = int(os.environ.get("SAILING_LOAD_WORKERS", "0")) or None
+STORE = SnapshotStore(load_snapshot(METRIC_ATTRIBUTES, max_workers=LOAD_WORKERS), METRIC_ATTRIBUTES)
+# Optional polling for new sailing folders, in seconds (0 disables it)
+WATCH_INTERVAL = float(os.environ.get("SAILING_WATCH_INTERVAL", "0"))
+if WATCH_INTERVAL > 0:
+    start_watcher(STORE, WATCH_INTERVAL)
+# Called by /sailing/admin/reload; serve.py replaces it in preforked workers,
+# where the master process owns the data and reloads it for all of them
+reload_snapshot = STORE.refresh
+# Set by warm_up once the current snapshot has served each request path
+READY = threading.Event()
+# Version of the snapshot warm_up last ran against
+WARMED_VERSION = None
+# Shared secret for /sailing/admin/* endpoints; unset disables them (404)
+ADMIN_TOKEN = os.environ.get("SAILING_ADMIN_TOKEN")
+# Encoded responses of the read endpoints, keyed by canonical request body and
+# data version (SAILING_RESPONSE_CACHE_SIZE=0 disables caching)
+RESPONSE_CACHE = ResponseCache(
+    max_entries=int(os.environ.get("SAILING_RESPONSE_CACHE_SIZE", "256")),
+    max_bytes=int(os.environ.get("SAILING_RESPONSE_CACHE_MB", "64")) * 1024 * 1024,
+)
+for _name, _type, _help, _stat in [
+    ("sailing_response_cache_hits_total", "counter", "Response cache hits", "hits"),
+    ("sailing_response_cache_misses_total", "counter", "Response cache misses", "misses"),
+    ("sailing_response_cache_evictions_total", "counter", "Entries evicted to stay within the size limits", "evictions"),
+    ("sailing_response_cache_entries", "gauge", "Responses currently cached", "entries"),
+    ("sailing_response_cache_bytes", "gauge", "Bytes held by cached responses", "bytes"),
+    ("sailing_response_cache_hit_ratio", "gauge", "Hits over lookups since startup", "hitRate"),
+]:
+    METRICS.add_collector(_name, _type, _help,
+                          lambda stat=_stat: {(): RESPONSE_CACHE.stats()[stat] or 0})
+METRICS.add_collector("sailing_data_version", "gauge", "Version of the served data snapshot",
+                      lambda: {(): STORE.current().version})
+# Top complaint keywords built offline by build_keywords.py; re-read on
+# /sailing/admin/reload when the file changed (None when it does not exist)
+KEYWORDS_FILE = os.environ.get("SAILING_KEYWORDS_FILE", "keywords.json.gz")
+KEYWORDS = load_keywords(KEYWORDS_FILE)
 AUTH_FILE = Path("sailing_auth.yaml")
 def load_auth_data():
     """Load authentication data from YAML file"""
@@ -30,20 +86,25 @@ def load_auth_data():
         return yaml.safe_load(f)
 
 
-SAILING_DATA, SAILING_REASON = load_sailing_data_rate_reason()
-# print(SAILING_DATA)
-# print(SAILING_REASON)
-def get_sailing_df(ship: str, sailing_number: str):
+def timed_stage(name: str):
+    """Time a block as one stage of the current request (see /sailing/metrics)"""
+    return stage(METRICS, name)
+
+def serialize(payload):
+    """jsonify, timed as the "serialize" stage"""
+    with timed_stage("serialize"):
+        return jsonify(payload)
+
+
+def get_sailing_df(ship: str, sailing_number: str, snapshot=None):
     """Helper to get DataFrame for specific sailing"""
-    key = f"{ship}_{sailing_number}"
-    key = key.lower()
-    return SAILING_DATA.get(key)
+    snapshot = snapshot or STORE.current()
+    return snapshot.sailing_data.get(sailing_key(ship, sailing_number))
 
-def get_sailing_df_reason(ship: str, sailing_number: str):
+def get_sailing_df_reason(ship: str, sailing_number: str, snapshot=None):
     """Helper to get DataFrame for specific sailing"""
-    key = f"{ship}_{sailing_number}"
-    key = key.lower()
-    return SAILING_REASON.get(key)
+    snapshot = snapshot or STORE.current()
+    return snapshot.sailing_reason.get(sailing_key(ship, sailing_number))
 
 # Helper functions
 def generate_rating_text(score: float, attribute: str) -> str:
@@ -57,31 +118,34 @@ def generate_rating_text(score: float, attribute: str) -> str:
     else:
         return f"Critical feedback on {attribute.lower()} ({score:.1f}). Needs immediate attention"
 
-def find_sailings(sailings: List[Dict]) -> List[Dict]:
-    """Filter sample data based on requested sailings"""
+def find_sailings(sailings: List[Dict], snapshot=None) -> List[int]:
+    """Summary table rows of the requested sailings"""
+    table = (snapshot or STORE.current()).summary_table
     results = []
     for sailing in sailings:
-        ship = sailing.get("shipName")
-        number = sailing.get("sailingNumber")
-        found = next(
-            (item for item in SAMPLE_DATA 
-             if item["Ship Name"].lower() == ship.lower() and item["Sailing Number"].lower() == number.lower()),
-            None
-        )
-        if found:
+        found = table.find(sailing.get("shipName"), sailing.get("sailingNumber"))
+        if found is not None:
             results.append(found)
     return results
 
-def filter_sailings(data):
+def filter_sailings(data, snapshot=None):
+    """
+    Select summary table rows for a request
+
+    Returns:
+        Array of row indices into snapshot.summary_table (turn them into
+        summaries with to_records or rows), or a negative error code
+        (see FILTER_ERRORS)
+    """
+    snapshot = snapshot or STORE.current()
     filter_by = data.get("filter_by", "sailing")
-    print("in filter_sailings")
 
     results = []
 
     if filter_by == "sailing":
         # Get requested sailings if provided
         if "sailings" in data:
-            results = find_sailings(data["sailings"])
+            results = find_sailings(data["sailings"], snapshot)
         else:
             return -1
 
@@ -90,25 +154,76 @@ def filter_sailings(data):
         if "filters" in data:
             from_date = pd.to_datetime(data["filters"].get("fromDate"))
             to_date = pd.to_datetime(data["filters"].get("toDate"))
-            print(from_date, to_date)
 
             if not from_date or not to_date:
                 return -2
 
-            # Filter SAMPLE_DATA by date range
-            results = [
-                item for item in SAMPLE_DATA
-                if pd.to_datetime(item["Start"]) >= from_date and pd.to_datetime(item["End"]) <= to_date
-            ]
+            # Filter the summaries by date range
+            results = snapshot.summary_table.between(from_date, to_date)
         else:
             return -3
 
     else:
         return -4
 
-    # Remove duplicates if both sailings and date filters are applied
-    results = {frozenset(item.items()): item for item in results}.values()
-    return results
+    # Remove duplicates (a sailing requested twice), keeping request order
+    results = np.asarray(results, dtype=np.intp)
+    _, first = np.unique(results, return_index=True)
+    return results[np.sort(first)]
+
+def cached_body_response(entry, status):
+    """Response for a cached entry, gzipped when the client accepts it"""
+    if entry.gzipped is not None and request.accept_encodings["gzip"]:
+        response = app.response_class(entry.gzipped, mimetype=entry.mimetype)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = app.response_class(entry.body, mimetype=entry.mimetype)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["X-Cache"] = status
+    return response
+
+def cached_response(view):
+    """
+    Serve repeated requests from RESPONSE_CACHE
+
+    Successful responses are stored already encoded (and gzipped) under the
+    endpoint, the canonicalized JSON body (or query string) and the current
+    data version, so a reload makes every older entry unreachable.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not RESPONSE_CACHE.enabled:
+            return view(*args, **kwargs)
+        data = request.get_json(silent=True) if request.method == "POST" else request.args.to_dict(flat=False)
+        if data is None:
+            return view(*args, **kwargs)
+
+        key = RESPONSE_CACHE.key(request.path, data, STORE.current().version)
+        entry = RESPONSE_CACHE.get(key)
+        if entry is not None:
+            return cached_body_response(entry, "HIT")
+
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.is_streamed:
+            return response
+        entry = RESPONSE_CACHE.put(key, response.get_data(), response.mimetype)
+        return cached_body_response(entry, "MISS")
+    return wrapper
+
+FILTER_ERRORS = {
+    -1: "Sailings must be provided when filtering by sailing",
+    -2: "Both fromDate and toDate must be provided when filtering by date",
+    -3: "Filters must be provided when filtering by date",
+    -4: "Invalid filterBy value. Must be 'sailing' or 'date'"
+}
+
+def filter_error_response(code: int):
+    """Map a filter_sailings error code to a 400 payload"""
+    return {"error": FILTER_ERRORS[code]}, 400
+
+def respond(payload, status=200):
+    """Flask response for a (payload, status) pair returned by a handler"""
+    return serialize(payload), status
 
 # API Endpoints
 @app.route('/sailing/check', methods=['GET'])
@@ -133,32 +248,37 @@ def remove_server_header(response):
     response.headers["Server"] = ""
     return response
 
+# Handlers take the request body and a snapshot and return (payload, status).
+# They do not touch the Flask request, so the ASGI app (asgi_app.py) serves
+# the same routes with the same JSON contracts by calling them directly.
+
 @app.route('/sailing/getRatingSmry', methods=['POST'])
+@cached_response
 def get_rating_summary():
     """Endpoint for getting full rating summaries"""
-    data = request.get_json()
-    print(data)
+    return respond(*rating_summary(request.get_json(), STORE.current()))
+
+def rating_summary(data, snapshot):
+    """Full rating summaries of the selected sailings"""
+    logger.debug("getRatingSmry request: %s", data)
 
     # Validate input
     if not data or ("sailings" not in data and "filters" not in data):
-        return jsonify({"error": "Missing sailings or filters parameter"}), 400
+        return {"error": "Missing sailings or filters parameter"}, 400
     
-    working_data = filter_sailings(data)
-    if working_data == -1:
-        return jsonify({"error": "Sailings must be provided when filtering by sailing"}), 400
-    if working_data == -2:
-        return jsonify({"error": "Both fromDate and toDate must be provided when filtering by date"}), 400
-    if working_data == -3:
-        return jsonify({"error": "Filters must be provided when filtering by date"}), 400
-    if working_data == -4:
-        return jsonify({"error": "Invalid filterBy value. Must be 'sailing' or 'date'"}), 400
+    with timed_stage("filter"):
+        working_data = filter_sailings(data, snapshot)
+    if isinstance(working_data, int):
+        return filter_error_response(working_data)
 #     working_data = is_empty_or_nan_rating(working_data)
 #     print(working_data)
-    return jsonify({
+    # includeImputed adds the list of metrics that were filled in to each summary
+    include_imputed = bool(data.get("includeImputed", False))
+    return {
         "status": "success",
         "count": len(working_data),
-        "data": list(working_data)
-    })
+        "data": snapshot.summary_table.to_records(working_data, include_imputed=include_imputed)
+    }, 200
 
 import math  # Import the math module for isnan()
 
@@ -181,114 +301,449 @@ def is_empty_or_nan(value):
     return False #added this
 
 @app.route('/sailing/getMetricRating', methods=['POST'])
+@cached_response
 def get_metric_comparison():
     """Enhanced endpoint with metric value filtering"""
-    data = request.get_json()
+    return respond(*metric_comparison(request.get_json(), STORE.current()))
+
+# Optional per-sailing blocks of getMetricRating, requested with "include"
+METRIC_INCLUDES = ["distribution"]
+
+def metric_comparison(data, snapshot):
+    """Per-sailing average of one metric, with the reviews at or below filterBelow"""
 #     print("data",data)
     
     # Validate input
     if not data or "filter_by" not in data or "metric" not in data:
-        return jsonify({"error": "Missing required parameters"}), 400
+        return {"error": "Missing required parameters"}, 400
     
     metric = data["metric"]
     # sailings = data["sailings"]
     filter_below = data.get("filterBelow")
     compare_avg = data.get("compareToAverage", False)
     filter_by = data.get("filter_by", "sailing")
-    print(metric)
+    logger.debug("getMetricRating request for %s: %s", metric, data)
 #     metric = "F&B Quality"
 
     # Validate metric (excluding 'Review')
     if metric not in METRIC_ATTRIBUTES:
-        return jsonify({
+        return {
             "error": "Metric must be a numeric field (not 'Review')",
             "valid_metrics": METRIC_ATTRIBUTES
-        }), 400
+        }, 400
+
+    # include=["distribution"] (or "distribution") adds each sailing's rating
+    # histogram on the 0.5 grid, its cumulative counts and quantiles
+    include = data.get("include") or []
+    if isinstance(include, str):
+        include = include.split(",")
+    unknown = [name for name in include if name not in METRIC_INCLUDES]
+    if unknown:
+        return {"error": f"Unknown include values: {unknown}", "valid_include": METRIC_INCLUDES}, 400
     
-    working_data = filter_sailings(data)
-    if working_data == -1:
-        return jsonify({"error": "Sailings must be provided when filtering by sailing"}), 400
-    if working_data == -2:
-        return jsonify({"error": "Both fromDate and toDate must be provided when filtering by date"}), 400
-    if working_data == -3:
-        return jsonify({"error": "Filters must be provided when filtering by date"}), 400
-    if working_data == -4:
-        return jsonify({"error": "Invalid filterBy value. Must be 'sailing' or 'date'"}), 400
+    with timed_stage("filter"):
+        working_data = filter_sailings(data, snapshot)
+    if isinstance(working_data, int):
+        return filter_error_response(working_data)
 
     # Prepare response
     results = []
     all_metric_values = []
 
-    for sailing in working_data:
-        print("get metric comparison",sailing)
-        ship = sailing["Ship Name"]
-        number = sailing["Sailing Number"]
-        df = get_sailing_df(ship, number)
-        df_reason = get_sailing_df_reason(ship, number)
-#         print("df_reason",df_reason)
+    with timed_stage("dataframe"):
+        for sailing in snapshot.summary_table.rows(working_data):
+            ship = sailing["Ship Name"]
+            number = sailing["Sailing Number"]
+            df = get_sailing_df(ship, number, snapshot)
+            df_reason = get_sailing_df_reason(ship, number, snapshot)
+    #         print("df_reason",df_reason)
+        
+            if df is None or metric not in df.columns:
+                results.append({
+                    "ship": ship,
+                    "sailingNumber": number,
+                    "error": "Data not found" if df is None else "Invalid metric"
+                })
+                continue
+        
+            # Calculate basic stats (metric columns are typed floats from the rating schema)
+            metric_values = df[metric].dropna()
+            avg_rating = float(metric_values.mean())
+            all_metric_values.extend(metric_values.tolist())
+        
+            # Get filtered reviews if requested
+            filtered_reviews = []
+            filtered_metric = []
+            if filter_below is not None:
+                mask = df[metric] <= filter_below
+                filtered_reviews = df_reason.loc[mask, metric].tolist()
+    #             print(filtered_reviews)
+                for i, rev in enumerate(filtered_reviews):
+                    if is_empty_or_nan(rev):
+                        filtered_reviews[i] = "Please refer to the comment"
+    #             print(filtered_reviews)
+    #             print(len(filtered_reviews))
+                filtered_metric = df.loc[mask, metric].tolist()
         
-        if df is None or metric not in df.columns:
             results.append({
                 "ship": ship,
                 "sailingNumber": number,
-                "error": "Data not found" if df is None else "Invalid metric"
+                "metric": metric,
+                "averageRating": round(avg_rating, 2),
+                "ratingCount": len(metric_values),
+                "filteredReviews": filtered_reviews,
+                "filteredMetric": filtered_metric,
+                "filteredCount": len(filtered_reviews)
             })
-            continue
-        
-        # Calculate basic stats
-        metric_values = pd.to_numeric(df[metric], errors='coerce').dropna()
-        avg_rating = metric_values.mean()
-        all_metric_values.extend(metric_values.tolist())
-        
-        # Get filtered reviews if requested
-        filtered_reviews = []
-        if filter_below is not None:
-            mask = df[metric].astype(float) <= filter_below
-            filtered_reviews = df_reason.loc[mask, metric].tolist()
-#             print(filtered_reviews)
-            for i, rev in enumerate(filtered_reviews):
-                if is_empty_or_nan(rev):
-                    filtered_reviews[i] = "Please refer to the comment"
-#             print(filtered_reviews)
-#             print(len(filtered_reviews))
-            filtered_metric = df.loc[mask, metric].tolist()
-        
-        results.append({
-            "ship": ship,
-            "sailingNumber": number,
-            "metric": metric,
-            "averageRating": round(avg_rating, 2),
-            "ratingCount": len(metric_values),
-            "filteredReviews": filtered_reviews,
-            "filteredMetric": filtered_metric,
-            "filteredCount": len(filtered_reviews)
-        })
+            if "distribution" in include:
+                results[-1]["distribution"] = snapshot.distributions.to_dict(sailing_key(ship, number), metric)
     
-    # Add comparison to overall average if requested
-    if compare_avg and all_metric_values:
-        overall_avg = sum(all_metric_values) / len(all_metric_values)
-        for result in results:
-            if "averageRating" in result:
-                result["comparisonToOverall"] = round(result["averageRating"] - overall_avg, 2)
+        # Add comparison to overall average if requested
+        if compare_avg and all_metric_values:
+            overall_avg = sum(all_metric_values) / len(all_metric_values)
+            for result in results:
+                if "averageRating" in result:
+                    result["comparisonToOverall"] = round(result["averageRating"] - overall_avg, 2)
     
-    return jsonify({
+    response = {
         "status": "success",
         "metric": metric,
         "results": results,
         "filterBelow": filter_below,
         "comparedToAverage": compare_avg
-    })
+    }
+    if "distribution" in include:
+        response["distributionBins"] = BIN_EDGES
+        response["quantileLevels"] = list(QUANTILE_LEVELS)
+    return response, 200
+
+# Default and largest page of getMetricReviews
+REVIEW_PAGE_DEFAULT = 50
+REVIEW_PAGE_MAX = 1000
+
+@app.route('/sailing/getMetricReviews', methods=['POST'])
+@cached_response
+def get_metric_reviews():
+    """Endpoint returning one page of the reviews at or below a metric threshold"""
+    return respond(*metric_reviews(request.get_json(), STORE.current()))
+
+def metric_reviews(data, snapshot):
+    """
+    One page of the reviews at or below filterBelow, across the selected sailings
+
+    Reviews are ordered by rating ("order": "asc" or "desc"), ties keeping
+    sailing order, exactly like the table the metrics page builds from a full
+    getMetricRating response. Only the reason text of the requested page is
+    read, so the cost of a page does not depend on how many reviews match.
+    The IDs are "<ship>_<sailing number>_<n>", n being the 1-based position
+    of the review among its sailing's matches.
+    """
+    if not data or "filter_by" not in data or "metric" not in data or data.get("filterBelow") is None:
+        return {"error": "Missing required parameters"}, 400
+
+    metric = data["metric"]
+    if metric not in METRIC_ATTRIBUTES:
+        return {
+            "error": "Metric must be a numeric field (not 'Review')",
+            "valid_metrics": METRIC_ATTRIBUTES
+        }, 400
+    try:
+        filter_below = float(data["filterBelow"])
+        offset = int(data.get("offset", 0))
+        limit = int(data.get("limit", REVIEW_PAGE_DEFAULT))
+    except (TypeError, ValueError):
+        return {"error": "filterBelow, offset and limit must be numbers"}, 400
+    if offset < 0 or not 0 < limit <= REVIEW_PAGE_MAX:
+        return {"error": f"offset must be >= 0 and limit between 1 and {REVIEW_PAGE_MAX}"}, 400
+    order = data.get("order", "asc")
+    if order not in ("asc", "desc"):
+        return {"error": "order must be 'asc' or 'desc'"}, 400
+
+    with timed_stage("filter"):
+        working_data = filter_sailings(data, snapshot)
+    if isinstance(working_data, int):
+        return filter_error_response(working_data)
+
+    with timed_stage("dataframe"):
+        sailings, ratings, positions = [], [], []
+        for sailing in snapshot.summary_table.rows(working_data):
+            ship = sailing["Ship Name"]
+            number = sailing["Sailing Number"]
+            df = get_sailing_df(ship, number, snapshot)
+            if df is None or metric not in df.columns:
+                continue
+            values = df[metric].to_numpy(dtype=np.float64, na_value=np.nan)
+            matched = np.flatnonzero(values <= filter_below)
+            sailings.append((ship, number))
+            ratings.append(values[matched])
+            positions.append(matched)
+
+        counts = [len(matched) for matched in positions]
+        total = sum(counts)
+        page = []
+        if total:
+            all_ratings = np.concatenate(ratings)
+            ranked = np.argsort(all_ratings if order == "asc" else -all_ratings, kind="stable")
+            chosen = ranked[offset:offset + limit]
+            # Map each chosen review back to (sailing, position within the matches)
+            starts = np.cumsum([0] + counts[:-1])
+            owners = np.searchsorted(starts, chosen, side="right") - 1
+            for index, owner in zip(chosen.tolist(), owners.tolist()):
+                ship, number = sailings[owner]
+                within = index - int(starts[owner])
+                review = get_sailing_df_reason(ship, number, snapshot)[metric].iat[int(positions[owner][within])]
+                page.append({
+                    "id": f"{ship}_{number}_{within + 1}",
+                    "ship": ship,
+                    "sailingNumber": number,
+                    "rating": float(all_ratings[index]),
+                    "review": "Please refer to the comment" if is_empty_or_nan(review) else review
+                })
+
+    return {
+        "status": "success",
+        "metric": metric,
+        "filterBelow": filter_below,
+        "order": order,
+        "offset": offset,
+        "total": total,
+        "reviews": page
+    }, 200
+
+# Default and largest page of searchReviews
+SEARCH_PAGE_DEFAULT = 20
+SEARCH_PAGE_MAX = 100
+
+@app.route('/sailing/searchReviews', methods=['POST'])
+@cached_response
+def search_reviews():
+    """Endpoint for full-text search over the review reasons"""
+    return respond(*review_search(request.get_json(), STORE.current()))
+
+def review_search(data, snapshot):
+    """
+    Reviews whose reason text matches a free-text query, best BM25 match first
+
+    Every sailing is searched unless the request has the usual filter_by
+    selection (sailings or a date range); "ships" further restricts it to
+    ship names and "metric" to the reasons given for one metric.
+    """
+    if not data or not str(data.get("query") or "").strip():
+        return {"error": "Missing required parameters"}, 400
+
+    metric = data.get("metric")
+    if metric is not None and metric not in METRIC_ATTRIBUTES:
+        return {
+            "error": "Metric must be a numeric field (not 'Review')",
+            "valid_metrics": METRIC_ATTRIBUTES
+        }, 400
+    try:
+        offset = int(data.get("offset", 0))
+        limit = int(data.get("limit", SEARCH_PAGE_DEFAULT))
+    except (TypeError, ValueError):
+        return {"error": "offset and limit must be numbers"}, 400
+    if offset < 0 or not 0 < limit <= SEARCH_PAGE_MAX:
+        return {"error": f"offset must be >= 0 and limit between 1 and {SEARCH_PAGE_MAX}"}, 400
+
+    with timed_stage("filter"):
+        if "filter_by" in data:
+            working_data = filter_sailings(data, snapshot)
+            if isinstance(working_data, int):
+                return filter_error_response(working_data)
+        else:
+            working_data = None
+        ships = set(data.get("ships") or [])
+        sailings = {}
+        for sailing in snapshot.summary_table.rows(working_data):
+            if ships and sailing["Ship Name"] not in ships:
+                continue
+            ship, number = sailing["Ship Name"], sailing["Sailing Number"]
+            sailings[sailing_key(ship, number)] = (ship, number)
+
+    with timed_stage("dataframe"):
+        total, hits = snapshot.search_index.search(data["query"], sailings, metric, limit, offset)
+        results = []
+        for key, row, hit_metric, score in hits:
+            ship, number = sailings[key]
+            rating = snapshot.sailing_data[key][hit_metric].iat[row]
+            results.append({
+                "ship": ship,
+                "sailingNumber": number,
+                "metric": hit_metric,
+                "rating": None if pd.isna(rating) else float(rating),
+                "review": snapshot.sailing_reason[key][hit_metric].iat[row],
+                "score": round(score, 3)
+            })
+
+    return {
+        "status": "success",
+        "query": data["query"],
+        "total": total,
+        "offset": offset,
+        "results": results
+    }, 200
+
+def refresh_keywords():
+    """Reload the keyword artifact if it was rebuilt, created or removed since it was read"""
+    global KEYWORDS
+    try:
+        mtime = os.path.getmtime(KEYWORDS_FILE)
+    except OSError:
+        mtime = None
+    if mtime != (KEYWORDS.mtime if KEYWORDS is not None else None):
+        KEYWORDS = load_keywords(KEYWORDS_FILE)
+
+# Default and largest number of phrases per sailing of getTopKeywords
+KEYWORDS_LIMIT_DEFAULT = 10
+KEYWORDS_LIMIT_MAX = 100
+
+@app.route('/sailing/getTopKeywords', methods=['POST'])
+def get_top_keywords():
+    """Endpoint returning the precomputed top complaint keywords of the selected sailings"""
+    return respond(*top_keywords(request.get_json(), STORE.current()))
+
+def top_keywords(data, snapshot):
+    """Top complaint phrases of one metric per selected sailing, and merged across them"""
+    if not data or "filter_by" not in data or "metric" not in data:
+        return {"error": "Missing required parameters"}, 400
+
+    metric = data["metric"]
+    if metric not in METRIC_ATTRIBUTES:
+        return {
+            "error": "Metric must be a numeric field (not 'Review')",
+            "valid_metrics": METRIC_ATTRIBUTES
+        }, 400
+    try:
+        limit = int(data.get("limit", KEYWORDS_LIMIT_DEFAULT))
+    except (TypeError, ValueError):
+        return {"error": "limit must be a number"}, 400
+    if not 0 < limit <= KEYWORDS_LIMIT_MAX:
+        return {"error": f"limit must be between 1 and {KEYWORDS_LIMIT_MAX}"}, 400
+
+    keywords = KEYWORDS
+    if keywords is None:
+        return {"error": "Keywords have not been built (run build_keywords.py)"}, 503
+
+    with timed_stage("filter"):
+        working_data = filter_sailings(data, snapshot)
+    if isinstance(working_data, int):
+        return filter_error_response(working_data)
+
+    results = []
+    for sailing in snapshot.summary_table.rows(working_data):
+        ship = sailing["Ship Name"]
+        number = sailing["Sailing Number"]
+        entry = keywords.get(sailing_key(ship, number), metric, limit) or {"reviews": 0, "keywords": []}
+        results.append({
+            "ship": ship,
+            "sailingNumber": number,
+            "complaintReviews": entry["reviews"],
+            "keywords": entry["keywords"]
+        })
+
+    return {
+        "status": "success",
+        "metric": metric,
+        "threshold": keywords.threshold,
+        "built": keywords.built,
+        "results": results,
+        "combined": combine_keywords(results, limit)
+    }, 200
+
+def bucketed_trends(rows, data, metrics, snapshot):
+    """Run query_trends for a request, using the cubes when filtering by date"""
+    from_date = to_date = None
+    if data.get("filter_by", "sailing") == "date":
+        from_date = pd.to_datetime(data["filters"].get("fromDate"))
+        to_date = pd.to_datetime(data["filters"].get("toDate"))
+    return query_trends(snapshot.rollup_cubes, rows, metrics,
+                        granularity=data.get("granularity", "auto"),
+                        from_date=from_date, to_date=to_date)
+
+@app.route('/sailing/dashboard', methods=['POST'])
+@cached_response
+def get_dashboard():
+    """Endpoint returning pre-aggregated dashboard KPIs, trends and per-ship means"""
+    return respond(*dashboard(request.get_json(), STORE.current()))
+
+def dashboard(data, snapshot):
+    """Dashboard KPIs, trends and per-ship means of the selected sailings"""
+    # Validate input
+    if not data or ("sailings" not in data and "filters" not in data):
+        return {"error": "Missing sailings or filters parameter"}, 400
+
+    with timed_stage("filter"):
+        working_data = filter_sailings(data, snapshot)
+    if isinstance(working_data, int):
+        return filter_error_response(working_data)
+    # summary_frame has one row per summary table row, in the same order
+    rows = snapshot.summary_frame.iloc[working_data]
+
+    try:
+        with timed_stage("dataframe"):
+            granularity, series = bucketed_trends(rows, data, DASHBOARD_TREND_METRICS, snapshot)
+            aggregates = dashboard_aggregates(rows)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    return {
+        "status": "success",
+        "count": len(rows),
+        "granularity": granularity,
+        "trends": trend_points(series),
+        **aggregates
+    }, 200
+
+@app.route('/sailing/trends', methods=['POST'])
+@cached_response
+def get_trends():
+    """Endpoint returning metric trends bucketed by week, month, quarter or year"""
+    return respond(*trends(request.get_json(), STORE.current()))
+
+def trends(data, snapshot):
+    """Metric trends of the selected sailings"""
+    # Validate input
+    if not data or ("sailings" not in data and "filters" not in data):
+        return {"error": "Missing sailings or filters parameter"}, 400
+
+    metrics = data.get("metrics") or DASHBOARD_TREND_METRICS
+    invalid = [m for m in metrics if m not in METRIC_ATTRIBUTES]
+    if invalid:
+        return {"error": f"Invalid metrics: {invalid}", "valid_metrics": METRIC_ATTRIBUTES}, 400
+
+    with timed_stage("filter"):
+        working_data = filter_sailings(data, snapshot)
+    if isinstance(working_data, int):
+        return filter_error_response(working_data)
+    # summary_frame has one row per summary table row, in the same order
+    rows = snapshot.summary_frame.iloc[working_data]
+
+    try:
+        with timed_stage("dataframe"):
+            granularity, series = bucketed_trends(rows, data, metrics, snapshot)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    return {
+        "status": "success",
+        "granularity": granularity,
+        "metrics": metrics,
+        "data": trend_points(series)
+    }, 200
 
 @app.route('/sailing/ships', methods=['GET'])
+@cached_response
 def get_ships():
+    return respond(*ship_list(None, STORE.current()))
+
+def ship_list(data, snapshot):
+    """Every sailing name with a 1-based id"""
 #     SHIPS = ["Voyager", "Explorer", "Discovery", "Explorer 2", "Discovery 2", "Voyager250306"]
-    SHIPS = []
-    for ent in SAMPLE_DATA:
-        SHIPS.append(ent["Ship Name"])
-    return jsonify({
+    SHIPS = snapshot.summary_table.meta["Ship Name"].tolist()
+    return {
         "status": "success",
         "data": [{"name": ship, "id": idx+1} for idx, ship in enumerate(SHIPS)]
-    })
+    }, 200
     # """Endpoint for getting available ships from database"""
     # ships = db.query("SELECT ship_id as id, ship_name as name FROM ships")
     # return jsonify({
@@ -297,19 +752,105 @@ def get_ships():
     # })
 
 
+@app.route('/sailing/metrics', methods=['GET'])
+def get_metrics():
+    """Request latency, stage timing, response size and cache metrics in Prometheus text format"""
+    return app.response_class(METRICS.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.route('/sailing/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit/miss counters and size of the response cache"""
+    return jsonify({"status": "success", **RESPONSE_CACHE.stats()})
+
+
+def warm_up(snapshot):
+    """
+    Run the filter, trend and encoding paths once against a snapshot
+
+    The first call of each path pays one-off costs (date parsing setup,
+    lazy imports, encoder initialization); paying them here keeps them out
+    of the first real requests and, under serve.py, shares the touched
+    pages between preforked workers.
+    """
+    global WARMED_VERSION
+    table = snapshot.summary_table
+    if len(table):
+        first = table.row(0)
+        data = {"filter_by": "sailing",
+                "sailings": [{"shipName": first["Ship Name"], "sailingNumber": first["Sailing Number"]}]}
+        rows = filter_sailings(data, snapshot)
+        get_sailing_df(first["Ship Name"], first["Sailing Number"], snapshot)
+        app.json.dumps(table.to_records(rows))
+        snapshot.search_index.search("food", [sailing_key(first["Ship Name"], first["Sailing Number"])])
+        dates = table.to_frame()["Start"].dropna()
+        if len(dates):
+            data = {"filter_by": "date", "filters": {"fromDate": str(dates.min()), "toDate": str(dates.max())}}
+            rows = filter_sailings(data, snapshot)
+            if not isinstance(rows, int):
+                bucketed_trends(snapshot.summary_frame.iloc[rows], data, DASHBOARD_TREND_METRICS, snapshot)
+    WARMED_VERSION = snapshot.version
+    READY.set()
+
+
+@app.route('/sailing/ready', methods=['GET'])
+def get_ready():
+    """Readiness probe: 200 once the snapshot's indexes are built and warmed up"""
+    return respond(*readiness(None, STORE.current()))
+
+def readiness(data, snapshot):
+    if not READY.is_set():
+        return {"status": "starting"}, 503
+    return {
+        "status": "ready",
+        "dataVersion": snapshot.version,
+        "sailings": len(snapshot.summary_table),
+        "pid": os.getpid(),
+    }, 200
+
+
+def admin_status(headers) -> int:
+    """
+    Check the X-Admin-Token header of an admin request
+
+    Returns:
+        200 when it matches SAILING_ADMIN_TOKEN, 404 when no token is
+        configured (the admin endpoints are off) and 403 otherwise
+    """
+    if not ADMIN_TOKEN:
+        return 404
+    token = headers.get("X-Admin-Token") or ""
+    return 200 if hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()) else 403
+
+@app.route('/sailing/admin/reload', methods=['POST'])
+def reload_data():
+    """Ingest new or changed sailing folders without restarting the server"""
+    status = admin_status(request.headers)
+    if status != 200:
+        return jsonify({"error": "Not Found" if status == 404 else "Forbidden"}), status
+    try:
+        refresh_keywords()
+        result = reload_snapshot()
+    except Exception as e:
+        return jsonify({"status": "error", "error": f"Reload failed: {str(e)}"}), 500
+    return jsonify({"status": "success", **result})
+
 @app.route('/sailing/auth', methods=['POST'])
 def authenticate():
+    return respond(*check_credentials(request.get_json(silent=True), None))
+
+def check_credentials(data, snapshot):
+    """Verify a username/password against AUTH_FILE"""
     try:
         # Get credentials from request
-        data = request.get_json()
         username = data.get('username')
         password = data.get('password')
         
         if not username or not password:
-            return jsonify({
+            return {
                 "authenticated": False,
                 "error": "Username and password required"
-            }), 400
+            }, 400
         
         # Load auth data
         auth_data = load_auth_data()
@@ -317,24 +858,27 @@ def authenticate():
         
         # Verify user exists and password matches
         if user_data and check_password_hash(user_data['password'], password):
-            return jsonify({
+            return {
                 "authenticated": True,
                 "user": username,
                 "role": user_data.get('role')
-            })
+            }, 200
         
-        return jsonify({
+        return {
             "authenticated": False,
             "error": "Invalid credentials"
-        }), 401
+        }, 401
         
     except Exception as e:
-        return jsonify({
+        return {
             "authenticated": False,
             "error": f"Authentication failed: {str(e)}"
-        }), 500
+        }, 500
 
 
+warm_up(STORE.current())
 
 if __name__ == '__main__':
+    logging.basicConfig(level=os.environ.get("SAILING_LOG_LEVEL", "INFO"),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
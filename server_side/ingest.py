@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from test_data import (folder_signature, get_summary_data, iter_sailing_folders,
+                       load_sailing_folder, load_sailing_folders, sailing_key, summarize_sailing)
+from summary_stats import build_summary_frame
+from summary_table import SummaryTable
+from rollups import build_rollup_cubes
+from distributions import MetricDistributions
+from search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """
+    Immutable view of everything the API serves from
+
+    Request handlers grab one snapshot at the start and use it throughout,
+    so a reload that happens mid-request cannot mix old and new data.
+    """
+    version: int
+    summary_table: SummaryTable
+    sailing_data: Dict[str, pd.DataFrame]
+    sailing_reason: Dict[str, pd.DataFrame]
+    summary_frame: pd.DataFrame
+    rollup_cubes: Dict[str, pd.DataFrame]
+    # folder path -> (key, signature) for every sailing folder loaded
+    folders: Dict[str, Tuple[str, tuple]] = field(default_factory=dict)
+    # keys whose summary was computed from the CSVs rather than curated
+    derived_keys: frozenset = frozenset()
+    # rating histograms and quantiles per (sailing, metric), from sailing_data
+    distributions: Optional[MetricDistributions] = None
+    # inverted index over sailing_reason for /sailing/searchReviews
+    search_index: Optional[SearchIndex] = None
+
+
+def build_indexes(snapshot: DataSnapshot, metrics: List[str],
+                  previous: Optional[DataSnapshot] = None) -> DataSnapshot:
+    """
+    Return a copy of snapshot with every derived index rebuilt from its data
+
+    Args:
+        snapshot: Snapshot whose data is final
+        metrics: Metric columns served by the API
+        previous: Snapshot this one replaces; the search index segments of
+            sailings whose reason frames are unchanged are reused from it
+    """
+    summary_frame = build_summary_frame(snapshot.summary_table, metrics)
+    return replace(
+        snapshot,
+        summary_frame=summary_frame,
+        rollup_cubes=build_rollup_cubes(summary_frame, metrics),
+        distributions=MetricDistributions.from_frames(snapshot.sailing_data, metrics),
+        search_index=SearchIndex.from_frames(snapshot.sailing_reason, metrics,
+                                             previous.search_index if previous is not None else None),
+    )
+
+
+def _summary_key(summary: Dict) -> str:
+    return sailing_key(summary["Ship Name"], summary["Sailing Number"])
+
+
+def load_snapshot(metrics: List[str], data_directs: Optional[List[str]] = None,
+                  summaries: Optional[List[Dict]] = None,
+                  max_workers: Optional[int] = None) -> DataSnapshot:
+    """
+    Load every sailing folder and build the first snapshot
+
+    Args:
+        metrics: Metric columns served by the API
+        data_directs: Data roots to scan, defaults to DATA_DIRECTS
+        summaries: Curated summaries, defaults to get_summary_data()
+        max_workers: Process pool size for CSV parsing, defaults to the
+            number of cores (see load_sailing_folders)
+
+    Returns:
+        Snapshot with version 1
+    """
+    sample_data = list(get_summary_data() if summaries is None else summaries)
+    known = {_summary_key(s) for s in sample_data}
+    sailing_data, sailing_reason, folders, derived = {}, {}, {}, set()
+
+    folders_found = list(iter_sailing_folders(data_directs))
+    loaded = load_sailing_folders(folders_found, max_workers)
+    for (data_dir_index, data_dir, subdir_name, subdir_path), (key, name, df_rating, df_reason) in zip(folders_found, loaded):
+        sailing_data[key] = df_rating
+        sailing_reason[key] = df_reason
+        folders[subdir_path] = (key, folder_signature(subdir_name, subdir_path))
+        if key not in known:
+            sample_data.append(summarize_sailing(df_rating, name, data_dir_index, data_dir, metrics))
+            derived.add(key)
+
+    snapshot = DataSnapshot(
+        version=1,
+        summary_table=SummaryTable.from_records(sample_data, metrics),
+        sailing_data=sailing_data,
+        sailing_reason=sailing_reason,
+        summary_frame=pd.DataFrame(),
+        rollup_cubes={},
+        folders=folders,
+        derived_keys=frozenset(derived),
+    )
+    return build_indexes(snapshot, metrics)
+
+
+def apply_folder_changes(snapshot: DataSnapshot, metrics: List[str],
+                         data_directs: Optional[List[str]] = None) -> Tuple[DataSnapshot, Dict[str, List[str]]]:
+    """
+    Re-scan the data roots and fold new, changed and removed folders into a new snapshot
+
+    Only folders whose CSV mtime/size changed are parsed. The old snapshot is
+    never modified; its dictionaries are shallow-copied and updated.
+
+    Returns:
+        The new snapshot (the same object when nothing changed) and a
+        dictionary listing the added, changed and removed sailing keys
+    """
+    changes = {"added": [], "changed": [], "removed": []}
+    seen = set()
+    updates = []
+
+    for data_dir_index, data_dir, subdir_name, subdir_path in iter_sailing_folders(data_directs):
+        seen.add(subdir_path)
+        signature = folder_signature(subdir_name, subdir_path)
+        previous = snapshot.folders.get(subdir_path)
+        if previous is not None and previous[1] == signature:
+            continue
+        try:
+            loaded = load_sailing_folder(data_dir_index, subdir_name, subdir_path)
+        except Exception as e:
+            # Typically a folder that is still being copied; retried on the next scan
+            logger.warning("Skipping %s: %s", subdir_path, e)
+            continue
+        updates.append((data_dir_index, data_dir, subdir_path, signature, loaded))
+        changes["changed" if previous is not None else "added"].append(loaded[0])
+
+    removed_paths = [path for path in snapshot.folders if path not in seen]
+    if not updates and not removed_paths:
+        return snapshot, changes
+
+    sailing_data = dict(snapshot.sailing_data)
+    sailing_reason = dict(snapshot.sailing_reason)
+    folders = dict(snapshot.folders)
+    derived = set(snapshot.derived_keys)
+    # Imputation is redone by from_records below, so start from the raw values
+    summaries = {_summary_key(s): s for s in snapshot.summary_table.to_records(restore_missing=True)}
+
+    for path in removed_paths:
+        key, _ = folders.pop(path)
+        sailing_data.pop(key, None)
+        sailing_reason.pop(key, None)
+        if key in derived:
+            summaries.pop(key, None)
+            derived.discard(key)
+        changes["removed"].append(key)
+
+    for data_dir_index, data_dir, subdir_path, signature, (key, name, df_rating, df_reason) in updates:
+        sailing_data[key] = df_rating
+        sailing_reason[key] = df_reason
+        folders[subdir_path] = (key, signature)
+        # Curated summaries are kept; only summaries derived from CSVs are recomputed
+        if key not in summaries or key in derived:
+            summaries[key] = summarize_sailing(df_rating, name, data_dir_index, data_dir, metrics)
+            derived.add(key)
+
+    new_snapshot = DataSnapshot(
+        version=snapshot.version + 1,
+        summary_table=SummaryTable.from_records(list(summaries.values()), metrics),
+        sailing_data=sailing_data,
+        sailing_reason=sailing_reason,
+        summary_frame=pd.DataFrame(),
+        rollup_cubes={},
+        folders=folders,
+        derived_keys=frozenset(derived),
+    )
+    return build_indexes(new_snapshot, metrics, previous=snapshot), changes
+
+
+class SnapshotStore:
+    """Holds the current DataSnapshot and swaps it atomically on refresh"""
+
+    def __init__(self, snapshot: DataSnapshot, metrics: List[str],
+                 data_directs: Optional[List[str]] = None):
+        self._snapshot = snapshot
+        self._metrics = metrics
+        self._data_directs = data_directs
+        self._refresh_lock = threading.Lock()
+
+    def current(self) -> DataSnapshot:
+        """The snapshot new requests should use"""
+        return self._snapshot
+
+    def swap(self, snapshot: DataSnapshot):
+        """Publish a snapshot built elsewhere"""
+        with self._refresh_lock:
+            self._snapshot = snapshot
+
+    def after_fork(self):
+        """Give a forked child its own lock; the parent may have held it while forking"""
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self) -> Dict:
+        """
+        Ingest new or changed sailing folders
+
+        The new snapshot is fully built before it is published with a
+        single reference assignment; concurrent refreshes are serialized.
+        """
+        with self._refresh_lock:
+            started = time.perf_counter()
+            snapshot, changes = apply_folder_changes(self._snapshot, self._metrics, self._data_directs)
+            self._snapshot = snapshot
+        if any(changes.values()):
+            logger.info("Ingested data version %d in %.2fs: %s",
+                        snapshot.version, time.perf_counter() - started, changes)
+        return {"version": snapshot.version, **changes}
+
+
+def start_watcher(store: SnapshotStore, interval: float) -> threading.Thread:
+    """Poll the data roots every interval seconds in a daemon thread"""
+    def watch():
+        while True:
+            time.sleep(interval)
+            try:
+                store.refresh()
+            except Exception:
+                logger.exception("Sailing data refresh failed")
+
+    thread = threading.Thread(target=watch, name="sailing-data-watcher", daemon=True)
+    thread.start()
+    return thread
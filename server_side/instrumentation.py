@@ -0,0 +1,163 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+
+# Histogram bucket upper bounds (Prometheus "le"), +Inf is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, rendered in Prometheus text format"""
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Labels, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count)
+                        for labels, (counts, total, count) in sorted(self._series.items())]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(labels, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Request metrics for the Flask app
+
+    Holds the latency, stage and response size histograms, plus callbacks
+    that report current values of other components (such as the response
+    cache) at scrape time.
+    """
+
+    def __init__(self):
+        self.request_latency = Histogram(
+            "sailing_request_duration_seconds", "Request latency by endpoint, method and status",
+            LATENCY_BUCKETS)
+        self.stage_latency = Histogram(
+            "sailing_stage_duration_seconds", "Time spent in each stage of a request", LATENCY_BUCKETS)
+        self.response_size = Histogram(
+            "sailing_response_bytes", "Response body size by endpoint", SIZE_BUCKETS)
+        # name -> (type, help, callback returning {labels tuple: value})
+        self._collectors: Dict[str, Tuple[str, str, Callable[[], Dict[Labels, float]]]] = {}
+
+    def add_collector(self, name: str, metric_type: str, help_text: str,
+                      callback: Callable[[], Dict[Labels, float]]):
+        """Report callback()'s values as a gauge or counter on every scrape"""
+        self._collectors[name] = (metric_type, help_text, callback)
+
+    def render(self) -> str:
+        lines = []
+        for histogram in (self.request_latency, self.stage_latency, self.response_size):
+            lines.extend(histogram.render())
+        for name, (metric_type, help_text, callback) in self._collectors.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in callback().items():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def endpoint_label() -> str:
+    """Route pattern of the current request; unmatched paths share one label"""
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+# Endpoint label for stages timed outside a Flask request (set by stage_endpoint)
+_stage_endpoint: ContextVar[Optional[str]] = ContextVar("stage_endpoint", default=None)
+
+
+@contextmanager
+def stage_endpoint(endpoint: str):
+    """Attribute the stages timed in this block to endpoint, for servers without a Flask request context"""
+    token = _stage_endpoint.set(endpoint)
+    try:
+        yield
+    finally:
+        _stage_endpoint.reset(token)
+
+
+@contextmanager
+def stage(registry: Registry, name: str):
+    """Time a block as one stage (filter, dataframe, serialize, ...) of the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        endpoint = _stage_endpoint.get()
+        if endpoint is None and has_request_context():
+            endpoint = endpoint_label()
+        if endpoint is not None:
+            registry.stage_latency.observe(time.perf_counter() - started,
+                                           endpoint=endpoint, stage=name)
+
+
+def instrument_app(app, registry: Registry):
+    """Record latency and response size of every request served by app"""
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("request_started", None)
+        if started is None:
+            return response
+        endpoint = endpoint_label()
+        registry.request_latency.observe(time.perf_counter() - started, endpoint=endpoint,
+                                         method=request.method, status=str(response.status_code))
+        if not response.is_streamed:
+            registry.response_size.observe(response.calculate_content_length() or 0, endpoint=endpoint)
+        return response
+
+    return registry
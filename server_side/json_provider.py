@@ -0,0 +1,129 @@
+import datetime
+import json
+import logging
+import math
+import os
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# "orjson" (the default when it is installed) or "stdlib"
+JSON_BACKEND = os.environ.get("SAILING_JSON_BACKEND", "orjson")
+
+
+def _default(obj: Any):
+    """Encode the NumPy/pandas values handlers return (scalars, arrays, timestamps, NA)"""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        value = float(obj)
+        return None if math.isnan(value) else value
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (pd.Timestamp, datetime.date)):
+        return obj.isoformat()
+    if isinstance(obj, np.datetime64):
+        return None if np.isnat(obj) else str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _without_nan(obj: Any):
+    """Copy of a decoded-JSON-like structure with NaN/inf floats replaced by None"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _without_nan(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_without_nan(value) for value in obj]
+    if isinstance(obj, np.ndarray):
+        return _without_nan(obj.tolist())
+    if isinstance(obj, np.floating):
+        return _without_nan(float(obj))
+    return obj
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """
+    Stdlib json provider that also handles NumPy/pandas values and NaN
+
+    NaN is not valid JSON; it is written as null. Payloads without NaN take
+    the normal json.dumps path, the rare ones with NaN are cleaned and
+    encoded again.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("default", _default)
+        try:
+            return json.dumps(obj, allow_nan=False, **kwargs)
+        except ValueError:
+            return json.dumps(_without_nan(obj), allow_nan=False, **kwargs)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """
+    orjson-backed provider
+
+    orjson encodes NumPy arrays and scalars natively (OPT_SERIALIZE_NUMPY)
+    and writes NaN as null. Calls with stdlib-only options (indent, cls, ...)
+    fall back to StdlibJSONProvider.
+    """
+
+    def _options(self) -> int:
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options()).decode()
+
+    def dumpb(self, obj: Any) -> bytes:
+        """Encode straight to bytes, skipping the str round trip of dumps"""
+        return orjson.dumps(obj, default=_default, option=self._options())
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
+
+
+def json_provider_class(backend: str = JSON_BACKEND):
+    """Provider class for a backend name, falling back to the stdlib when orjson is missing"""
+    if backend == "orjson" and orjson is not None:
+        return OrjsonProvider
+    if backend == "orjson":
+        logger.info("orjson is not installed; using the stdlib JSON encoder")
+    elif backend != "stdlib":
+        raise ValueError(f"Unknown JSON backend {backend!r}. Must be 'orjson' or 'stdlib'")
+    return StdlibJSONProvider
+
+
+def install_json_provider(app, backend: str = JSON_BACKEND):
+    """Make jsonify, request.get_json and dict returns of app use the chosen encoder"""
+    app.json = json_provider_class(backend)(app)
+    return app.json
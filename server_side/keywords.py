@@ -0,0 +1,101 @@
+import gzip
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Version of the artifact layout written by build_keywords.py
+KEYWORDS_FORMAT = 1
+
+
+class SailingKeywords:
+    """
+    Top complaint keywords per (sailing, metric), as built by build_keywords.py
+
+    The artifact stores, for every sailing key and metric, the number of
+    reviews at or below the complaint threshold and the best phrases as
+    [phrase, score, mentions] triples (best first).
+    """
+    __slots__ = ("path", "mtime", "built", "threshold", "sailings")
+
+    def __init__(self, path: str, mtime: float, built: str, threshold: float,
+                 sailings: Dict[str, Dict[str, Dict]]):
+        self.path = path
+        self.mtime = mtime
+        self.built = built
+        self.threshold = threshold
+        self.sailings = sailings
+
+    def __len__(self) -> int:
+        return len(self.sailings)
+
+    def get(self, key: str, metric: str, limit: Optional[int] = None) -> Optional[Dict]:
+        """
+        Keywords of one (sailing, metric)
+
+        Returns:
+            {"reviews": complaint review count, "keywords": [{"phrase",
+            "score", "mentions"}, ...]}, or None when the artifact has
+            nothing for the sailing or metric
+        """
+        entry = self.sailings.get(key, {}).get(metric)
+        if entry is None:
+            return None
+        keywords = entry["keywords"] if limit is None else entry["keywords"][:limit]
+        return {
+            "reviews": entry["reviews"],
+            "keywords": [{"phrase": phrase, "score": score, "mentions": mentions}
+                         for phrase, score, mentions in keywords],
+        }
+
+
+def combine_keywords(entries: List[Dict], limit: int) -> List[Dict]:
+    """
+    Merge the keyword lists of several sailings by total mentions
+
+    Only phrases that made some sailing's own list are counted, so this is
+    the most mentioned of each sailing's top phrases rather than an exact
+    ranking over all reviews.
+    """
+    totals: Dict[str, Dict] = {}
+    for entry in entries:
+        for keyword in entry["keywords"]:
+            total = totals.setdefault(keyword["phrase"], {"phrase": keyword["phrase"], "mentions": 0, "sailings": 0})
+            total["mentions"] += keyword["mentions"]
+            total["sailings"] += 1
+    return sorted(totals.values(), key=lambda k: (-k["mentions"], -k["sailings"], k["phrase"]))[:limit]
+
+
+def load_keywords(path: str) -> Optional[SailingKeywords]:
+    """
+    Read a keywords artifact
+
+    Returns:
+        The keywords, or None when the file does not exist, cannot be read
+        (truncated, not gzip, not JSON, missing fields) or has another format
+        version (the API then reports them as unavailable)
+    """
+    try:
+        mtime = os.path.getmtime(path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except FileNotFoundError:
+        logger.info("No keyword artifact at %s; run build_keywords.py to create it", path)
+        return None
+    # gzip raises OSError (BadGzipFile) or EOFError, decoding and json ValueError
+    except (OSError, EOFError, ValueError) as e:
+        logger.error("Cannot read keyword artifact %s: %s", path, e)
+        return None
+    if not isinstance(artifact, dict) or artifact.get("format") != KEYWORDS_FORMAT:
+        found = artifact.get("format") if isinstance(artifact, dict) else None
+        logger.warning("Ignoring %s: format %s, expected %s", path, found, KEYWORDS_FORMAT)
+        return None
+    try:
+        keywords = SailingKeywords(path, mtime, artifact["built"], artifact["threshold"], artifact["sailings"])
+    except KeyError as e:
+        logger.error("Ignoring keyword artifact %s: missing field %s", path, e)
+        return None
+    logger.info("Loaded keywords for %d sailings from %s (built %s)", len(keywords), path, keywords.built)
+    return keywords
@@ -0,0 +1,117 @@
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+# Bodies smaller than this are not worth a gzip copy
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """An encoded response body, plus its gzip copy when the body is large enough"""
+    body: bytes
+    gzipped: Optional[bytes]
+    mimetype: str
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzipped or b"")
+
+
+def canonical_body(data) -> str:
+    """Request body as compact JSON with sorted keys, so equal requests share a key"""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResponseCache:
+    """
+    LRU cache of encoded responses keyed by (endpoint, canonical body, data version)
+
+    Entries of older data versions can never be hit again (every key carries
+    the version), so the whole cache is dropped as soon as a newer version is
+    stored. Bounded both by entry count and total bytes.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def key(endpoint: str, data, version: int) -> Tuple:
+        return endpoint, canonical_body(data), version
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, body: bytes, mimetype: str) -> CachedResponse:
+        """Store an encoded body (compressing it outside the lock) and return the entry"""
+        gzipped = gzip.compress(body, GZIP_LEVEL, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+        entry = CachedResponse(body, gzipped, mimetype)
+        if entry.size > self.max_bytes:
+            return entry
+        version = key[-1]
+        with self._lock:
+            if self._version is None or version > self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._bytes = 0
+                self._version = version
+            elif version < self._version:
+                # Built from a snapshot that has since been replaced
+                return entry
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxEntries": self.max_entries,
+                "maxBytes": self.max_bytes,
+                "dataVersion": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
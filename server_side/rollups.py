@@ -0,0 +1,132 @@
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+# Bucket sizes, as pandas period aliases, ordered from finest to coarsest
+GRANULARITIES = {"week": "W", "month": "M", "quarter": "Q", "year": "Y"}
+# Approximate bucket length in days, used to pick a granularity for a span
+GRANULARITY_DAYS = {"week": 7, "month": 30.44, "quarter": 91.31, "year": 365.25}
+# Upper bound on buckets per (ship, metric) series when granularity is "auto"
+MAX_TREND_POINTS = 60
+
+
+def long_metric_frame(frame: pd.DataFrame, metrics: List[str]) -> pd.DataFrame:
+    """Melt the summary frame into (Start, End, Ship, metric, score) rows, dropping missing scores"""
+    return (
+        frame.melt(id_vars=['Start', 'End', 'Ship'], value_vars=metrics,
+                   var_name='metric', value_name='score')
+        .dropna(subset=['End', 'score'])
+    )
+
+
+def end_buckets(ends: pd.Series, granularity: str) -> pd.Series:
+    """Start date of the bucket each End date falls in"""
+    return ends.dt.to_period(GRANULARITIES[granularity]).dt.start_time
+
+
+def bucket_scores(long_df: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """
+    Aggregate long-form scores into time buckets
+
+    Returns a frame with columns Ship, metric, bucket (bucket start date),
+    sum, count, first_start and last_end. Keeping sum and count rather than
+    the mean means buckets can be combined later without losing the
+    weighting. first_start and last_end bound the sailings in the bucket
+    (a missing Start counts as earlier than any date), so a date range
+    query can tell whether it takes the whole bucket.
+    """
+    return (
+        long_df.assign(bucket=end_buckets(long_df['End'], granularity),
+                       Start=long_df['Start'].fillna(pd.Timestamp.min))
+        .groupby(['Ship', 'metric', 'bucket'], as_index=False)
+        .agg(sum=('score', 'sum'), count=('score', 'count'),
+             first_start=('Start', 'min'), last_end=('End', 'max'))
+    )
+
+
+def build_rollup_cubes(frame: pd.DataFrame, metrics: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Pre-aggregate per-sailing scores over (ship, metric, bucket) for every granularity
+
+    Args:
+        frame: Summary frame from build_summary_frame
+        metrics: Metrics to roll up
+
+    Returns:
+        Dictionary of granularity name to bucketed frame (see bucket_scores)
+    """
+    long_df = long_metric_frame(frame, metrics)
+    return {granularity: bucket_scores(long_df, granularity) for granularity in GRANULARITIES}
+
+
+def pick_granularity(start: Optional[pd.Timestamp], end: Optional[pd.Timestamp],
+                     max_points: int = MAX_TREND_POINTS) -> str:
+    """Finest granularity that keeps a series over [start, end] within max_points buckets"""
+    if start is None or end is None or pd.isna(start) or pd.isna(end):
+        return "month"
+    span_days = max((end - start).days, 1)
+    for granularity, days in GRANULARITY_DAYS.items():
+        if span_days / days <= max_points:
+            return granularity
+    return "year"
+
+
+def query_trends(
+    cubes: Dict[str, pd.DataFrame],
+    rows: pd.DataFrame,
+    metrics: List[str],
+    granularity: str = "auto",
+    from_date: Optional[pd.Timestamp] = None,
+    to_date: Optional[pd.Timestamp] = None
+) -> Tuple[str, pd.DataFrame]:
+    """
+    Bucketed trend series for a request
+
+    Date-range requests are answered from the pre-built cubes, so the cost
+    depends on the number of buckets rather than sailings. A cube bucket is
+    only used when all its sailings lie within [from_date, to_date] (the
+    filter that selected rows); the buckets the range cuts through are
+    bucketed on the fly from the selected rows, so the series counts exactly
+    the sailings the KPIs do. Requests for specific sailings are bucketed on
+    the fly from the (few) selected rows.
+
+    Args:
+        cubes: Rollup cubes from build_rollup_cubes
+        rows: Summary frame rows selected by the request
+        metrics: Metrics to return
+        granularity: Bucket size, or "auto" to pick one for the span
+        from_date: Start of the date range of a date filter
+        to_date: End of the date range of a date filter
+
+    Returns:
+        The granularity used and a frame with columns Ship, metric, bucket,
+        score (mean) and count, sorted by bucket
+    """
+    if granularity == "auto":
+        if from_date is not None and to_date is not None:
+            granularity = pick_granularity(from_date, to_date)
+        else:
+            granularity = pick_granularity(rows['Start'].min(), rows['End'].max())
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity. Must be 'auto' or one of: {list(GRANULARITIES)}")
+
+    if from_date is not None and to_date is not None:
+        cube = cubes[granularity]
+        first_bucket = from_date.to_period(GRANULARITIES[granularity]).start_time
+        in_range = cube[
+            (cube['bucket'] >= first_bucket)
+            & (cube['bucket'] <= to_date)
+            & cube['metric'].isin(metrics)
+        ]
+        # Buckets with a sailing outside the range are cut by it
+        cut = (in_range['first_start'] < from_date) | (in_range['last_end'] > to_date)
+        whole = ~in_range['bucket'].isin(in_range.loc[cut, 'bucket'].unique())
+        # Everything else (cut buckets, and selected sailings whose End falls
+        # outside the range's buckets) is bucketed from the selected rows
+        edge_rows = rows[~end_buckets(rows['End'], granularity).isin(in_range.loc[whole, 'bucket'].unique())]
+        edges = bucket_scores(long_metric_frame(edge_rows, metrics), granularity)
+        selected = pd.concat([in_range[whole], edges], ignore_index=True)
+    else:
+        selected = bucket_scores(long_metric_frame(rows, metrics), granularity)
+
+    series = selected.assign(score=selected['sum'] / selected['count'])
+    return granularity, series[['Ship', 'metric', 'bucket', 'score', 'count']].sort_values(by='bucket')
@@ -0,0 +1,89 @@
+import logging
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Sailing name prefix -> ship; the prefix is everything before the first day
+SHIP_PREFIXES = {"MDY": "Discovery", "MDY2": "Discovery 2"}
+DEFAULT_FLEET = "Marella"
+
+# Both the folder form ("MDY2 24 March - 1 April") and the formatted form
+# ("MDY2-24March-1April") match; the start month is optional and defaults to
+# the end month
+SAILING_NAME_RE = re.compile(
+    r'^([A-Za-z]+\d*)[\s-]+(\d{1,2})\s*([A-Za-z]*)\s*-\s*(\d{1,2})\s*([A-Za-z]+)\s*$'
+)
+# First space after the prefix becomes "-", see format_filename
+_PREFIX_SPACE_RE = re.compile(r'^([A-Za-z]+\d*) ')
+
+# Month lookup on the first three letters, so "Feb", "February" and "Sept" all work
+_MONTHS = {name: number for number, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+
+class SailingName:
+    """Parsed sailing name; start and end are ISO dates or None when invalid"""
+    __slots__ = ("ship", "start", "end", "fleet")
+
+    def __init__(self, ship: str, start: Optional[str], end: Optional[str], fleet: str = DEFAULT_FLEET):
+        self.ship = ship
+        self.start = start
+        self.end = end
+        self.fleet = fleet
+
+    def __eq__(self, other):
+        if not isinstance(other, SailingName):
+            return NotImplemented
+        return (self.ship, self.start, self.end, self.fleet) == (other.ship, other.start, other.end, other.fleet)
+
+    def __hash__(self):
+        return hash((self.ship, self.start, self.end, self.fleet))
+
+    def __repr__(self):
+        return f"SailingName(ship={self.ship!r}, start={self.start!r}, end={self.end!r}, fleet={self.fleet!r})"
+
+
+def _iso_date(year: int, day: str, month: str) -> Optional[str]:
+    number = _MONTHS.get(month[:3].lower())
+    if number is None:
+        return None
+    try:
+        return date(year, number, int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def parse_sailing_name(name: str, year: int = 2025) -> Optional[SailingName]:
+    """
+    Parse a sailing name such as 'MDY2-24March-1April' or 'MDY 2 - 9 Feb'
+
+    Both dates are taken in the given year, like filename_date always did.
+    Results are cached, so callers must treat the returned record as read-only.
+
+    Args:
+        name: Sailing folder name, raw or as produced by format_filename
+        year: Year of the sailing
+
+    Returns:
+        SailingName, or None if the name does not follow the naming scheme
+    """
+    match = SAILING_NAME_RE.match(name)
+    if not match:
+        logger.debug("Sailing name format not recognized: %s", name)
+        return None
+    prefix, start_day, start_month, end_day, end_month = match.groups()
+    return SailingName(
+        ship=SHIP_PREFIXES.get(prefix.upper(), prefix),
+        start=_iso_date(year, start_day, start_month or end_month),
+        end=_iso_date(year, end_day, end_month),
+    )
+
+
+@lru_cache(maxsize=8192)
+def format_sailing_name(folder_name: str) -> str:
+    """'MDY2 2 - 9 April' -> 'MDY2-2-9April'"""
+    return _PREFIX_SPACE_RE.sub(r"\1-", folder_name, count=1).replace(" ", "")
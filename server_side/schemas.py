@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+METRIC_ATTRIBUTES = ['Overall Holiday', 'Prior Customer Service', 'Flight', 'Embarkation/Disembarkation', 'Value for Money', 'App Booking', 'Pre-Cruise Hotel Accomodation', 'Cabins', 'Cabin Cleanliness', 'F&B Quality', 'F&B Service', 'Bar Service', 'Drinks Offerings and Menu', 'Entertainment', 'Excursions', 'Crew Friendliness', 'Ship Condition/Cleanliness (Public Areas)', 'Sentiment Score']
+
+# Compact dtype of metric columns whose values it holds exactly. Whole and
+# half ratings are exact in float32, but decimals such as 8.05 are not
+# (8.050000190734863, and 6.3 would no longer be <= 6.3), so columns holding
+# them (e.g. Sentiment Score) are kept as float64.
+METRIC_DTYPE = "float32"
+RATING_MIN = 0.0
+RATING_MAX = 10.0
+# Identifier columns repeat the same few values on every row
+CATEGORICAL_COLUMNS = ['Ship', 'Ship Name', 'Sailing Number', 'Fleet']
+
+RATING_SCHEMA: Dict[str, str] = {
+    **{metric: "float64" for metric in METRIC_ATTRIBUTES},
+    **{column: "category" for column in CATEGORICAL_COLUMNS},
+}
+# Fallback for files with non-numeric ratings: read metrics as text, then coerce
+RAW_METRIC_SCHEMA: Dict[str, type] = {metric: str for metric in METRIC_ATTRIBUTES}
+
+
+@dataclass
+class LoadReport:
+    """Problems found while loading one rating file"""
+    path: str
+    # column -> number of non-numeric cells (stored as NaN)
+    malformed: Dict[str, int] = field(default_factory=dict)
+    # column -> number of numeric cells outside RATING_MIN..RATING_MAX (stored as NaN)
+    out_of_range: Dict[str, int] = field(default_factory=dict)
+    # a few (row, column, raw value) samples for the log
+    examples: List[Tuple[int, str, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.malformed and not self.out_of_range
+
+
+def read_rating_csv(path: str, engine: str = "c") -> Tuple[pd.DataFrame, LoadReport]:
+    """
+    Read a rating CSV with the declared schema
+
+    Clean files are parsed straight into float64/categorical columns. If a
+    metric column holds non-numeric text, the file is re-read with metrics as
+    strings, every bad cell is counted in the report and stored as NaN.
+    Values outside the 0-10 scale are treated the same way. Metric columns
+    whose values are all exact in float32 are then stored as float32. Either
+    way the returned frame is fully typed, so request handlers never need to
+    coerce.
+
+    Args:
+        path: CSV file path
+        engine: pandas read_csv engine
+
+    Returns:
+        Tuple of (typed DataFrame, LoadReport); logging the report is left
+        to the caller
+    """
+    report = LoadReport(path=path)
+    # dtype entries for columns a file lacks are ignored by read_csv
+    try:
+        df = pd.read_csv(path, engine=engine, dtype=RATING_SCHEMA)
+        metrics = [c for c in df.columns if c in METRIC_ATTRIBUTES]
+    except ValueError:
+        df = pd.read_csv(path, engine=engine, dtype={**RATING_SCHEMA, **RAW_METRIC_SCHEMA})
+        metrics = [c for c in df.columns if c in METRIC_ATTRIBUTES]
+        for metric in metrics:
+            raw = df[metric]
+            numeric = pd.to_numeric(raw, errors='coerce')
+            bad = raw.notna() & numeric.isna()
+            if bad.any():
+                report.malformed[metric] = int(bad.sum())
+                report.examples.extend((int(i), metric, raw[i]) for i in raw.index[bad][:3])
+            df[metric] = numeric
+
+    if metrics:
+        block = df[metrics].to_numpy(dtype=np.float64)
+        outside = (block < RATING_MIN) | (block > RATING_MAX)
+        if outside.any():
+            for position in np.flatnonzero(outside.any(axis=0)):
+                metric, rows = metrics[position], np.flatnonzero(outside[:, position])
+                report.out_of_range[metric] = len(rows)
+                report.examples.extend((int(i), metric, str(block[i, position])) for i in rows[:3])
+            block[outside] = np.nan
+        compact = block.astype(METRIC_DTYPE)
+        exact = ((compact == block) | np.isnan(block)).all(axis=0)
+        if exact.any():
+            df[[m for m, keep in zip(metrics, exact) if keep]] = compact[:, exact]
+        if outside.any() and not exact.all():
+            df[[m for m, keep in zip(metrics, exact) if not keep]] = block[:, ~exact]
+    return df, report
@@ -0,0 +1,246 @@
+import re
+from itertools import chain
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Words are runs of letters/digits; apostrophes are dropped first so that
+# "didn't" is one token ("didnt") rather than "didn" + "t"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("""
+a an and are as at be been but by for from had has have he her his i if in into is it its
+me my no not of on or our so than that the their them then there these they this to too
+us was we were what when which who will with would you your
+""".split())
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of text, without stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower().replace("'", ""))
+            if token not in STOP_WORDS]
+
+
+class SailingTextIndex:
+    """
+    Inverted index over the reason texts of one sailing
+
+    Every non-empty reason cell (review row x metric column) is a document.
+    Posting lists are stored CSR-style: the documents of term t are
+    doc_ids[offsets[t]:offsets[t + 1]], with their term counts in freqs.
+    """
+    __slots__ = ("terms", "offsets", "doc_ids", "freqs", "doc_rows", "doc_metrics", "doc_lengths")
+
+    def __init__(self, terms: Dict[str, int], offsets: np.ndarray, doc_ids: np.ndarray, freqs: np.ndarray,
+                 doc_rows: np.ndarray, doc_metrics: np.ndarray, doc_lengths: np.ndarray):
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.freqs = freqs
+        self.doc_rows = doc_rows
+        self.doc_metrics = doc_metrics
+        self.doc_lengths = doc_lengths
+
+    @classmethod
+    def from_frame(cls, df_reason: pd.DataFrame, metrics: List[str]) -> "SailingTextIndex":
+        """
+        Args:
+            df_reason: Per-review reason texts of the sailing, one column per metric
+            metrics: Metric columns to index; the document metric is the
+                position in this list
+        """
+        doc_rows, doc_metrics, texts = [], [], []
+        for column, metric in enumerate(metrics):
+            if metric not in df_reason.columns:
+                continue
+            values = df_reason[metric]
+            present = values.notna().to_numpy()
+            rows = np.flatnonzero(present)
+            doc_rows.append(rows)
+            doc_metrics.append(np.full(len(rows), column, dtype=np.int16))
+            texts.extend(values[present].astype(str).tolist())
+        doc_rows = np.concatenate(doc_rows) if doc_rows else np.zeros(0, dtype=np.intp)
+        doc_metrics = np.concatenate(doc_metrics) if doc_metrics else np.zeros(0, dtype=np.int16)
+
+        # Tokenize like tokenize(), but number the words with one factorize
+        # call over all tokens instead of a dictionary lookup per token
+        token_lists = [TOKEN_PATTERN.findall(text.lower().replace("'", "")) for text in texts]
+        counts = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        codes, words = pd.factorize(pd.Series(list(chain.from_iterable(token_lists)), dtype=object))
+        stop = np.fromiter((word in STOP_WORDS for word in words), dtype=bool, count=len(words))
+        keep = ~stop[codes]
+        # Renumber the remaining words 0..n-1
+        term_numbers = np.cumsum(~stop) - 1
+        term_ids = term_numbers[codes[keep]]
+        token_docs = np.repeat(np.arange(len(texts)), counts)[keep]
+        terms = {word: int(number) for word, number in zip(words[~stop], term_numbers[~stop])}
+        lengths = np.bincount(token_docs, minlength=len(texts))
+
+        # Documents made only of stop words can never match
+        has_tokens = lengths > 0
+        doc_numbers = np.cumsum(has_tokens) - 1
+        doc_count = max(int(has_tokens.sum()), 1)
+        # One (term, doc) pair per occurrence; sorting the combined key groups
+        # the postings by term, in doc order, and counts give the frequencies
+        pairs, freqs = np.unique(term_ids * doc_count + doc_numbers[token_docs], return_counts=True)
+        offsets = np.searchsorted(pairs // doc_count, np.arange(len(terms) + 1))
+        return cls(
+            terms,
+            offsets.astype(np.int64),
+            (pairs % doc_count).astype(np.int32),
+            freqs.astype(np.uint32),
+            doc_rows[has_tokens].astype(np.int32),
+            doc_metrics[has_tokens],
+            lengths[has_tokens].astype(np.uint32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_rows)
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc ids, term counts) of term; empty arrays when it does not occur"""
+        t = self.terms.get(term)
+        if t is None:
+            return self.doc_ids[:0], self.freqs[:0]
+        start, end = self.offsets[t], self.offsets[t + 1]
+        return self.doc_ids[start:end], self.freqs[start:end]
+
+
+class SearchIndex:
+    """
+    Full-text index over the reason texts of every sailing in a snapshot
+
+    Holds one SailingTextIndex per sailing key, so a query restricted to some
+    sailings only reads their posting lists, and a reload only re-indexes the
+    sailings whose reason frames changed. BM25 statistics (document count,
+    average length, document frequencies) are taken over the documents the
+    query is restricted to.
+    """
+    __slots__ = ("metrics", "metric_index", "segments", "sources")
+
+    def __init__(self, metrics: List[str], segments: Dict[str, SailingTextIndex],
+                 sources: Dict[str, pd.DataFrame]):
+        self.metrics = list(metrics)
+        self.metric_index = {metric: j for j, metric in enumerate(self.metrics)}
+        self.segments = segments
+        # the reason frame each segment was built from, to detect changes
+        self.sources = sources
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame], metrics: List[str],
+                    previous: Optional["SearchIndex"] = None) -> "SearchIndex":
+        """
+        Args:
+            frames: Sailing key -> reason texts (snapshot.sailing_reason)
+            metrics: Metric columns to index
+            previous: Index of the previous snapshot; segments of frames it
+                already indexed (the same DataFrame object) are reused
+        """
+        reuse = previous is not None and previous.metrics == list(metrics)
+        segments = {}
+        for key, df_reason in frames.items():
+            if reuse and previous.sources.get(key) is df_reason:
+                segments[key] = previous.segments[key]
+            else:
+                segments[key] = SailingTextIndex.from_frame(df_reason, metrics)
+        return cls(metrics, segments, dict(frames))
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments.values())
+
+    def search(self, query: str, keys: Iterable[str], metric: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> Tuple[int, List[Tuple[str, int, str, float]]]:
+        """
+        Rank the documents of the given sailings against query with BM25
+
+        A document matches when it contains any query term; documents with
+        more (and rarer) query terms rank higher.
+
+        Args:
+            query: Free text, tokenized like the documents
+            keys: Sailing keys to search
+            metric: Only search the reasons given for this metric
+            limit: Number of hits to return
+            offset: Number of best hits to skip
+
+        Returns:
+            Tuple of (number of matching documents, hits as
+            (sailing key, review row, metric, score) tuples, best first)
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        column = self.metric_index.get(metric) if metric is not None else None
+        if not terms or (metric is not None and column is None):
+            return 0, []
+
+        # Gather the postings of every term in every selected sailing
+        selected, doc_total, length_total = [], 0, 0
+        term_docs = np.zeros(len(terms), dtype=np.int64)
+        for key in keys:
+            segment = self.segments.get(key)
+            if segment is None or not len(segment):
+                continue
+            lengths = segment.doc_lengths
+            if column is not None:
+                in_metric = segment.doc_metrics == column
+                doc_total += int(in_metric.sum())
+                length_total += int(lengths[in_metric].sum())
+            else:
+                doc_total += len(segment)
+                length_total += int(lengths.sum())
+            postings = []
+            for i, term in enumerate(terms):
+                docs, freqs = segment.postings(term)
+                if column is not None and len(docs):
+                    keep = segment.doc_metrics[docs] == column
+                    docs, freqs = docs[keep], freqs[keep]
+                term_docs[i] += len(docs)
+                postings.append((docs, freqs))
+            selected.append((key, segment, postings))
+        if not doc_total or not term_docs.any():
+            return 0, []
+
+        idf = np.log1p((doc_total - term_docs + 0.5) / (term_docs + 0.5))
+        average_length = length_total / doc_total
+        keys_hit, docs_hit, scores_hit = [], [], []
+        for number, (key, segment, postings) in enumerate(selected):
+            docs = np.concatenate([docs for docs, _ in postings])
+            if not len(docs):
+                continue
+            freqs = np.concatenate([freqs for _, freqs in postings]).astype(np.float64)
+            weights = np.repeat(idf, [len(d) for d, _ in postings])
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * segment.doc_lengths[docs] / average_length)
+            # Sum the per-term scores of each document
+            unique_docs, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights * freqs * (BM25_K1 + 1) / (freqs + norm))
+            keys_hit.append(np.full(len(unique_docs), number, dtype=np.int32))
+            docs_hit.append(unique_docs)
+            scores_hit.append(scores)
+        if not scores_hit:
+            return 0, []
+
+        owners = np.concatenate(keys_hit)
+        docs = np.concatenate(docs_hit)
+        scores = np.concatenate(scores_hit)
+        total = len(scores)
+        wanted = min(offset + limit, total)
+        if wanted <= 0 or offset >= total:
+            return total, []
+        # Keep every hit scoring at least the wanted-th best score, then order
+        # them by (score, position): cutting at a score rather than a count
+        # keeps all tied hits, so every page sees the same total order
+        if wanted < total:
+            cutoff = -np.partition(-scores, wanted - 1)[wanted - 1]
+            best = np.flatnonzero(scores >= cutoff)
+        else:
+            best = np.arange(total)
+        best = best[np.lexsort((best, -scores[best]))][offset:offset + limit]
+        hits = []
+        for i in best.tolist():
+            key, segment, _ = selected[owners[i]]
+            doc = docs[i]
+            hits.append((key, int(segment.doc_rows[doc]), self.metrics[segment.doc_metrics[doc]],
+                         float(scores[i])))
+        return total, hits
@@ -0,0 +1,140 @@
+"""
+Production server for the sailing API: preforked gunicorn workers
+
+The master process imports flask_comments (loading every sailing folder
+and building the indexes) before forking, so workers start warm and share
+the snapshot's memory copy-on-write instead of each loading their own.
+
+Data reloads are owned by the master. A SIGHUP, from the folder watcher,
+/sailing/admin/reload (only served when SAILING_ADMIN_TOKEN is set) or
+`kill -HUP <master pid>`, makes it ingest changed
+folders into its snapshot, fork fresh workers from it and gracefully stop
+the old ones once their in-flight requests finish.
+
+Configuration (environment):
+    SAILING_BIND            address to listen on (default 0.0.0.0:5000)
+    SAILING_WORKERS         worker processes (default: number of cores)
+    SAILING_THREADS         threads per worker (default 4)
+    SAILING_TIMEOUT         seconds before a silent worker is restarted (default 60)
+    SAILING_WATCH_INTERVAL  seconds between data root scans in the master (0 disables)
+plus every SAILING_* variable flask_comments reads.
+
+Usage (from server_side/):
+    SAILING_WORKERS=8 python serve.py
+"""
+import logging
+import os
+import signal
+import threading
+import time
+
+from gunicorn.app.base import BaseApplication
+
+logger = logging.getLogger(__name__)
+
+BIND = os.environ.get("SAILING_BIND", "0.0.0.0:5000")
+WORKERS = int(os.environ.get("SAILING_WORKERS", "0")) or os.cpu_count() or 1
+THREADS = int(os.environ.get("SAILING_THREADS", "4"))
+TIMEOUT = int(os.environ.get("SAILING_TIMEOUT", "60"))
+WATCH_INTERVAL = float(os.environ.get("SAILING_WATCH_INTERVAL", "0"))
+
+
+def refresh_data(store) -> bool:
+    """Ingest changed folders into the master's snapshot; True when anything changed"""
+    try:
+        result = store.refresh()
+    except Exception:
+        logger.exception("Sailing data refresh failed; keeping data version %d", store.current().version)
+        return False
+    return any(value for key, value in result.items() if key != "version")
+
+
+def start_master_watcher(store, interval: float) -> threading.Thread:
+    """Scan the data roots from the master and roll the workers when data changed"""
+    def watch():
+        while True:
+            time.sleep(interval)
+            if refresh_data(store):
+                # on_reload finds nothing left to ingest, warms the new
+                # snapshot up and forks from it
+                os.kill(os.getpid(), signal.SIGHUP)
+
+    thread = threading.Thread(target=watch, name="sailing-master-watcher", daemon=True)
+    thread.start()
+    return thread
+
+
+def request_master_reload():
+    """/sailing/admin/reload in a worker: ask the master to reload and roll the workers"""
+    import flask_comments
+
+    os.kill(os.getppid(), signal.SIGHUP)
+    return {"version": flask_comments.STORE.current().version, "reloading": True}
+
+
+def on_reload(server):
+    import flask_comments
+
+    flask_comments.refresh_keywords()
+    refresh_data(flask_comments.STORE)
+    snapshot = flask_comments.STORE.current()
+    # Compare versions rather than trusting this refresh: the master watcher
+    # has already ingested the change by the time it sends SIGHUP
+    if snapshot.version != flask_comments.WARMED_VERSION:
+        flask_comments.warm_up(snapshot)
+    logger.info("Forking workers for data version %d", snapshot.version)
+
+
+def post_fork(server, worker):
+    import flask_comments
+
+    flask_comments.STORE.after_fork()
+    flask_comments.reload_snapshot = request_master_reload
+
+
+def when_ready(server):
+    import flask_comments
+
+    if WATCH_INTERVAL > 0:
+        start_master_watcher(flask_comments.STORE, WATCH_INTERVAL)
+    logger.info("Serving data version %d with %d workers x %d threads",
+                flask_comments.STORE.current().version, WORKERS, THREADS)
+
+
+class SailingApplication(BaseApplication):
+    """gunicorn application serving flask_comments.app, preloaded in the master"""
+
+    def __init__(self, options=None):
+        self.options = {
+            "bind": BIND,
+            "workers": WORKERS,
+            "threads": THREADS,
+            "timeout": TIMEOUT,
+            "preload_app": True,
+            "on_reload": on_reload,
+            "post_fork": post_fork,
+            "when_ready": when_ready,
+            **(options or {}),
+        }
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # The master watcher (see when_ready) rolls the workers after a
+        # refresh; flask_comments' own watcher would only update the master
+        interval = os.environ.pop("SAILING_WATCH_INTERVAL", None)
+        try:
+            import flask_comments
+        finally:
+            if interval is not None:
+                os.environ["SAILING_WATCH_INTERVAL"] = interval
+        return flask_comments.app
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("SAILING_LOG_LEVEL", "INFO"),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    SailingApplication().run()
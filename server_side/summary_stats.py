@@ -0,0 +1,83 @@
+import pandas as pd
+from typing import Dict, List, Union
+
+from summary_table import SummaryTable
+
+# Metrics the dashboard needs from the per-sailing summaries
+DASHBOARD_KPI_METRICS = ['F&B Quality', 'Cabin Cleanliness', 'Crew Friendliness', 'Entertainment']
+DASHBOARD_TREND_METRICS = ['F&B Quality', 'Cabin Cleanliness', 'Entertainment']
+DASHBOARD_COMPARISON_METRICS = ['F&B Quality', 'Cabin Cleanliness', 'Crew Friendliness', 'Entertainment', 'Excursions']
+
+
+def build_summary_frame(summaries: Union[SummaryTable, List[Dict]], metrics: List[str]) -> pd.DataFrame:
+    """
+    Build the per-sailing stats frame used for server-side aggregation
+
+    Args:
+        summaries: SummaryTable, or per-sailing summary dicts (the SAMPLE_DATA shape)
+        metrics: Metric columns to keep as floats
+
+    Returns:
+        DataFrame with one row per sailing, parsed Start/End dates and float
+        metric columns
+    """
+    if isinstance(summaries, SummaryTable):
+        df = summaries.to_frame()
+    else:
+        df = pd.DataFrame.from_records(summaries)
+    for column in ['Ship Name', 'Sailing Number', 'Ship', 'Start', 'End']:
+        if column not in df.columns:
+            df[column] = None
+    for metric in metrics:
+        if metric in df.columns:
+            df[metric] = pd.to_numeric(df[metric], errors='coerce').astype(float)
+        else:
+            df[metric] = float('nan')
+
+    df['Start'] = pd.to_datetime(df['Start'], errors='coerce')
+    df['End'] = pd.to_datetime(df['End'], errors='coerce')
+    df['Ship'] = df['Ship'].fillna(df['Ship Name'])
+    return df
+
+
+def _clean(value) -> Union[float, None]:
+    """Round a pandas aggregate for JSON, mapping NaN to None"""
+    return None if pd.isna(value) else round(float(value), 2)
+
+
+def trend_points(series: pd.DataFrame) -> List[Dict]:
+    """Serialize a query_trends result as a list of points"""
+    return [
+        {
+            "date": bucket.strftime("%Y-%m-%d"),
+            "ship": ship,
+            "metric": metric,
+            "score": _clean(score),
+            "count": int(count)
+        }
+        for ship, metric, bucket, score, count in series.itertuples(index=False)
+    ]
+
+
+def dashboard_aggregates(rows: pd.DataFrame) -> Dict:
+    """
+    Aggregate the selected sailings into the dashboard payload
+
+    Args:
+        rows: Selected rows of the summary frame
+
+    Returns:
+        Dictionary with
+            kpis: average of each KPI metric over the selected sailings
+            shipMeans: mean of each comparison metric per Ship Name
+    """
+    kpis = rows[DASHBOARD_KPI_METRICS].mean()
+    ship_means = rows.groupby('Ship Name')[DASHBOARD_COMPARISON_METRICS].mean()
+
+    return {
+        "kpis": {metric: _clean(kpis[metric]) for metric in DASHBOARD_KPI_METRICS},
+        "shipMeans": [
+            {"ship": ship, **{metric: _clean(means[metric]) for metric in DASHBOARD_COMPARISON_METRICS}}
+            for ship, means in ship_means.iterrows()
+        ]
+    }
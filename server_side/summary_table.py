@@ -0,0 +1,243 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Metadata columns every summary carries; Start/End are stored as dates
+KEY_COLUMNS = ['Ship Name', 'Sailing Number']
+DATE_COLUMNS = ['Start', 'End']
+
+# Missing metrics are imputed as IMPUTE_BASE_METRIC - IMPUTE_OFFSET, or
+# IMPUTE_DEFAULT when the base metric itself is missing
+IMPUTE_BASE_METRIC = 'Overall Holiday'
+IMPUTE_OFFSET = 1
+IMPUTE_DEFAULT = 6
+# Imputed cells are recorded one bit per metric in a uint32 per row
+MAX_IMPUTE_METRICS = 32
+
+
+def impute_missing(values: np.ndarray, metrics: List[str]):
+    """
+    Fill NaN metric values row-wise
+
+    The fill value of each row is broadcast over the row's NaN mask in one
+    operation, and the mask is packed into a bitmask (bit j set when
+    metrics[j] was imputed).
+
+    Args:
+        values: (sailings x metrics) float array
+        metrics: Metric names, in column order of values
+
+    Returns:
+        Tuple of (filled copy of values, uint32 bitmask per row)
+    """
+    if len(metrics) > MAX_IMPUTE_METRICS:
+        raise ValueError(f"At most {MAX_IMPUTE_METRICS} metrics can be tracked, got {len(metrics)}")
+    missing = np.isnan(values)
+    if IMPUTE_BASE_METRIC in metrics:
+        fill = values[:, metrics.index(IMPUTE_BASE_METRIC)] - IMPUTE_OFFSET
+        fill[np.isnan(fill)] = IMPUTE_DEFAULT
+    else:
+        fill = np.full(values.shape[0], float(IMPUTE_DEFAULT))
+    filled = np.where(missing, fill[:, None], values)
+    bits = np.left_shift(missing.astype(np.uint32), np.arange(len(metrics), dtype=np.uint32))
+    return filled, np.bitwise_or.reduce(bits, axis=1).astype(np.uint32)
+
+
+def _iso_dates(values: np.ndarray) -> List[Optional[str]]:
+    """datetime64[D] array -> 'YYYY-MM-DD' strings, None for NaT"""
+    strings = np.datetime_as_string(values, unit='D').astype(object)
+    strings[np.isnat(values)] = None
+    return strings.tolist()
+
+
+class SummaryRow:
+    """
+    Read-only, dict-like view of one row of a SummaryTable
+
+    Nothing is copied: metric lookups read straight from the table's array.
+    """
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "SummaryTable", index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, key: str):
+        table = self.table
+        position = table.metric_index.get(key)
+        if position is not None:
+            value = table.values[self.index, position]
+            return None if np.isnan(value) else float(value)
+        if key in table.dates:
+            value = table.dates[key][self.index]
+            return None if np.isnat(value) else str(value)
+        if key in table.meta:
+            return table.meta[key][self.index]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    @property
+    def metric_values(self) -> np.ndarray:
+        """The row's metric values as a view into the table (NaN when missing)"""
+        return self.table.values[self.index]
+
+    def to_dict(self) -> Dict:
+        return self.table.to_records([self.index])[0]
+
+
+class SummaryTable:
+    """
+    Column-oriented store for the per-sailing summaries
+
+    Metric values live in one (sailings x metrics) float64 array and the
+    remaining fields in one array per column, instead of one dict per
+    sailing. The SAMPLE_DATA dict shape is only rebuilt by to_records, when
+    a response is serialized.
+
+    Attributes:
+        metrics: Metric names, in column order of values
+        metric_index: Metric name -> column of values
+        values: Metric values, NaN where missing (unless imputed)
+        imputed: uint32 bitmask per row of the metrics filled by impute_missing
+        meta: Column name -> object array (Ship Name, Sailing Number, Ship, Fleet, ...)
+        dates: 'Start'/'End' -> datetime64[D] array, NaT where missing
+    """
+    __slots__ = ("metrics", "metric_index", "values", "imputed", "meta", "dates", "_lookup")
+
+    def __init__(self, metrics: List[str], values: np.ndarray,
+                 meta: Dict[str, np.ndarray], dates: Dict[str, np.ndarray],
+                 imputed: Optional[np.ndarray] = None):
+        self.metrics = list(metrics)
+        self.metric_index = {metric: i for i, metric in enumerate(self.metrics)}
+        self.values = values
+        self.imputed = np.zeros(values.shape[0], dtype=np.uint32) if imputed is None else imputed
+        self.meta = meta
+        self.dates = dates
+        # (ship name, sailing number), lower-cased -> first matching row
+        self._lookup = {}
+        for i, key in enumerate(zip(meta['Ship Name'], meta['Sailing Number'])):
+            self._lookup.setdefault((str(key[0]).lower(), str(key[1]).lower()), i)
+
+    @classmethod
+    def from_records(cls, summaries: Sequence[Dict], metrics: List[str],
+                     impute: bool = True) -> "SummaryTable":
+        """
+        Build a table from summary dicts in the SAMPLE_DATA shape
+
+        Args:
+            summaries: Per-sailing summary dicts
+            metrics: Metric keys to store in the values array; any other
+                key becomes a metadata column
+            impute: Fill missing metrics with impute_missing
+
+        Returns:
+            SummaryTable with one row per summary, in order
+        """
+        metric_set = set(metrics)
+        values = np.array(
+            [[s.get(metric) for metric in metrics] for s in summaries], dtype=float
+        ).reshape(len(summaries), len(metrics))
+        imputed = None
+        if impute:
+            values, imputed = impute_missing(values, metrics)
+
+        meta_columns = list(KEY_COLUMNS)
+        for summary in summaries:
+            for key in summary:
+                if key not in metric_set and key not in DATE_COLUMNS and key not in meta_columns:
+                    meta_columns.append(key)
+        meta = {}
+        for column in meta_columns:
+            array = np.empty(len(summaries), dtype=object)
+            array[:] = [s.get(column) for s in summaries]
+            meta[column] = array
+
+        dates = {
+            column: np.array(
+                [s.get(column) if isinstance(s.get(column), str) else None for s in summaries],
+                dtype='datetime64[D]'
+            )
+            for column in DATE_COLUMNS
+        }
+        return cls(metrics, values, meta, dates, imputed)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def find(self, ship_name: str, sailing_number: str) -> Optional[int]:
+        """Row of a sailing, matched case-insensitively like find_sailings"""
+        return self._lookup.get((str(ship_name).lower(), str(sailing_number).lower()))
+
+    def row(self, index: int) -> SummaryRow:
+        return SummaryRow(self, int(index))
+
+    def rows(self, indices: Optional[Sequence[int]] = None) -> Iterator[SummaryRow]:
+        """Row views for indices (all rows when None)"""
+        for index in range(len(self)) if indices is None else indices:
+            yield SummaryRow(self, int(index))
+
+    def between(self, from_date, to_date) -> np.ndarray:
+        """Rows whose Start >= from_date and End <= to_date"""
+        start = pd.Timestamp(from_date).to_datetime64()
+        end = pd.Timestamp(to_date).to_datetime64()
+        return np.flatnonzero((self.dates['Start'] >= start) & (self.dates['End'] <= end))
+
+    def imputed_mask(self, indices: Optional[Union[Sequence[int], np.ndarray]] = None) -> np.ndarray:
+        """Boolean (rows x metrics) matrix of imputed cells, decoded from the bitmask"""
+        bits = self.imputed if indices is None else self.imputed[np.asarray(indices, dtype=np.intp)]
+        shifts = np.arange(len(self.metrics), dtype=np.uint32)
+        return (np.right_shift(bits[:, None], shifts) & 1).astype(bool)
+
+    def to_records(self, indices: Optional[Union[Sequence[int], np.ndarray]] = None,
+                   include_imputed: bool = False, restore_missing: bool = False) -> List[Dict]:
+        """
+        Summary dicts for the given rows, in the original SAMPLE_DATA shape
+
+        Missing metrics are None; metadata keys are only included when set,
+        except Ship Name, Sailing Number, Start and End which always are.
+
+        Args:
+            indices: Rows to convert, all rows when None
+            include_imputed: Add an "imputedMetrics" list to every record
+            restore_missing: Report imputed metrics as None, i.e. the
+                summaries as they were before imputation
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.intp)
+        values = self.values[indices]
+        mask = self.imputed_mask(indices) if include_imputed or restore_missing else None
+        if restore_missing:
+            values = np.where(mask, np.nan, values)
+        cells = values.astype(object)
+        cells[np.isnan(values)] = None
+        dates = {column: _iso_dates(array[indices]) for column, array in self.dates.items()}
+        meta = {column: array[indices].tolist() for column, array in self.meta.items()}
+
+        records = []
+        for i, row in enumerate(cells.tolist()):
+            record = dict(zip(self.metrics, row))
+            for column, column_values in meta.items():
+                value = column_values[i]
+                if value is not None or column in KEY_COLUMNS:
+                    record[column] = value
+            for column, column_values in dates.items():
+                record[column] = column_values[i]
+            if include_imputed:
+                record["imputedMetrics"] = [m for m, flag in zip(self.metrics, mask[i]) if flag]
+            records.append(record)
+        return records
+
+    def to_frame(self) -> pd.DataFrame:
+        """All rows as a DataFrame: float metric columns, metadata and datetime Start/End"""
+        frame = pd.DataFrame(self.values, columns=self.metrics)
+        for column, array in self.meta.items():
+            frame[column] = array
+        for column, array in self.dates.items():
+            frame[column] = pd.to_datetime(array)
+        return frame
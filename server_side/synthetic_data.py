@@ -0,0 +1,285 @@
+import argparse
+import calendar
+import os
+import string
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from ingest import DataSnapshot, build_indexes
+from sailing_names import DEFAULT_FLEET, format_sailing_name
+from schemas import METRIC_ATTRIBUTES, METRIC_DTYPE
+from summary_table import SummaryTable
+from test_data import sailing_key
+
+# One sailing a week from the first Monday-ish of January keeps every sailing
+# inside its year, which filename_date assumes
+FIRST_SAILING = (1, 3)
+SAILING_DAYS = 7
+MAX_SAILINGS_PER_YEAR = 51
+
+MISSING_RATING_RATE = 0.06
+MISSING_REASON_RATE = 0.1
+
+GENERIC_WORDS = [
+    "the", "we", "was", "very", "our", "and", "but", "really", "holiday", "cruise", "ship",
+    "crew", "time", "day", "night", "again", "would", "family", "trip", "overall", "staff",
+    "first", "next", "though", "quite", "experience", "expected", "booked", "week", "always",
+]
+POSITIVE_PHRASES = [
+    "excellent", "friendly and helpful", "really enjoyed it", "great value", "spotless",
+    "well organised", "fantastic choice", "could not fault it", "lovely atmosphere",
+]
+# Complaints are metric specific so review search and keyword extraction have signal
+COMPLAINTS: Dict[str, List[str]] = {
+    "Flight": ["flight delayed", "late departure", "lost luggage", "cramped seats"],
+    "Embarkation/Disembarkation": ["long queues at boarding", "disembarkation chaos", "waited hours"],
+    "Value for Money": ["overpriced extras", "not worth the money", "hidden charges"],
+    "App Booking": ["app kept crashing", "booking failed", "could not log in"],
+    "Cabins": ["cabin too small", "noisy cabin", "broken air conditioning", "uncomfortable bed"],
+    "Cabin Cleanliness": ["dirty bathroom", "stained carpet", "cabin not cleaned", "mould in shower"],
+    "F&B Quality": ["cold food", "bland buffet", "repetitive menu", "undercooked chicken"],
+    "F&B Service": ["slow service", "rude waiter", "long wait for tables", "orders forgotten"],
+    "Bar Service": ["slow bar service", "bar queues", "staff ignored us"],
+    "Drinks Offerings and Menu": ["limited drinks menu", "watered down cocktails", "no decent wine"],
+    "Entertainment": ["boring shows", "same acts every night", "too loud", "nothing for teenagers"],
+    "Excursions": ["excursion cancelled", "overcrowded coach", "rushed tour", "poor guide"],
+    "Crew Friendliness": ["unhelpful crew", "rude reception", "staff seemed stressed"],
+    "Ship Condition/Cleanliness (Public Areas)": ["dirty pool area", "tired decor", "broken lifts"],
+}
+GENERIC_COMPLAINTS = ["disappointing", "poor", "not as advertised", "let down", "below standard"]
+
+
+@dataclass
+class SyntheticSailing:
+    """One generated sailing: its naming, dates and per-review frames"""
+    ship: str
+    year: int
+    folder_name: str  # raw folder form, e.g. 'SHA25 24 March - 31 March'
+    name: str  # formatted form used as the Ship Name, e.g. 'SHA25-24March-31March'
+    start: date
+    end: date
+    ratings: pd.DataFrame
+    reasons: pd.DataFrame
+
+
+def ship_code(index: int) -> str:
+    """Letters-only code for the index-th ship: A..Z, AA, AB, ..."""
+    code = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        code = string.ascii_uppercase[remainder] + code
+    return code
+
+
+def ship_name(index: int) -> str:
+    return f"Synthetic {ship_code(index)}"
+
+
+def data_root_name(ship: str, year: int) -> str:
+    """Data root folder of a ship and year, e.g. 'SYNTHETIC A - 2025' (see root_ship_and_year)"""
+    return f"{ship.upper()} - {year}"
+
+
+def sailing_prefix(ship_index: int, year: int) -> str:
+    """
+    Sailing name prefix, e.g. 'SHA25'
+
+    Lookup keys are built from the name only, so the year is part of the
+    prefix to keep sailings of the same ship in different years apart. The
+    prefix is letters followed by digits, like MDY2, so sailing_names parses it.
+    """
+    return f"SH{ship_code(ship_index)}{year % 100:02d}"
+
+
+def sailing_folder_name(prefix: str, start: date, end: date) -> str:
+    """Raw folder name in the MDY2 style: 'MDY2 2 - 9 April' or 'MDY2 24 March - 1 April'"""
+    end_month = calendar.month_name[end.month]
+    if start.month == end.month:
+        return f"{prefix} {start.day} - {end.day} {end_month}"
+    return f"{prefix} {start.day} {calendar.month_name[start.month]} - {end.day} {end_month}"
+
+
+def sailing_dates(year: int, count: int) -> List[date]:
+    if count > MAX_SAILINGS_PER_YEAR:
+        raise ValueError(f"At most {MAX_SAILINGS_PER_YEAR} sailings per ship and year, got {count}")
+    first = date(year, *FIRST_SAILING)
+    return [first + timedelta(days=SAILING_DAYS * week) for week in range(count)]
+
+
+def _reason_texts(rng: np.random.Generator, ratings: np.ndarray, metrics: List[str],
+                  review_words: int) -> np.ndarray:
+    """Free-text reasons matching the ratings: complaints for low scores, praise otherwise"""
+    n_reviews = ratings.shape[0]
+    vocabulary = np.array(GENERIC_WORDS, dtype=object)
+    texts = np.empty(ratings.shape, dtype=object)
+    for column, metric in enumerate(metrics):
+        complaints = np.array(COMPLAINTS.get(metric, GENERIC_COMPLAINTS), dtype=object)
+        praise = np.array(POSITIVE_PHRASES, dtype=object)
+        lengths = np.maximum(1, rng.poisson(review_words, n_reviews))
+        filler = vocabulary[rng.integers(0, len(vocabulary), (n_reviews, lengths.max()))]
+        low = ratings[:, column] < 5
+        lead = np.where(low, complaints[rng.integers(0, len(complaints), n_reviews)],
+                        praise[rng.integers(0, len(praise), n_reviews)])
+        texts[:, column] = [
+            f"{metric.lower()} {phrase} " + " ".join(words[:length])
+            for phrase, words, length in zip(lead, filler, lengths)
+        ]
+    texts[rng.random(ratings.shape) < MISSING_REASON_RATE] = None
+    return texts
+
+
+def generate_sailing(rng: np.random.Generator, metrics: List[str], ship_index: int, year: int,
+                     start: date, reviews_per_sailing: int, review_words: int) -> SyntheticSailing:
+    """Generate the rating and reason frames of one sailing"""
+    end = start + timedelta(days=SAILING_DAYS)
+    folder_name = sailing_folder_name(sailing_prefix(ship_index, year), start, end)
+
+    # A sailing-wide quality level, a per-metric bias and per-review noise
+    quality = rng.normal(7.3, 0.8)
+    bias = rng.uniform(-1.5, 1.0, len(metrics))
+    ratings = np.clip(np.rint(quality + bias + rng.normal(0, 1.8, (reviews_per_sailing, len(metrics)))), 0, 10)
+    ratings[rng.random(ratings.shape) < MISSING_RATING_RATE] = np.nan
+
+    return SyntheticSailing(
+        ship=ship_name(ship_index),
+        year=year,
+        folder_name=folder_name,
+        name=format_sailing_name(folder_name),
+        start=start,
+        end=end,
+        ratings=pd.DataFrame(ratings.astype(METRIC_DTYPE), columns=metrics),
+        reasons=pd.DataFrame(_reason_texts(rng, ratings, metrics, review_words), columns=metrics),
+    )
+
+
+def generate_sailings(metrics: List[str], ships: int = 2, years: int = 1, sailings_per_year: int = 20,
+                      reviews_per_sailing: int = 300, review_words: int = 20, first_year: int = 2025,
+                      seed: int = 0) -> Iterator[SyntheticSailing]:
+    """
+    Deterministically generate ships x years x sailings_per_year sailings
+
+    Each sailing gets its own random stream derived from (seed, ship, year,
+    week), so the same sailing is identical whatever the other sizes are.
+
+    Args:
+        metrics: Metric columns of the rating and reason frames
+        ships: Number of ships
+        years: Consecutive years per ship, starting at first_year
+        sailings_per_year: Weekly sailings per ship and year (at most 51)
+        reviews_per_sailing: Rows of each sailing's frames
+        review_words: Mean number of words per review text
+        first_year: First year of every ship
+        seed: Base seed
+
+    Yields:
+        SyntheticSailing, ship by ship, year by year, in date order
+    """
+    for ship_index in range(ships):
+        for year in range(first_year, first_year + years):
+            for week, start in enumerate(sailing_dates(year, sailings_per_year)):
+                rng = np.random.default_rng([seed, ship_index, year, week])
+                yield generate_sailing(rng, metrics, ship_index, year, start,
+                                       reviews_per_sailing, review_words)
+
+
+def sailing_summary(sailing: SyntheticSailing, metrics: List[str]) -> Dict:
+    """SAMPLE_DATA style summary of a generated sailing (see summarize_sailing)"""
+    means = sailing.ratings.mean()
+    summary = {metric: None if pd.isna(means[metric]) else round(float(means[metric]), 2)
+               for metric in metrics}
+    summary.update({
+        "Ship Name": sailing.name,
+        "Sailing Number": "1",
+        "Fleet": DEFAULT_FLEET,
+        "Ship": sailing.ship,
+        "Start": sailing.start.isoformat(),
+        "End": sailing.end.isoformat(),
+    })
+    return summary
+
+
+def build_synthetic_snapshot(metrics: List[str], version: int = 1, **sizes) -> DataSnapshot:
+    """
+    In-memory DataSnapshot of generated sailings, no CSV folders needed
+
+    Args:
+        metrics: Metric columns served by the API
+        version: Snapshot version
+        **sizes: Passed on to generate_sailings (ships, years,
+            sailings_per_year, reviews_per_sailing, review_words, seed, ...)
+
+    Returns:
+        Snapshot with all indexes built, ready for SnapshotStore.swap
+    """
+    summaries, sailing_data, sailing_reason = [], {}, {}
+    for sailing in generate_sailings(metrics, **sizes):
+        key = sailing_key(sailing.name)
+        sailing_data[key] = sailing.ratings
+        sailing_reason[key] = sailing.reasons
+        summaries.append(sailing_summary(sailing, metrics))
+
+    snapshot = DataSnapshot(
+        version=version,
+        summary_table=SummaryTable.from_records(summaries, metrics),
+        sailing_data=sailing_data,
+        sailing_reason=sailing_reason,
+        summary_frame=pd.DataFrame(),
+        rollup_cubes={},
+        derived_keys=frozenset(sailing_data),
+    )
+    return build_indexes(snapshot, metrics)
+
+
+def write_dataset(root: str, metrics: List[str] = METRIC_ATTRIBUTES, **sizes) -> List[str]:
+    """
+    Write generated sailings as CSV folders in the layout the loaders expect
+
+    One data root per ship and year ('SYNTHETIC A - 2025'), holding one
+    folder per sailing ('SHA25 3 - 10 January') with '<folder>.csv' ratings
+    and '<folder>_reason.csv' reasons. Output is identical for identical
+    arguments, and sailings are streamed to disk one at a time, so thousands
+    of ships x years only need disk space.
+
+    Args:
+        root: Directory to write into (created if missing)
+        metrics: Metric columns of the CSVs
+        **sizes: Passed on to generate_sailings
+
+    Returns:
+        The data roots, in generation order (for the data_directs argument
+        of the loaders). They are all sub-directories of root, so a server
+        is pointed at the dataset with SAILING_DATA_PARENT=root.
+    """
+    data_directs = {}
+    for sailing in generate_sailings(metrics, **sizes):
+        data_dir = data_directs.setdefault(
+            (sailing.ship, sailing.year), os.path.join(root, data_root_name(sailing.ship, sailing.year)))
+        folder = os.path.join(data_dir, sailing.folder_name)
+        os.makedirs(folder, exist_ok=True)
+        # Ratings are whole numbers with blanks for missing, as in the survey exports
+        sailing.ratings.astype("Int64").to_csv(os.path.join(folder, f"{sailing.folder_name}.csv"), index=False)
+        sailing.reasons.to_csv(os.path.join(folder, f"{sailing.folder_name}_reason.csv"), index=False)
+    return list(data_directs.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic sailing dataset as CSV folders")
+    parser.add_argument("root", help="output directory")
+    parser.add_argument("--ships", type=int, default=2)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--first-year", type=int, default=2025)
+    parser.add_argument("--sailings-per-year", type=int, default=20)
+    parser.add_argument("--reviews", type=int, default=300, help="reviews per sailing")
+    parser.add_argument("--review-words", type=int, default=20, help="mean words per review text")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    roots = write_dataset(args.root, ships=args.ships, years=args.years, first_year=args.first_year,
+                          sailings_per_year=args.sailings_per_year, reviews_per_sailing=args.reviews,
+                          review_words=args.review_words, seed=args.seed)
+    print(f"Wrote {len(roots)} data roots; serve them with SAILING_DATA_PARENT={os.path.abspath(args.root)}")
@@ -1,9 +1,25 @@
 import os
+import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import re
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import json
+import logging
+from schemas import METRIC_ATTRIBUTES, read_rating_csv
+from summary_table import impute_missing
+from sailing_names import format_sailing_name, parse_sailing_name
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401  (only needed as the read_csv engine)
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# Reason files hold free text in every column
+REASON_DTYPE = str
 
 
 summary_data = [
@@ -643,78 +659,47 @@ summary_discovery = [
     ]
 
 
-def filename_date(filename, dNumber, year=2025):
-    if dNumber == 1:
-        match = re.match(r'MDY-(\d+[A-Za-z]*)-(\d+[A-Za-z]+)', filename)
-    else:
-    # Extract all date parts using improved regex
-        match = re.match(r'MDY2-(\d+[A-Za-z]*)-(\d+[A-Za-z]+)', filename)
-    if not match:
-        print(f"Filename format not recognized: {filename}")
-        return None, None
-    
-    start_part, end_part = match.groups()
-    
-    def parse_date(part, month_hint=None):
-        try:
-            # Extract day and month
-            day = int(re.search(r'^\d+', part).group())
-            month_match = re.search(r'[A-Za-z]+', part)
-            month = month_match.group().capitalize() if month_match else month_hint
-            
-            if not month:
-                raise ValueError(f"Missing month in: {part}")
-            
-            # Handle month abbreviations (Feb -> February)
-            month_map = {
-                'Jan': 'January', 'Feb': 'February', 'Mar': 'March', 'Apr': 'April',
-                'May': 'May', 'Jun': 'June', 'Jul': 'July', 'Aug': 'August',
-                'Sep': 'September', 'Oct': 'October', 'Nov': 'November', 'Dec': 'December'
-            }
-            full_month = month_map.get(month[:3], month)
-            
-            return datetime.strptime(f"{day} {full_month} {year}", "%d %B %Y")
-        except Exception as e:
-            print(f"Error parsing date part '{part}': {e}")
-            return None
-    
-    try:
-        # Get month from end date to use as hint for start date
-        end_month = re.search(r'[A-Za-z]+', end_part)
-        month_hint = end_month.group().capitalize() if end_month else None
-        
-        start_date = parse_date(start_part, month_hint)
-        end_date = parse_date(end_part)
-        
-        return (
-            start_date.strftime("%Y-%m-%d") if start_date else None,
-            end_date.strftime("%Y-%m-%d") if end_date else None
-        )
-    except Exception as e:
-        print(f"Error processing {filename}: {e}")
-        return None, None
-
+def filename_date(filename, dNumber=None, year=2025):
+    """
+    Start and end date of a sailing name such as 'MDY2-2-9April'
 
-def is_empty_or_nan_rating(dfList):
-    processed_data = [] 
-    for data_dict in dfList:
-        processed_dict = data_dict.copy()  # Create a copy to avoid modifying the original
+    Args:
+        filename: Formatted sailing name
+        dNumber: Data root index; kept for existing callers, the naming
+            scheme is now detected from the prefix
+        year: Year of the sailing
 
-        overall_holiday = processed_dict.get('Overall Holiday')  # Use .get() to handle missing key safely
+    Returns:
+        Tuple of ISO date strings (start, end); either may be None
+    """
+    parsed = parse_sailing_name(filename, year)
+    if parsed is None:
+        return None, None
+    return parsed.start, parsed.end
 
-        if overall_holiday is not None:
-            replacement_value = overall_holiday - 1
-        else:
-            replacement_value = 6
 
-        for key, value in processed_dict.items():
-            if value is None:
-                processed_dict[key] = replacement_value
+def is_empty_or_nan_rating(dfList, metrics=METRIC_ATTRIBUTES):
+    """
+    Copies of summary dicts with missing (None/NaN) metrics imputed
 
+    Uses the same vectorized fill as SummaryTable (Overall Holiday - 1, or 6
+    when that is missing). Only metric keys present in a dict are filled;
+    other None values, e.g. a missing Start date, are left as None.
+    """
+    if not dfList:
+        return []
+    values = np.array([[d.get(m) for m in metrics] for d in dfList], dtype=float)
+    filled, imputed = impute_missing(values, list(metrics))
+    processed_data = []
+    for data_dict, row, bits in zip(dfList, filled.tolist(), imputed.tolist()):
+        processed_dict = data_dict.copy()  # Create a copy to avoid modifying the original
+        if bits:
+            for j, metric in enumerate(metrics):
+                if bits >> j & 1 and metric in processed_dict:
+                    processed_dict[metric] = row[j]
         processed_data.append(processed_dict)
-
     return processed_data
-    
+
 def get_summary_data():
     for data in summary_discovery2:
         name =  data.get("Ship Name")
@@ -723,7 +708,7 @@ def get_summary_data():
         data.update({"End":end})
         data.update({"Fleet":"Marella"})
         data.update({"Ship":"Discovery 2"})
-        print(start, end)
+        logger.debug("%s: %s - %s", name, start, end)
     for data in summary_discovery:
         name =  data.get("Ship Name")
         start, end = filename_date(name,1, year=2025)
@@ -731,28 +716,18 @@ def get_summary_data():
         data.update({"End":end})
         # data.update({"Fleet":"Marella"})
         # data.update({"Ship":"Discovery"})
-        print(start, end)
+        logger.debug("%s: %s - %s", name, start, end)
+    # Missing metrics are imputed when the snapshot's SummaryTable is built,
+    # which also records which values were filled in
     finalSummary = summary_discovery2+summary_discovery
-    finalSummary = is_empty_or_nan_rating(finalSummary)
     with open("./smry.json", 'w') as json_file:
         json.dump(finalSummary, json_file, indent=4) 
     return finalSummary
     # return summary_data2
 
-def format_filename(input_string, data_dir_index):
-#     input_string = "MDY2 2 - 9 April"
-    if data_dir_index == 1:
-        modified_string = re.sub(r"(MDY) ", r"\1-", input_string, 1)
-    # Replace the first space after "MDY2" with "_"
-    else:
-        modified_string = re.sub(r"(MDY2) ", r"\1-", input_string, 1)
-
-    # Remove all remaining spaces in the string
-    final_string = modified_string.replace(" ", "")
-
-    print(f"Original string: '{input_string}'")
-    print(f"Modified string: '{final_string}'")
-    return final_string
+def format_filename(input_string, data_dir_index=None):
+    """'MDY2 2 - 9 April' -> 'MDY2-2-9April' (data_dir_index is no longer needed)"""
+    return format_sailing_name(input_string)
 
 def load_sailing_data_td1(data_dir: str = "./test_data") -> Dict[str, pd.DataFrame]:
     """
@@ -790,50 +765,214 @@ def load_sailing_data_td1(data_dir: str = "./test_data") -> Dict[str, pd.DataFra
 
 
 
-# def load_sailing_data_rate_reason(data_dir: str = "./test_data2/DISCOVERY 2 - 2025") -> Dict[str, pd.DataFrame]:
-def load_sailing_data_rate_reason() -> Dict[str, pd.DataFrame]:
+# Root folders holding one sub-folder per sailing, named after the MDY/MDY2
+# schemes in sailing_names. SAILING_DATA_ROOTS overrides the defaults with an
+# os.pathsep separated list. SAILING_DATA_PARENT (also os.pathsep separated)
+# adds every sub-directory of its directories as a root, so thousands of
+# "<SHIP> - <year>" roots can be passed as one path rather than one
+# environment string longer than the OS allows.
+DEFAULT_DATA_DIRECTS = ["./test_data2/DISCOVERY 2 - 2025", "./test_data2/DISCOVERY 2025"]
+DATA_PARENTS = [d for d in os.environ.get("SAILING_DATA_PARENT", "").split(os.pathsep) if d]
+DATA_DIRECTS = ([d for d in os.environ.get("SAILING_DATA_ROOTS", "").split(os.pathsep) if d]
+                or ([] if DATA_PARENTS else DEFAULT_DATA_DIRECTS))
 
 
+def data_roots(data_directs=None):
     """
-    Load all sailing data CSV files from a directory into DataFrames
+    Data roots to scan
+
+    Returns:
+        data_directs when given, else DATA_DIRECTS followed by the
+        sub-directories of every DATA_PARENTS directory (sorted by name;
+        listed on every call, so roots added later are picked up)
+    """
+    if data_directs:
+        return list(data_directs)
+    roots = list(DATA_DIRECTS)
+    for parent in DATA_PARENTS:
+        if not os.path.isdir(parent):
+            logger.warning("Data parent directory not found: %s", parent)
+            continue
+        roots.extend(path for path in (os.path.join(parent, name) for name in sorted(os.listdir(parent)))
+                     if os.path.isdir(path))
+    return roots
+
+
+def iter_sailing_folders(data_directs=None):
+    """
+    Yield every sailing folder under the data roots
+
+    A folder counts as a sailing when it contains "<folder name>.csv".
+
+    Args:
+        data_directs: Data roots to scan, defaults to data_roots()
+
+    Yields:
+        Tuples of (data_dir_index, data_dir, subdir_name, subdir_path)
+    """
+    for data_dir_index, data_dir in enumerate(data_roots(data_directs)):
+        if not os.path.isdir(data_dir):
+            logger.warning("Data directory not found: %s", data_dir)
+            continue
+        for subdir_name in os.listdir(data_dir):
+            subdir_path = os.path.join(data_dir, subdir_name)
+            if os.path.isdir(subdir_path) and any(
+                file.endswith(subdir_name + ".csv") for file in os.listdir(subdir_path)
+            ):
+                yield data_dir_index, data_dir, subdir_name, subdir_path
+
+
+def sailing_files(subdir_name, subdir_path):
+    """Paths of the rating and reason CSVs of a sailing folder"""
+    return (
+        os.path.join(subdir_path, f"{subdir_name}.csv"),
+        os.path.join(subdir_path, f"{subdir_name}_reason.csv"),
+    )
+
+
+def folder_signature(subdir_name, subdir_path):
+    """(mtime_ns, size) of both CSVs of a sailing folder, used to detect changes"""
+    signature = []
+    for path in sailing_files(subdir_name, subdir_path):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def sailing_key(ship, sailing="1"):
+    """Lookup key used for SAILING_DATA/SAILING_REASON, e.g. 'mdy2-2-9april_1'"""
+    return f"{ship}_{sailing}".lower()
+
+
+def load_sailing_folder(data_dir_index, subdir_name, subdir_path):
+    """
+    Load the rating and reason CSVs of one sailing folder
+
+    Returns:
+        Tuple of (key, formatted sailing name, rating DataFrame, reason DataFrame)
+    """
+    concat_rating_file, concat_reason_file = sailing_files(subdir_name, subdir_path)
+    n = format_filename(subdir_name, data_dir_index)
+    df_rating, report = read_rating_csv(concat_rating_file, engine=CSV_ENGINE)
+    if not report.ok:
+        logger.warning("Invalid ratings in %s (%s), stored as NaN: malformed=%s out_of_range=%s examples=%s",
+                       n, report.path, report.malformed, report.out_of_range, report.examples[:5])
+    df_reason = pd.read_csv(concat_reason_file, engine=CSV_ENGINE, dtype=REASON_DTYPE)
+    return sailing_key(n), n, df_rating, df_reason
+
+
+def _load_sailing_folder_task(folder):
+    """ProcessPoolExecutor entry point; folder is an iter_sailing_folders tuple"""
+    data_dir_index, _, subdir_name, subdir_path = folder
+    return load_sailing_folder(data_dir_index, subdir_name, subdir_path)
+
+
+def load_sailing_folders(folders: List[Tuple], max_workers: Optional[int] = None) -> List[Tuple]:
+    """
+    Load many sailing folders, fanning the CSV parsing out to a process pool
+
+    Args:
+        folders: Tuples as yielded by iter_sailing_folders
+        max_workers: Pool size; None uses every core, 1 loads in-process
+
+    Returns:
+        load_sailing_folder results, in the same order as folders
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(folders) < 2:
+        return [_load_sailing_folder_task(folder) for folder in folders]
+
+    workers = min(workers, len(folders))
+    # A few chunks per worker balances uneven folder sizes against IPC overhead
+    chunksize = max(1, len(folders) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_load_sailing_folder_task, folders, chunksize=chunksize))
+
+
+def load_sailing_data_parallel(data_directs=None, max_workers: Optional[int] = None):
+    """
+    Parallel variant of load_sailing_data_rate_reason with the same return shape
+
+    Args:
+        data_directs: Root folders to scan, defaults to DATA_DIRECTS
+        max_workers: Process pool size, defaults to the number of cores
+
+    Returns:
+        Tuple of two dictionaries (ratings, reasons) keyed like
+        load_sailing_data_rate_reason
+    """
+    sailing_data = {}
+    sailing_data_reason = {}
+    folders = list(iter_sailing_folders(data_directs))
+    for key, _, df_rating, df_reason in load_sailing_folders(folders, max_workers):
+        sailing_data[key] = df_rating
+        sailing_data_reason[key] = df_reason
+    return sailing_data, sailing_data_reason
+
+
+def root_ship_and_year(data_dir, default_year=2025):
+    """Ship name and year from a data root such as './test_data2/DISCOVERY 2 - 2025'"""
+    base = os.path.basename(os.path.normpath(data_dir))
+    match = re.match(r'^(.*?)\s*(?:-\s*)?(\d{4})$', base)
+    if not match:
+        return base.title(), default_year
+    return match.group(1).strip().title(), int(match.group(2))
+
+
+def summarize_sailing(df_rating, name, data_dir_index, data_dir, metrics):
+    """
+    Build a SAMPLE_DATA style summary from a sailing's rating CSV
+
+    Args:
+        df_rating: Per-review ratings of the sailing
+        name: Formatted sailing name (format_filename output)
+        data_dir_index: Index of the data root
+        data_dir: Data root the sailing was found in
+        metrics: Metric columns to average
+
+    Returns:
+        Summary dict with metric means rounded to 2 decimals; metrics without
+        ratings are None and get imputed when the SummaryTable is built
+    """
+    ship, year = root_ship_and_year(data_dir)
+    start, end = filename_date(name, year=year)
+    summary = {}
+    for metric in metrics:
+        mean = df_rating[metric].mean() if metric in df_rating.columns else None
+        summary[metric] = None if mean is None or pd.isna(mean) else round(float(mean), 2)
+    summary.update({
+        "Ship Name": name,
+        "Sailing Number": "1",
+        "Fleet": "Marella",
+        "Ship": ship,
+        "Start": start,
+        "End": end,
+    })
+    return summary
+
+
+def load_sailing_data_rate_reason(data_directs=None) -> Dict[str, pd.DataFrame]:
+    """
+    Load all sailing data CSV files from the data roots into DataFrames
     
     Args:
-        data_dir: Directory containing sailing data CSV files
+        data_directs: Root folders to scan, defaults to DATA_DIRECTS
         
     Returns:
-        Dictionary with keys like "Voyager_CR348" and DataFrame values
+        Tuple of two dictionaries (ratings, reasons) with keys like
+        "mdy2-2-9april_1" and DataFrame values
     """
     sailing_data = {}
     sailing_data_reason = {}
 
-    data_directs = ["./test_data2/DISCOVERY 2 - 2025", "./test_data2/DISCOVERY 2025" ]
+    for data_dir_index, _, subdir_name, subdir_path in iter_sailing_folders(data_directs):
+        key, _, df_rating, df_reason = load_sailing_folder(data_dir_index, subdir_name, subdir_path)
+        sailing_data[key] = df_rating
+        sailing_data_reason[key] = df_reason
 
-    for data_dir_index, data_dir in enumerate(data_directs):
-        for subdir_name in os.listdir(data_dir):
-            subdir_path = os.path.join(data_dir, subdir_name)
-            found = False
-            if os.path.isdir(subdir_path):
-                for file in os.listdir(subdir_path):
-                    if file.endswith(subdir_name+".csv"):
-                        found = True
-                if found == True:
-                    concat_rating_file = os.path.join(subdir_path, f"{subdir_name}.csv")
-                    concat_reason_file = os.path.join(subdir_path, f"{subdir_name}_reason.csv")
-                    n = format_filename(subdir_name, data_dir_index)
-                    # print(n)
-                    # print(avg_rating_file)
-                    df_rating = pd.read_csv(concat_rating_file)
-                    df_reason = pd.read_csv(concat_reason_file)
-
-                    ship = n
-                    sailing = "1"
-                    key = f"{ship}_{sailing}"
-                    key = key.lower()
-
-                    sailing_data[key] = df_rating
-                    sailing_data_reason[key]= df_reason
-                
-    
     return sailing_data, sailing_data_reason
 # SD = load_sailing_data()
 
@@ -1,21 +1,74 @@
 import requests
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Callable, Dict, List, Tuple, Any, Optional
+from collections import deque
 from dataclasses import dataclass
 import json
+import time
 import yaml
 from pathlib import Path
 
+# API calls kept in APIClient.call_log
+CALL_LOG_SIZE = 500
+
 @dataclass
 class SailingIdentifier:
     ship_name: str
     sailing_number: str
 
+@dataclass
+class CallRecord:
+    """Timing and size of one API call made through APIClient._make_request"""
+    method: str
+    endpoint: str
+    started_at: float  # epoch seconds
+    latency_ms: float
+    status: Optional[int]
+    request_bytes: int
+    response_bytes: int
+    cache: Optional[str] = None  # X-Cache header of the server response cache
+    error: Optional[str] = None
+
+class APIError(Exception):
+    """A failed API request; status_code is the HTTP status when the server answered"""
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
 class APIClient:
     def __init__(self, config_path: str = "config/config.yaml"):
         self.config = self._load_config(config_path)
         self.session = requests.Session()
         self.session.headers.update(self.config["api"]["headers"])
         self.session.timeout = self.config["api"]["timeout"]
+        # Most recent calls, oldest first; hooks are called with every new CallRecord
+        self.call_log: deque = deque(maxlen=CALL_LOG_SIZE)
+        self.call_hooks: List[Callable[[CallRecord], None]] = []
+
+    def add_call_hook(self, hook: Callable[[CallRecord], None]):
+        """Register a callback that receives a CallRecord after every API call"""
+        if hook not in self.call_hooks:
+            self.call_hooks.append(hook)
+
+    def _record_call(self, method: str, endpoint: str, started_at: float, started: float,
+                     response: Optional[requests.Response], error: Optional[str] = None):
+        request_body = response.request.body if response is not None and response.request is not None else None
+        record = CallRecord(
+            method=method,
+            endpoint=endpoint,
+            started_at=started_at,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            status=response.status_code if response is not None else None,
+            request_bytes=len(request_body or b""),
+            response_bytes=len(response.content) if response is not None else 0,
+            cache=response.headers.get("X-Cache") if response is not None else None,
+            error=error,
+        )
+        self.call_log.append(record)
+        for hook in self.call_hooks:
+            try:
+                hook(record)
+            except Exception:
+                pass  # tracing must never break the request
 
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from YAML file"""
@@ -61,6 +114,8 @@ class APIClient:
     ) -> Dict[str, Any]:
         """Generic request handler with enhanced error handling"""
         url = f"{self.config['api']['base_url']}/{endpoint}"
+        started_at, started = time.time(), time.perf_counter()
+        response = None
         
         try:
             response = self.session.request(
@@ -73,10 +128,16 @@ class APIClient:
             )
             response.raise_for_status()
             # print(response.json())
-            return response.json()
+            body = response.json()
+            self._record_call(method, endpoint, started_at, started, response)
+            return body
         except requests.exceptions.Timeout:
+            self._record_call(method, endpoint, started_at, started, response, error="timeout")
             raise Exception("API request timed out")
         except requests.exceptions.RequestException as e:
+            failed = getattr(e, 'response', None)
+            self._record_call(method, endpoint, started_at, started,
+                              failed if failed is not None else response, error=str(e))
             error_msg = f"API request to {endpoint} failed: {str(e)}"
             if hasattr(e, 'response') and e.response:
                 error_msg += f" | Status: {e.response.status_code}"
@@ -85,14 +146,41 @@ class APIClient:
                     error_msg += f" | Details: {error_details.get('message', 'No details')}"
                 except ValueError:
                     error_msg += f" | Response: {e.response.text[:200]}"
-            raise Exception(error_msg)
+            raise APIError(error_msg, failed.status_code if failed is not None else None) from e
+
+    @staticmethod
+    def _filter_payload(
+        filter_by: str,
+        sailings: Optional[List[SailingIdentifier]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the sailing/date filter part of a request payload"""
+        payload = {"filters": {}, "filter_by": filter_by}
+
+        if filter_by == "sailing":
+            if not sailings:
+                raise ValueError("Sailings must be provided when filtering by sailing")
+            payload["sailings"] = [
+                {"shipName": s.ship_name, "sailingNumber": s.sailing_number} for s in sailings
+            ]
+        elif filter_by == "date":
+            if not from_date or not to_date:
+                raise ValueError("Both from_date and to_date must be provided when filtering by date")
+            payload["filters"]["fromDate"] = from_date
+            payload["filters"]["toDate"] = to_date
+        else:
+            raise ValueError("Invalid filter_by value. Must be 'sailing' or 'date'")
+
+        return payload
 
     def get_rating_summary(
         self,
         sailings: Optional[List[SailingIdentifier]] = None,
         from_date: Optional[str] = None,
         to_date: Optional[str] = None,
-        filter_by: str = "sailing"
+        filter_by: str = "sailing",
+        include_imputed: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Get rating summaries for multiple sailings or a date range
@@ -102,6 +190,8 @@ class APIClient:
             from_date: Optional start date filter (YYYY-MM-DD)
             to_date: Optional end date filter (YYYY-MM-DD)
             filter_by: Specify whether to filter by "sailing" or "date"
+            include_imputed: Add an "imputedMetrics" list to each summary
+                naming the metrics the server filled in
 
         Returns:
             List of rating summaries in the format matching the 'data' structure provided
@@ -109,21 +199,9 @@ class APIClient:
         endpoint = self.config["api"]["endpoints"]["get_ratings"]
 
         # Prepare request payload
-        payload = {"filters": {}, "filter_by":filter_by}
-
-        if filter_by == "sailing":
-            if not sailings:
-                raise ValueError("Sailings must be provided when filtering by sailing")
-            payload["sailings"] = [
-                {"shipName": s.ship_name, "sailingNumber": s.sailing_number} for s in sailings
-            ]
-        elif filter_by == "date":
-            if not from_date or not to_date:
-                raise ValueError("Both from_date and to_date must be provided when filtering by date")
-            payload["filters"]["fromDate"] = from_date
-            payload["filters"]["toDate"] = to_date
-        else:
-            raise ValueError("Invalid filter_by value. Must be 'sailing' or 'date'")
+        payload = self._filter_payload(filter_by, sailings, from_date, to_date)
+        if include_imputed:
+            payload["includeImputed"] = True
 
         try:
             response = self._make_request("POST", endpoint, data=payload)
@@ -131,6 +209,106 @@ class APIClient:
         except Exception as e:
             raise Exception(f"Failed to get rating summary: {str(e)}")
         
+    def get_dashboard(
+        self,
+        sailings: Optional[List[SailingIdentifier]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        filter_by: str = "sailing",
+        granularity: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Get server-side aggregates for the dashboard
+
+        Args:
+            sailings: List of sailing identifiers (ship_name + sailing_number)
+            from_date: Optional start date filter (YYYY-MM-DD)
+            to_date: Optional end date filter (YYYY-MM-DD)
+            filter_by: Specify whether to filter by "sailing" or "date"
+            granularity: Trend bucket size ("week", "month", "quarter", "year"),
+                or "auto" to let the server choose one for the date span
+
+        Returns:
+            Dictionary with the aggregates for the selected sailings
+            Example:
+            {
+                "count": 12,
+                "granularity": "week",
+                "kpis": {"F&B Quality": 7.71, ...},
+                "trends": [{"date": "2025-04-07", "ship": "Discovery 2",
+                            "metric": "F&B Quality", "score": 7.85, "count": 1}, ...],
+                "shipMeans": [{"ship": "Discovery 2", "F&B Quality": 7.69, ...}, ...]
+            }
+        """
+        endpoint = self.config["api"]["endpoints"]["get_dashboard"]
+        payload = self._filter_payload(filter_by, sailings, from_date, to_date)
+        payload["granularity"] = granularity
+
+        try:
+            response = self._make_request("POST", endpoint, data=payload)
+        except APIError as e:
+            # Keep the status: the dashboard falls back to summaries on 404
+            raise APIError(f"Failed to get dashboard data: {str(e)}", e.status_code) from e
+        except Exception as e:
+            raise Exception(f"Failed to get dashboard data: {str(e)}")
+
+        if response.get("status") != "success":
+            raise ValueError(f"API request failed: {response.get('error', 'Unknown error')}")
+        return {
+            "count": response.get("count", 0),
+            "granularity": response.get("granularity"),
+            "kpis": response.get("kpis", {}),
+            "trends": response.get("trends", []),
+            "shipMeans": response.get("shipMeans", [])
+        }
+
+    def get_trends(
+        self,
+        metrics: Optional[List[str]] = None,
+        sailings: Optional[List[SailingIdentifier]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        filter_by: str = "sailing",
+        granularity: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Get metric trends bucketed by time
+
+        Args:
+            metrics: Metrics to include (server default when omitted)
+            sailings: List of sailing identifiers (ship_name + sailing_number)
+            from_date: Optional start date filter (YYYY-MM-DD)
+            to_date: Optional end date filter (YYYY-MM-DD)
+            filter_by: Specify whether to filter by "sailing" or "date"
+            granularity: "week", "month", "quarter", "year" or "auto"
+
+        Returns:
+            Dictionary with the granularity used and the bucketed points
+            Example:
+            {
+                "granularity": "month",
+                "data": [{"date": "2025-04-01", "ship": "Discovery 2",
+                          "metric": "F&B Quality", "score": 7.81, "count": 3}, ...]
+            }
+        """
+        endpoint = self.config["api"]["endpoints"]["get_trends"]
+        payload = self._filter_payload(filter_by, sailings, from_date, to_date)
+        payload["granularity"] = granularity
+        if metrics:
+            payload["metrics"] = metrics
+
+        try:
+            response = self._make_request("POST", endpoint, data=payload)
+        except Exception as e:
+            raise Exception(f"Failed to get trends: {str(e)}")
+
+        if response.get("status") != "success":
+            raise ValueError(f"API request failed: {response.get('error', 'Unknown error')}")
+        return {
+            "granularity": response.get("granularity"),
+            "data": response.get("data", [])
+        }
+
     def get_metric_rating(
         self,
         metric: str,
@@ -139,7 +317,8 @@ class APIClient:
         to_date: Optional[str] = None,
         filter_below: Optional[float] = None,
         compare_to_average: bool = False,
-        filter_by:str = "sailing"
+        filter_by:str = "sailing",
+        include: Optional[List[str]] = None
     ) -> Dict:
         """
         Get and compare metric ratings across multiple sailings
@@ -149,6 +328,10 @@ class APIClient:
             metric: Metric to compare (e.g., "F&B quality overall")
             filter_below: Optional threshold to filter low ratings
             compare_to_average: Whether to include comparison to overall average
+            include: Optional extra blocks per sailing; ["distribution"] adds
+                the rating histogram (0-10 in 0.5 steps), its cumulative
+                counts and quantiles, with the bins and quantile levels
+                as "distributionBins" and "quantileLevels"
             
         Returns:
             Dictionary with comparison results and filtered reviews
@@ -176,25 +359,12 @@ class APIClient:
         payload = {
             "metric": metric,
             "filterBelow": filter_below,
-            "compareToAverage": compare_to_average,
-            "filter_by":filter_by,
-            "filters": {}
+            "compareToAverage": compare_to_average
         }
+        if include:
+            payload["include"] = list(include)
 
-        if filter_by == "sailing":
-            if not sailings:
-                raise ValueError("Sailings must be provided when filtering by sailing")
-            payload["sailings"] = [
-                {"shipName": s.ship_name, "sailingNumber": s.sailing_number} for s in sailings
-            ]
-        elif filter_by == "date":
-            if not from_date or not to_date:
-                raise ValueError("Both from_date and to_date must be provided when filtering by date")
-            # payload = {"filters": {}}
-            payload["filters"]["fromDate"] = from_date
-            payload["filters"]["toDate"] = to_date
-        else:
-            raise ValueError("Invalid filter_by value. Must be 'sailing' or 'date'")
+        payload.update(self._filter_payload(filter_by, sailings, from_date, to_date))
 
         try:
             response = self._make_request("POST", endpoint, data=payload)
@@ -202,7 +372,182 @@ class APIClient:
             return self._check_metric_response(response)
         except Exception as e:
             raise Exception(f"Failed to get metric ratings: {str(e)}")
+
+    def get_metric_reviews(
+        self,
+        metric: str,
+        filter_below: float,
+        sailings: Optional[List[SailingIdentifier]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        filter_by: str = "sailing",
+        offset: int = 0,
+        limit: int = 50,
+        order: str = "asc"
+    ) -> Dict:
+        """
+        Get one page of the reviews rated at or below a threshold
+
+        Args:
+            metric: Metric to filter on (e.g., "F&B Quality")
+            filter_below: Reviews with a rating <= this value are returned
+            offset: Number of matching reviews to skip
+            limit: Page size (the server allows up to 1000)
+            order: "asc" for lowest ratings first, "desc" for highest first
+
+        Returns:
+            Dictionary with the total number of matching reviews and the page
+            Example:
+            {
+                "total": 412,
+                "offset": 0,
+                "reviews": [
+                    {"id": "Voyager_1_3", "ship": "Voyager", "sailingNumber": "1",
+                     "rating": 1.0, "review": "The food was..."},
+                    ...
+                ]
+            }
+        """
+        endpoint = self.config["api"]["endpoints"]["get_metric_reviews"]
+
+        if metric not in self.get_valid_metrics():
+            raise ValueError(f"Invalid metric attribute. Must be one of: {self.get_valid_metrics()}")
+
+        payload = {
+            "metric": metric,
+            "filterBelow": filter_below,
+            "offset": offset,
+            "limit": limit,
+            "order": order
+        }
+        payload.update(self._filter_payload(filter_by, sailings, from_date, to_date))
+
+        try:
+            response = self._make_request("POST", endpoint, data=payload)
+        except Exception as e:
+            raise Exception(f"Failed to get metric reviews: {str(e)}")
+        if response.get("status") != "success":
+            raise ValueError(f"API request failed: {response.get('error', 'Unknown error')}")
+        return {
+            "total": response.get("total", 0),
+            "offset": response.get("offset", offset),
+            "reviews": response.get("reviews", [])
+        }
     
+    def search_reviews(
+        self,
+        query: str,
+        metric: Optional[str] = None,
+        ships: Optional[List[str]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Dict:
+        """
+        Full-text search over the review reasons of every sailing
+
+        Args:
+            query: Free text, e.g. "air con" or "buffet"
+            metric: Only search the reasons given for this metric
+            ships: Only search these ships
+            from_date: Only search sailings from this date (needs to_date)
+            to_date: Only search sailings up to this date (needs from_date)
+            offset: Number of best matches to skip
+            limit: Page size (the server allows up to 100)
+
+        Returns:
+            Dictionary with the number of matching reviews and the page, best
+            match first
+            Example:
+            {
+                "total": 37,
+                "offset": 0,
+                "results": [
+                    {"ship": "Voyager", "sailingNumber": "1", "metric": "Cabins",
+                     "rating": 3.0, "review": "The air con was...", "score": 7.86},
+                    ...
+                ]
+            }
+        """
+        endpoint = self.config["api"]["endpoints"]["search_reviews"]
+
+        if metric is not None and metric not in self.get_valid_metrics():
+            raise ValueError(f"Invalid metric attribute. Must be one of: {self.get_valid_metrics()}")
+
+        payload = {"query": query, "offset": offset, "limit": limit}
+        if metric is not None:
+            payload["metric"] = metric
+        if ships:
+            payload["ships"] = list(ships)
+        if from_date or to_date:
+            payload.update(self._filter_payload("date", from_date=from_date, to_date=to_date))
+
+        try:
+            response = self._make_request("POST", endpoint, data=payload)
+        except Exception as e:
+            raise Exception(f"Failed to search reviews: {str(e)}")
+        if response.get("status") != "success":
+            raise ValueError(f"API request failed: {response.get('error', 'Unknown error')}")
+        return {
+            "total": response.get("total", 0),
+            "offset": response.get("offset", offset),
+            "results": response.get("results", [])
+        }
+
+    def get_top_keywords(
+        self,
+        metric: str,
+        sailings: Optional[List[SailingIdentifier]] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        filter_by: str = "sailing",
+        limit: int = 10
+    ) -> Dict:
+        """
+        Get the precomputed top complaint keywords of a metric
+
+        Keywords are built offline from the reviews rated at or below the
+        server's complaint threshold (returned as "threshold").
+
+        Args:
+            metric: Metric whose complaint reasons were analysed
+            limit: Phrases per sailing and in the combined list
+
+        Returns:
+            Dictionary with per-sailing keywords and a combined list
+            Example:
+            {
+                "threshold": 5.0,
+                "results": [
+                    {"ship": "Voyager", "sailingNumber": "1", "complaintReviews": 57,
+                     "keywords": [{"phrase": "cold food", "score": 0.041, "mentions": 6}, ...]},
+                    ...
+                ],
+                "combined": [{"phrase": "cold food", "mentions": 15, "sailings": 2}, ...]
+            }
+        """
+        endpoint = self.config["api"]["endpoints"]["get_top_keywords"]
+
+        if metric not in self.get_valid_metrics():
+            raise ValueError(f"Invalid metric attribute. Must be one of: {self.get_valid_metrics()}")
+
+        payload = {"metric": metric, "limit": limit}
+        payload.update(self._filter_payload(filter_by, sailings, from_date, to_date))
+
+        try:
+            response = self._make_request("POST", endpoint, data=payload)
+        except Exception as e:
+            raise Exception(f"Failed to get top keywords: {str(e)}")
+        if response.get("status") != "success":
+            raise ValueError(f"API request failed: {response.get('error', 'Unknown error')}")
+        return {
+            "threshold": response.get("threshold"),
+            "built": response.get("built"),
+            "results": response.get("results", []),
+            "combined": response.get("combined", [])
+        }
+
     def get_metric_comparison(
         self,
         metrics: List[str],
@@ -281,6 +626,8 @@ class APIClient:
         return {
             "metric": response["metric"],
             "filterBelow": response.get("filterBelow"),
+            "distributionBins": response.get("distributionBins"),
+            "quantileLevels": response.get("quantileLevels"),
             "results": [
                 self._process_sailing_result(r)
                 for r in response["results"]
@@ -302,6 +649,9 @@ class APIClient:
         
         if "comparisonToOverall" in result:
             processed["comparisonToOverall"] = result["comparisonToOverall"]
+
+        if "distribution" in result:
+            processed["distribution"] = result["distribution"]
         
         if "error" in result:
             processed["error"] = result["error"]